@@ -5,6 +5,14 @@ export type JobStatusResponse = {
   error_message?: string | null;
   filename?: string | null;
   created_at?: string | null;
+  progress?: JobEvent["progress"];
+  timings?: {
+    stages: Record<string, number>;
+    total: number;
+    pages: number;
+    ocr_pages: number;
+    cache_hit?: boolean;
+  } | null;
   result?: {
     base_price?: number;
     best_bid?: number;
@@ -13,6 +21,7 @@ export type JobStatusResponse = {
     profit_if_won_at_best?: number;
     initial_bracket?: number[];
     auto_expanded?: boolean;
+    diagnostic_points?: number;
     diagnostic_bids?: number[];
     diagnostic_exp_profit?: number[];
     extracted_data?: {
@@ -25,6 +34,20 @@ export type JobStatusResponse = {
   };
 };
 
+export type JobEvent = {
+  job_id: string;
+  status: string;
+  progress?: { stage: string; [key: string]: unknown } | null;
+  error_message?: string | null;
+};
+
+export type JobCurveResponse = {
+  job_id: string;
+  total_points: number;
+  bids: number[];
+  exp_profit: number[];
+};
+
 const API_BASE = import.meta.env.VITE_API_BASE || "http://localhost:8000";
 
 export async function createJob(file: File, qualityScore: number, minBid?: number, maxBid?: number): Promise<JobCreateResponse> {
@@ -54,4 +77,60 @@ export async function getJobs(): Promise<JobStatusResponse[]> {
   return res.json();
 }
 
+export async function getJobCurve(jobId: string, points?: number): Promise<JobCurveResponse> {
+  const query = points != null ? `?points=${points}` : "";
+  const res = await fetch(`${API_BASE}/api/jobs/${jobId}/curve${query}`);
+  if (!res.ok) throw new Error(`Failed to fetch curve: ${res.status}`);
+  return res.json();
+}
 
+// Overall limit for waitForJob, and the polling interval used when the event stream is unavailable.
+const JOB_WAIT_TIMEOUT_MS = 5 * 60_000;
+const JOB_POLL_INTERVAL_MS = 1_000;
+
+function isFinished(status: string): boolean {
+  return status === "succeeded" || status === "failed";
+}
+
+async function pollJob(jobId: string, deadline: number, onEvent?: (event: JobEvent) => void): Promise<JobStatusResponse> {
+  while (Date.now() < deadline) {
+    const job = await getJob(jobId);
+    onEvent?.({ job_id: job.id, status: job.status, progress: job.progress, error_message: job.error_message });
+    if (isFinished(job.status)) return job;
+    await new Promise((r) => setTimeout(r, JOB_POLL_INTERVAL_MS));
+  }
+  throw new Error(`Timed out waiting for job ${jobId}`);
+}
+
+// Follows the job over Server-Sent Events and resolves with the finished job (succeeded or failed).
+// EventSource reconnects by itself after network errors; if it gives up (CLOSED, e.g. the stream
+// endpoint returned an error or a proxy strips SSE) this falls back to polling getJob.
+// Rejects once timeoutMs has passed without the job finishing.
+export function waitForJob(
+  jobId: string,
+  onEvent?: (event: JobEvent) => void,
+  timeoutMs: number = JOB_WAIT_TIMEOUT_MS,
+): Promise<JobStatusResponse> {
+  const deadline = Date.now() + timeoutMs;
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE}/api/jobs/${jobId}/events`);
+    let settled = false;
+    const settle = (result: Promise<JobStatusResponse>) => {
+      if (settled) return;
+      settled = true;
+      clearTimeout(timer);
+      source.close();
+      result.then(resolve, reject);
+    };
+    const timer = setTimeout(() => settle(Promise.reject(new Error(`Timed out waiting for job ${jobId}`))), timeoutMs);
+
+    source.onmessage = (msg) => {
+      const event: JobEvent = JSON.parse(msg.data);
+      onEvent?.(event);
+      if (isFinished(event.status)) settle(getJob(jobId));
+    };
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) settle(pollJob(jobId, deadline, onEvent));
+    };
+  });
+}
@@ -6,10 +6,13 @@ import { Zap, FileText, TrendingUp, DollarSign, Plus, Calendar, RefreshCw } from
 import { motion } from "motion/react";
 import { NeoBackground } from "./neo-background";
 import { AutoHideHeader } from "./auto-hide-header";
-import { getJobs, JobStatusResponse } from "../api";
+import { getJobCurve, getJobs, JobCurveResponse, JobStatusResponse } from "../api";
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from "./ui/dialog";
 import { LineChart, Line, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
 
+// points requested from /curve for the dialog chart
+const CHART_POINTS = 100;
+
 interface DashboardPageFinalProps {
   userEmail: string;
   onNavigateToUpload: () => void;
@@ -22,6 +25,7 @@ export function DashboardPageFinal({ userEmail, onNavigateToUpload, onLogout }:
   const [error, setError] = useState<string | null>(null);
   const [selected, setSelected] = useState<JobStatusResponse | null>(null);
   const [open, setOpen] = useState(false);
+  const [curve, setCurve] = useState<JobCurveResponse | null>(null);
 
   const loadJobs = async () => {
     try {
@@ -38,17 +42,28 @@ export function DashboardPageFinal({ userEmail, onNavigateToUpload, onLogout }:
     }
   };
 
+  // the job list leaves out the diagnostic curves; load the curve for the dialog
+  const openJob = async (j: JobStatusResponse) => {
+    setSelected(j);
+    setCurve(null);
+    setOpen(true);
+    if (!j.result?.diagnostic_points) return;
+    try {
+      setCurve(await getJobCurve(j.id, CHART_POINTS));
+    } catch (e: any) {
+      console.error("[Dashboard] Error loading curve:", e);
+    }
+  };
+
   useEffect(() => {
     loadJobs();
     // No auto-refresh - user can manually refresh if needed
   }, []);
 
   const chartData = useMemo(() => {
-    if (!selected?.result?.diagnostic_bids || !selected?.result?.diagnostic_exp_profit) return [] as { x: number; y: number }[];
-    const bids = selected.result.diagnostic_bids;
-    const vals = selected.result.diagnostic_exp_profit;
-    return bids.slice(0, Math.min(bids.length, vals.length)).map((b, i) => ({ x: Math.round(b), y: Number(vals[i]) }));
-  }, [selected]);
+    if (!curve) return [] as { x: number; y: number }[];
+    return curve.bids.map((b, i) => ({ x: Math.round(b), y: Number(curve.exp_profit[i]) }));
+  }, [curve]);
 
   const userName = userEmail.split("@")[0];
 
@@ -255,7 +270,7 @@ export function DashboardPageFinal({ userEmail, onNavigateToUpload, onLogout }:
                           <div className="text-text-primary capitalize">{j.status}</div>
                           <div className="text-sm text-text-secondary">{j.result ? "Completed" : "In progress"}</div>
                         </div>
-                        <Button variant="outline" onClick={() => { setSelected(j); setOpen(true); }} className="h-9">View</Button>
+                        <Button variant="outline" onClick={() => openJob(j)} className="h-9">View</Button>
                         <Badge
                           className={
                             j.status === "succeeded"
@@ -4,9 +4,11 @@ import { Loader2 } from "lucide-react";
 interface EnhancedProcessingOverlayProps {
   isVisible: boolean;
   progress: number;
+  // latest job stage from the server; replaces the generic hint below the message
+  stage?: string | null;
 }
 
-export function EnhancedProcessingOverlay({ isVisible, progress }: EnhancedProcessingOverlayProps) {
+export function EnhancedProcessingOverlay({ isVisible, progress, stage }: EnhancedProcessingOverlayProps) {
   const getMessage = (progress: number) => {
     if (progress < 50) return "Analyzing your document...";
     if (progress < 90) return "Processing data and calculations...";
@@ -53,7 +55,7 @@ export function EnhancedProcessingOverlay({ isVisible, progress }: EnhancedProce
               {getMessage(progress)}
             </motion.p>
             <p className="text-sm text-text-secondary">
-              Please wait while we optimize your bid
+              {stage || "Please wait while we optimize your bid"}
             </p>
           </div>
 
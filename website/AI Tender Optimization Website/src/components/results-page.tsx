@@ -3,10 +3,13 @@ import { Card } from "./ui/card";
 import { Button } from "./ui/button";
 import { NeoBackground } from "./neo-background";
 import { AutoHideHeader } from "./auto-hide-header";
-import { getJob, JobStatusResponse } from "../api";
+import { getJob, getJobCurve, JobCurveResponse, JobStatusResponse } from "../api";
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from "./ui/dialog";
 import { LineChart, Line, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
 
+// the curve is downsampled server-side; the chart doesn't need every grid point
+const CHART_POINTS = 100;
+
 interface ResultsPageProps {
   userEmail: string;
   jobId: string;
@@ -18,6 +21,7 @@ export function ResultsPage({ userEmail, jobId, onBack, onLogout }: ResultsPageP
   const [job, setJob] = useState<JobStatusResponse | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [curve, setCurve] = useState<JobCurveResponse | null>(null);
 
   useEffect(() => {
     let mounted = true;
@@ -25,6 +29,10 @@ export function ResultsPage({ userEmail, jobId, onBack, onLogout }: ResultsPageP
       try {
         const data = await getJob(jobId);
         if (mounted) setJob(data);
+        if (data.result?.diagnostic_points) {
+          const c = await getJobCurve(jobId, CHART_POINTS);
+          if (mounted) setCurve(c);
+        }
       } catch (e: any) {
         if (mounted) setError(e?.message || "Failed to load job");
       } finally {
@@ -37,11 +45,9 @@ export function ResultsPage({ userEmail, jobId, onBack, onLogout }: ResultsPageP
   }, [jobId]);
 
   const chartData = useMemo(() => {
-    if (!job?.result?.diagnostic_bids || !job?.result?.diagnostic_exp_profit) return [] as { x: number; y: number }[];
-    const bids = job.result.diagnostic_bids;
-    const vals = job.result.diagnostic_exp_profit;
-    return bids.slice(0, Math.min(bids.length, vals.length)).map((b, i) => ({ x: Math.round(b), y: Number(vals[i]) }));
-  }, [job]);
+    if (!curve) return [] as { x: number; y: number }[];
+    return curve.bids.map((b, i) => ({ x: Math.round(b), y: Number(curve.exp_profit[i]) }));
+  }, [curve]);
 
   return (
     <div className="min-h-screen bg-bg relative overflow-hidden">
@@ -85,7 +91,7 @@ export function ResultsPage({ userEmail, jobId, onBack, onLogout }: ResultsPageP
                   </div>
                   <div className="p-4 bg-surface-2 rounded-lg">
                     <div className="text-sm text-text-secondary mb-1">Diagnostic Points</div>
-                    <div className="text-text-primary">{job.result?.diagnostic_bids?.length ?? 0}</div>
+                    <div className="text-text-primary">{job.result?.diagnostic_points ?? 0}</div>
                   </div>
                 </div>
               </Card>
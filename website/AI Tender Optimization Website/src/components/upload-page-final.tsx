@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from "react";
-import { createJob, getJob } from "../api";
+import { createJob, waitForJob, type JobEvent } from "../api";
 import { Card } from "./ui/card";
 import { Button } from "./ui/button";
 import { Badge } from "./ui/badge";
@@ -23,6 +23,7 @@ export function UploadPageFinal({ userEmail, onNavigateToDashboard, onNavigateTo
   const [showCostModal, setShowCostModal] = useState(false);
   const [isProcessing, setIsProcessing] = useState(false);
   const [processingProgress, setProcessingProgress] = useState(0);
+  const [processingStage, setProcessingStage] = useState<string | null>(null);
   const [isOptimized, setIsOptimized] = useState(false);
   const [jobId, setJobId] = useState<string | null>(null);
   const [jobResult, setJobResult] = useState<{
@@ -58,6 +59,7 @@ export function UploadPageFinal({ userEmail, onNavigateToDashboard, onNavigateTo
     setShowCostModal(false);
     setIsProcessing(true);
     setProcessingProgress(0);
+    setProcessingStage(null);
 
     // Smooth progress UI while job runs
     const progressInterval = setInterval(() => {
@@ -78,18 +80,14 @@ export function UploadPageFinal({ userEmail, onNavigateToDashboard, onNavigateTo
       const created = await createJob(file, qualityScore);
       setJobId(created.job_id);
 
-      // Poll until complete
-      let done = false;
-      for (let i = 0; i < 300 && !done; i++) { // up to ~60s at 200ms
-        await new Promise((r) => setTimeout(r, 200));
-        const status = await getJob(created.job_id);
-        if (status.status === "succeeded" && status.result) {
-          setJobResult(status.result);
-          done = true;
-        } else if (status.status === "failed") {
-          throw new Error(status.error_message || "Job failed");
-        }
+      // Progress is pushed over SSE until the job finishes
+      const status = await waitForJob(created.job_id, (event) => {
+        setProcessingStage(describeJobEvent(event));
+      });
+      if (status.status === "failed") {
+        throw new Error(status.error_message || "Job failed");
       }
+      if (status.result) setJobResult(status.result);
 
       clearInterval(progressInterval);
       setProcessingProgress(100);
@@ -147,6 +145,31 @@ export function UploadPageFinal({ userEmail, onNavigateToDashboard, onNavigateTo
     return "High Quality";
   };
 
+  // Text for the pipeline stage reported by the worker (see ProgressHook in backend/pipeline.py)
+  const describeJobEvent = (event: JobEvent): string | null => {
+    if (event.status === "queued") return "Waiting for a free worker...";
+    const progress = event.progress;
+    if (!progress) return null;
+    switch (progress.stage) {
+      case "cache":
+        return progress.hit ? "Reusing the earlier extraction of this document..." : "Reading the document...";
+      case "extract":
+        return `Reading page ${progress.page} of ${progress.pages}...`;
+      case "params":
+        return "Finding tender parameters...";
+      case "rules":
+        return "Extracting tender values...";
+      case "models":
+        return "Loading bid models...";
+      case "optimize":
+        return "Optimizing your bid...";
+      case "done":
+        return "Finalizing results...";
+      default:
+        return null;
+    }
+  };
+
   const fmt = (n?: number) => (typeof n === "number" && isFinite(n) ? n.toLocaleString(undefined, { maximumFractionDigits: 2 }) : "-");
 
   return (
@@ -415,7 +438,7 @@ export function UploadPageFinal({ userEmail, onNavigateToDashboard, onNavigateTo
       />
 
       {/* Processing Overlay */}
-      <EnhancedProcessingOverlay isVisible={isProcessing} progress={processingProgress} />
+      <EnhancedProcessingOverlay isVisible={isProcessing} progress={processingProgress} stage={processingStage} />
 
       {/* Answer Ready Toast */}
       <AnswerReadyToast
@@ -0,0 +1,299 @@
+"""
+benchmark.py
+------------
+Microbenchmarks for the optimizer and training paths:
+  - optimize_bid latency per tender and model evaluations per optimization, for the
+    generic grid search, the analytic logistic path and the markup table the backend uses
+  - predict_win_prob_single latency
+  - train_models and random_oversample wall time and peak memory
+
+Fixtures are built at every --sizes row count from make_synthetic_small_dataset
+("small") and generate_realistic_bids_enhanced ("enhanced", loaded back through
+load_dataset like a real training CSV). Results are written as JSON; pass an earlier
+result file as --compare to print the change per benchmark.
+
+Usage examples:
+  python ml/benchmark.py --outfile bench.json
+  python ml/benchmark.py --sizes 1000 100000 --tenders 50 --compare bench.json --outfile bench_new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import bid_optimization_pipeline_from_scratch as bopt
+from data_synthesizer import generate_realistic_bids_enhanced
+
+SEED = 42
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+FIXTURES = ("small", "enhanced")
+OPTIMIZER_MODES = ("grid", "analytic", "table")
+
+
+# -----------------------------
+# Measurement helpers
+# -----------------------------
+
+def latency_stats(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds, dtype=float) * 1000.0
+    return {
+        "n": int(len(ms)),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "min_ms": float(ms.min()),
+    }
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> Tuple[List[float], Any]:
+    """Wall times of `repeat` calls to fn, plus the last return value."""
+    times, out = [], None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return times, out
+
+
+def peak_memory_mb(fn: Callable[[], Any]) -> float:
+    """Peak traced allocation (Python + numpy) during one call, in a separate untimed run."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+@contextmanager
+def count_model_evaluations() -> Iterator[Dict[str, int]]:
+    """
+    Count classifier / regressor calls and scored rows made through the pipeline module.
+    The optimizer looks these helpers up as module globals, so wrapping them is enough.
+    """
+    counts = {"clf_calls": 0, "clf_rows": 0, "reg_calls": 0, "reg_rows": 0}
+    orig_clf, orig_reg = bopt.predict_win_prob_safe, bopt.predict_profit_if_won_batch
+    orig_reg_single = bopt.predict_profit_if_won_single
+
+    def clf(clf_pipe, X):
+        counts["clf_calls"] += 1
+        counts["clf_rows"] += len(X)
+        return orig_clf(clf_pipe, X)
+
+    def reg(reg_pipe, bid_amounts, base_price, quality_score):
+        counts["reg_calls"] += 1
+        counts["reg_rows"] += len(np.atleast_1d(bid_amounts))
+        return orig_reg(reg_pipe, bid_amounts, base_price, quality_score)
+
+    def reg_single(reg_pipe, bid_amount, base_price, quality_score):
+        counts["reg_calls"] += 1
+        counts["reg_rows"] += 1
+        return orig_reg_single(reg_pipe, bid_amount, base_price, quality_score)
+
+    bopt.predict_win_prob_safe = clf
+    bopt.predict_profit_if_won_batch = reg
+    bopt.predict_profit_if_won_single = reg_single
+    try:
+        yield counts
+    finally:
+        bopt.predict_win_prob_safe = orig_clf
+        bopt.predict_profit_if_won_batch = orig_reg
+        bopt.predict_profit_if_won_single = orig_reg_single
+
+
+# -----------------------------
+# Fixtures
+# -----------------------------
+
+def build_fixture(kind: str, n: int, seed: int, tmp_dir: str) -> pd.DataFrame:
+    if kind == "small":
+        return bopt.make_synthetic_small_dataset(n=n, seed=seed)
+    path = os.path.join(tmp_dir, f"enhanced_{n}.csv")
+    generate_realistic_bids_enhanced(n=n, seed=seed, outfile=path)
+    df = bopt.load_dataset(path)
+    os.remove(path)
+    return df.reset_index(drop=True)
+
+
+def sample_tenders(df: pd.DataFrame, k: int, seed: int) -> List[Tuple[float, float]]:
+    rows = df.sample(n=min(k, len(df)), random_state=seed)
+    return list(zip(rows["base_price"].astype(float), rows["quality_score"].astype(float)))
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+
+def bench_training(df: pd.DataFrame, repeat: int, oversample_ratio: float) -> List[Dict[str, Any]]:
+    results = []
+
+    times, out = timed(lambda: bopt.random_oversample(df, ratio=oversample_ratio), repeat)
+    results.append({
+        "benchmark": "random_oversample",
+        "ratio": oversample_ratio,
+        "rows_out": int(len(out)),
+        "wall": latency_stats(times),
+        "peak_mem_mb": peak_memory_mb(lambda: bopt.random_oversample(df, ratio=oversample_ratio)),
+    })
+
+    # train_models adds a column to its input and dumps the models to disk
+    train = lambda: bopt.train_models(df.copy(), reg_kind="ridge")
+    times, out = timed(train, repeat)
+    results.append({
+        "benchmark": "train_models",
+        "reg_kind": "ridge",
+        "wall": latency_stats(times),
+        "peak_mem_mb": peak_memory_mb(train),
+        "roc_auc": out.clf_metrics["roc_auc"],
+    })
+    return results
+
+
+def bench_optimizer(tenders: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+    clf_pipe, reg_pipe = bopt.load_models()
+    results = []
+
+    t0 = time.perf_counter()
+    table = bopt.build_markup_table(clf_pipe)
+    results.append({"benchmark": "build_markup_table", "wall": latency_stats([time.perf_counter() - t0])})
+
+    kwargs_by_mode = {
+        "grid": dict(use_profit_formula=False),
+        "analytic": dict(use_profit_formula=True),
+        "table": dict(use_profit_formula=True, markup_table=table),
+    }
+    for mode in OPTIMIZER_MODES:
+        kwargs = kwargs_by_mode[mode]
+        times, clf_rows, reg_rows, calls = [], [], [], []
+        for base_price, quality in tenders:
+            with count_model_evaluations() as counts:
+                t0 = time.perf_counter()
+                bopt.optimize_bid(clf_pipe, reg_pipe, base_price=base_price, quality_score=quality,
+                                  auto_expand=True, **kwargs)
+                times.append(time.perf_counter() - t0)
+            clf_rows.append(counts["clf_rows"])
+            reg_rows.append(counts["reg_rows"])
+            calls.append(counts["clf_calls"] + counts["reg_calls"])
+        results.append({
+            "benchmark": "optimize_bid",
+            "mode": mode,
+            "latency": latency_stats(times),
+            "evaluations_per_optimization": {
+                "model_calls": float(np.mean(calls)),
+                "clf_rows": float(np.mean(clf_rows)),
+                "reg_rows": float(np.mean(reg_rows)),
+            },
+        })
+
+    times = []
+    for base_price, quality in tenders:
+        t0 = time.perf_counter()
+        bopt.predict_win_prob_single(clf_pipe, base_price * 1.1, base_price, quality)
+        times.append(time.perf_counter() - t0)
+    results.append({"benchmark": "predict_win_prob_single", "latency": latency_stats(times)})
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # train_models persists to these paths; keep the shipped models untouched
+        bopt.CLASSIFIER_PATH = os.path.join(tmp_dir, "models", "win_classifier_final.pkl")
+        bopt.REGRESSOR_PATH = os.path.join(tmp_dir, "models", "profit_regressor_final.pkl")
+        for kind in args.fixtures:
+            for n in args.sizes:
+                t0 = time.perf_counter()
+                df = build_fixture(kind, n, args.seed, tmp_dir)
+                build_seconds = time.perf_counter() - t0
+                bopt.safe_print(f"[bench] {kind} n={n}: fixture {build_seconds:.2f}s, "
+                                f"rows={len(df)}, win_ratio={df['won'].mean():.3f}")
+                base = {"fixture": kind, "rows": n}
+                results.append({**base, "benchmark": "fixture", "wall": latency_stats([build_seconds])})
+                for r in bench_training(df, args.repeat, args.oversample_ratio):
+                    results.append({**base, **r})
+                for r in bench_optimizer(sample_tenders(df, args.tenders, args.seed)):
+                    results.append({**base, **r})
+                del df
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+
+# -----------------------------
+# Comparison
+# -----------------------------
+
+def _key(r: Dict[str, Any]) -> Tuple:
+    return r["fixture"], r["rows"], r["benchmark"], r.get("mode")
+
+
+def _headline_ms(r: Dict[str, Any]) -> float:
+    stats = r.get("latency") or r["wall"]
+    return stats["p50_ms"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """Print p50 time of each benchmark against the baseline run (ratio < 1 is faster)."""
+    before = {_key(r): r for r in baseline["results"]}
+    bopt.safe_print(f"{'benchmark':<44}{'baseline ms':>14}{'current ms':>14}{'ratio':>8}")
+    for r in current["results"]:
+        old = before.get(_key(r))
+        if old is None:
+            continue
+        name = "/".join(str(p) for p in _key(r) if p is not None)
+        a, b = _headline_ms(old), _headline_ms(r)
+        bopt.safe_print(f"{name:<44}{a:>14.3f}{b:>14.3f}{(b / a if a else float('nan')):>8.2f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the bid optimizer and training paths")
+    p.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Fixture row counts")
+    p.add_argument("--fixtures", choices=FIXTURES, nargs="+", default=list(FIXTURES))
+    p.add_argument("--tenders", type=int, default=200, help="Tenders optimized per fixture and mode")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per training benchmark")
+    p.add_argument("--oversample_ratio", type=float, default=0.75)
+    p.add_argument("--seed", type=int, default=SEED)
+    p.add_argument("--outfile", type=str, default="benchmark_results.json")
+    p.add_argument("--compare", type=str, default=None, help="Earlier result JSON to compare against")
+    args = p.parse_args()
+
+    out = run(args)
+    with open(args.outfile, "w") as f:
+        json.dump(out, f, indent=2)
+    bopt.safe_print(f"Wrote {len(out['results'])} results to {args.outfile}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), out)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,15 +20,19 @@ Dependencies:
 - pandas
 - joblib
 - numpy
+- pyarrow (optional: Parquet / Arrow input and the --cache file)
 
 """
 
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import sys
 import warnings
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Dict, Tuple
 
@@ -60,6 +64,17 @@ REQUIRED_COLS = ["bid_amount", "base_price", "quality_score", "won"]
 FEATURES = ["rel_markup", "quality_score"]
 TARGET_CLASS = "won"
 TARGET_PROFIT = "profit_if_won"
+NUMERIC_COLS = ["bid_amount", "base_price", "quality_score"]
+# load_dataset output: compact dtypes, read and converted LOAD_CHUNK_ROWS rows at a time
+LOAD_DTYPES = {
+    "bid_amount": "float32",
+    "base_price": "float32",
+    "quality_score": "float32",
+    TARGET_CLASS: "int8",
+    TARGET_PROFIT: "float32",
+    "rel_markup": "float32",
+}
+LOAD_CHUNK_ROWS = 500_000
 
 
 @dataclass
@@ -77,29 +92,146 @@ def safe_print(*args, **kwargs):
     sys.stdout.flush()
 
 
-def load_dataset(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow input and the Arrow cache need pyarrow: pip install pyarrow") from e
+    return pa
+
+
+def _source_kind(path: str) -> str:
+    name = path.lower()
+    if name.endswith((".parquet", ".pq")):
+        return "parquet"
+    if name.endswith((".arrow", ".feather", ".ipc")):
+        return "arrow"
+    return "csv"
+
+
+def dataset_files(path: str) -> list:
+    """
+    The files behind a dataset path: a single CSV / Parquet / Arrow file, or a directory of
+    parts (the files listed in its _manifest.json, else every data file in sorted order).
+    """
+    if not os.path.isdir(path):
+        return [path]
+    # manifest.json: directories written before the generator switched to _manifest.json
+    manifest = next((m for m in (os.path.join(path, n) for n in ("_manifest.json", "manifest.json"))
+                     if os.path.exists(m)), None)
+    if manifest is not None:
+        with open(manifest) as f:
+            names = json.load(f)["files"]
+    else:
+        names = sorted(n for n in os.listdir(path)
+                       if n.lower().endswith((".csv", ".parquet", ".pq", ".arrow", ".feather", ".ipc")))
+    if not names:
+        raise ValueError(f"No dataset files in {path}")
+    return [os.path.join(path, n) for n in names]
 
-    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+
+def _check_columns(columns, path: str):
+    missing = [c for c in REQUIRED_COLS if c not in columns]
     if missing:
-        raise ValueError(f"Missing required columns: {missing}")
+        raise ValueError(f"Missing required columns: {missing} ({path})")
+
+
+def _iter_raw_chunks(path: str, chunk_rows: int):
+    """Yield pandas frames of at most chunk_rows rows holding only REQUIRED_COLS."""
+    kind = _source_kind(path)
+    if kind == "csv":
+        _check_columns(pd.read_csv(path, nrows=0).columns, path)
+        yield from pd.read_csv(path, usecols=REQUIRED_COLS, chunksize=chunk_rows)
+    elif kind == "parquet":
+        _import_pyarrow()
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(path)
+        _check_columns(pf.schema_arrow.names, path)
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=REQUIRED_COLS):
+            yield batch.to_pandas()
+    else:
+        pa = _import_pyarrow()
+        # memory-mapped: slices stay zero-copy until converted to pandas
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        _check_columns(table.column_names, path)
+        table = table.select(REQUIRED_COLS)
+        for offset in range(0, table.num_rows, chunk_rows):
+            yield table.slice(offset, chunk_rows).to_pandas()
 
-    df = df.copy()
-    for c in ["bid_amount", "base_price", "quality_score"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
 
-    df[TARGET_CLASS] = pd.to_numeric(df[TARGET_CLASS], errors="coerce").fillna(0).astype(int)
+def _prepare_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Coerce, drop incomplete rows and add the derived columns, then downcast to LOAD_DTYPES."""
+    out = pd.DataFrame({c: pd.to_numeric(chunk[c], errors="coerce") for c in NUMERIC_COLS})
+    out[TARGET_CLASS] = pd.to_numeric(chunk[TARGET_CLASS], errors="coerce").fillna(0)
+    out = out.dropna(subset=NUMERIC_COLS)
 
-    df = df.dropna(subset=["bid_amount", "base_price", "quality_score", TARGET_CLASS])
+    # derived in the source precision, stored compact
+    out[TARGET_PROFIT] = out["bid_amount"] - out["base_price"]
+    out["rel_markup"] = out[TARGET_PROFIT] / out["base_price"]
+    return out.astype(LOAD_DTYPES)
 
-    # ✅ MUST BE HERE
-    df[TARGET_PROFIT] = df["bid_amount"] - df["base_price"]
 
-    # ✅ ADD RELATIVE FEATURE
-    df["rel_markup"] = (df["bid_amount"] - df["base_price"]) / df["base_price"]
+def _source_signature(files) -> str:
+    return json.dumps([[os.path.abspath(f), os.path.getsize(f), os.stat(f).st_mtime_ns] for f in files])
 
-    return df
 
+def _read_arrow_cache(cache_path: str, signature: str):
+    """The cached frame if cache_path was built from the same source files, else None."""
+    if not os.path.exists(cache_path):
+        return None
+    pa = _import_pyarrow()
+    table = pa.ipc.open_file(pa.memory_map(cache_path)).read_all()
+    meta = table.schema.metadata or {}
+    if meta.get(b"source", b"").decode() != signature:
+        return None
+    return table.to_pandas(split_blocks=True)
+
+
+def load_dataset(path: str, chunk_rows: int = LOAD_CHUNK_ROWS, cache_path: str | None = None) -> pd.DataFrame:
+    """
+    Load training data from a CSV, Parquet or Arrow file, or a directory of parts
+    (e.g. data_synthesizer.py --format parquet output), chunk_rows rows at a time.
+
+    Only REQUIRED_COLS are read; each chunk is cleaned, gets profit_if_won / rel_markup and
+    is downcast to LOAD_DTYPES (float32, int8 for won) before the next one is read, so peak
+    memory is about the compact result plus one raw chunk.
+
+    cache_path: optional Arrow IPC file. Reused (memory-mapped) when it was built from the
+    same source files, otherwise (re)written while loading.
+    """
+    files = dataset_files(path)
+    signature = _source_signature(files) if cache_path else None
+    if cache_path:
+        cached = _read_arrow_cache(cache_path, signature)
+        if cached is not None:
+            safe_print(f"Using dataset cache: {cache_path}")
+            return cached
+
+    pa = _import_pyarrow() if cache_path else None
+    writer = None
+    chunks = []
+    try:
+        for f in files:
+            for raw in _iter_raw_chunks(f, chunk_rows):
+                chunk = _prepare_chunk(raw)
+                del raw
+                chunks.append(chunk)
+                if pa is not None:
+                    batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+                        schema = batch.schema.with_metadata({"source": signature})
+                        writer = pa.ipc.new_file(cache_path + ".tmp", schema)
+                    writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is not None:
+        os.replace(cache_path + ".tmp", cache_path)
+    if not chunks:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in LOAD_DTYPES.items()})
+    return pd.concat(chunks, ignore_index=True)
 
 
 def make_synthetic_small_dataset(n=200, seed=SEED) -> pd.DataFrame:
@@ -298,6 +430,300 @@ def predict_profit_if_won_single(reg_pipe: Pipeline, bid_amount: float, base_pri
     return float(reg_pipe.predict(X)[0])
 
 
+def build_feature_frame(bid_amounts: np.ndarray, base_price: float, quality_score: float) -> pd.DataFrame:
+    """Feature matrix (FEATURES order) for a whole grid of bids on one tender."""
+    bids = np.asarray(bid_amounts, dtype=float)
+    return pd.DataFrame({
+        "rel_markup": (bids - base_price) / base_price,
+        "quality_score": np.full(bids.shape, float(quality_score)),
+    })
+
+
+def predict_win_prob_batch(clf_pipe: Pipeline, bid_amounts: np.ndarray, base_price: float, quality_score: float) -> np.ndarray:
+    X = build_feature_frame(bid_amounts, base_price, quality_score)
+    return np.asarray(predict_win_prob_safe(clf_pipe, X), dtype=float)
+
+
+def predict_profit_if_won_batch(reg_pipe: Pipeline, bid_amounts: np.ndarray, base_price: float, quality_score: float) -> np.ndarray:
+    X = build_feature_frame(bid_amounts, base_price, quality_score)
+    return np.asarray(reg_pipe.predict(X), dtype=float)
+
+
+
+# -----------------------------
+# Analytic fast path (StandardScaler + LogisticRegression, profit formula)
+# -----------------------------
+
+@dataclass(frozen=True)
+class LogisticParams:
+    """Logistic classifier folded back onto the raw FEATURES (rel_markup, quality_score)."""
+    coef: np.ndarray
+    intercept: float
+    mean: np.ndarray
+    scale: np.ndarray
+
+    def markup_line(self, quality_score):
+        """Return (k, c) such that the win logit is `k * rel_markup + c` at this quality."""
+        w = self.coef / self.scale
+        c = self.intercept - float(np.dot(w, self.mean)) + w[1] * np.asarray(quality_score, dtype=float)
+        return float(w[0]), c
+
+
+def extract_logistic_params(clf_pipe: Pipeline) -> LogisticParams | None:
+    """Pull scaler + logistic coefficients out of a fitted pipeline; None if it is not linear-logistic."""
+    steps = [est for _, est in clf_pipe.steps] if isinstance(clf_pipe, Pipeline) else [clf_pipe]
+    steps = [est for est in steps if est is not None and est != "passthrough"]
+    if not steps:
+        return None
+    *pre, est = steps
+    if not isinstance(est, LogisticRegression) or not hasattr(est, "coef_"):
+        return None
+    if not np.array_equal(est.classes_, [0, 1]) or est.coef_.shape != (1, len(FEATURES)):
+        return None
+    names = getattr(clf_pipe, "feature_names_in_", None)
+    if names is not None and list(names) != FEATURES:
+        return None
+
+    mean = np.zeros(len(FEATURES))
+    scale = np.ones(len(FEATURES))
+    for step in pre:
+        if not isinstance(step, StandardScaler):
+            return None
+        m = step.mean_ if step.with_mean else 0.0
+        sc = step.scale_ if step.with_std else 1.0
+        # (((x - mean) / scale) - m) / sc == (x - (mean + m * scale)) / (scale * sc)
+        mean = mean + m * scale
+        scale = scale * sc
+    return LogisticParams(
+        coef=np.asarray(est.coef_[0], dtype=float),
+        intercept=float(est.intercept_[0]),
+        mean=np.asarray(mean, dtype=float),
+        scale=np.asarray(scale, dtype=float),
+    )
+
+
+def _sigmoid(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def solve_optimal_markup(k: float, c, max_iter: int = 50, tol: float = 1e-12):
+    """
+    Markup r > 0 maximising r * sigmoid(k * r + c) for k < 0 (vectorized over c).
+
+    Works on the logit z = k * r + c, where the first-order condition is
+    h(z) = 1 + (z - c) * (1 - sigmoid(z)) = 0. h is increasing for z < c, so
+    Newton steps are kept inside a sign-change bracket and fall back to bisection.
+    """
+    c = np.asarray(c, dtype=float)
+    lo = np.minimum(c - 2.0, -50.0)
+    hi = c.copy()
+    z = c - 1.0
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(max_iter):
+            s_neg = _sigmoid(-z)  # 1 - sigmoid(z), without cancellation
+            t = z - c
+            h = 1.0 + t * s_neg
+            lo = np.where(h < 0, z, lo)
+            hi = np.where(h < 0, hi, z)
+            dh = s_neg * (1.0 - t * (1.0 - s_neg))
+            z_new = z - h / dh
+            outside = ~((z_new > lo) & (z_new < hi))
+            z_new = np.where(outside, 0.5 * (lo + hi), z_new)
+            done = np.all(np.abs(z_new - z) <= tol * (1.0 + np.abs(z)))
+            z = z_new
+            if done:
+                break
+    return (z - c) / k
+
+
+def optimize_bid_logistic(
+    params: LogisticParams,
+    base_price: float,
+    quality_score: float,
+    min_bid: float | None = None,
+    max_bid: float | None = None,
+    n_points: int = 201,
+    auto_expand: bool = True,
+) -> Dict[str, Any] | None:
+    """Closed-form optimum of p_win(bid) * (bid - base_price); None if win prob does not fall with markup."""
+    k, c = params.markup_line(quality_score)
+    c = float(c)
+    if not k < 0:
+        return None
+
+    L = float(min_bid) if min_bid is not None else base_price * 0.8
+    U = float(max_bid) if max_bid is not None else base_price * 1.2
+
+    # same ceiling the grid search reaches with its max of 8 x1.5 expansions
+    U_cap = U * 1.5 ** 8 if auto_expand else U
+    r_star = float(solve_optimal_markup(k, c))
+    best_bid = float(np.clip(base_price * (1.0 + r_star), L, max(L, U_cap)))
+
+    if auto_expand:
+        for _ in range(8):
+            if best_bid <= U:
+                break
+            L, U = U, U * 1.5
+
+    def exp_profit(bids):
+        r = (np.asarray(bids, dtype=float) - base_price) / base_price
+        return _sigmoid(k * r + c) * base_price * r
+
+    diag_bids = np.linspace(min(L, best_bid), max(U, best_bid), max(101, n_points))
+    p_win_best = float(_sigmoid(k * (best_bid - base_price) / base_price + c))
+
+    return {
+        "best_bid": best_bid,
+        "expected_profit_at_best": float(exp_profit(best_bid)),
+        "p_win_at_best": p_win_best,
+        "initial_bracket": [float(L), float(U)],
+        "auto_expanded": bool(auto_expand),
+        "diagnostic_bids": diag_bids.tolist(),
+        "diagnostic_exp_profit": [float(v) for v in exp_profit(diag_bids)],
+    }
+
+
+# -----------------------------
+# Quality-indexed optimal-markup table (profit formula)
+# -----------------------------
+# Under profit = bid - base_price, E[profit] = base_price * r * p_win(r, q), so the
+# optimal relative markup r* depends on quality only and can be tabulated once per model.
+
+TABLE_N_QUALITY = 1001
+TABLE_MAX_REL_MARKUP = 1.2 * 1.5 ** 8 - 1.0  # default bracket fully auto-expanded
+
+
+@dataclass(frozen=True)
+class MarkupTable:
+    version: str
+    quality: np.ndarray
+    rel_markup: np.ndarray
+    p_win: np.ndarray
+
+    def lookup(self, quality_score) -> Tuple[np.ndarray, np.ndarray]:
+        """Interpolated (optimal rel_markup, p_win at it); vectorized over quality_score."""
+        q = np.clip(np.asarray(quality_score, dtype=float), self.quality[0], self.quality[-1])
+        return np.interp(q, self.quality, self.rel_markup), np.interp(q, self.quality, self.p_win)
+
+
+# Tables of hot-reloaded model versions are only reachable through the version LRU, so a
+# long-running worker keeps at most TABLE_CACHE_SIZE of them.
+TABLE_CACHE_SIZE = 4
+_TABLES_BY_MODEL: "weakref.WeakKeyDictionary[Any, Dict[Tuple[int, float], MarkupTable]]" = weakref.WeakKeyDictionary()
+_TABLES_BY_VERSION: "OrderedDict[str, MarkupTable]" = OrderedDict()
+
+
+def model_version(clf_pipe: Pipeline) -> str:
+    return joblib.hash(clf_pipe)
+
+
+def _table_version(clf_pipe: Pipeline, n_quality: int, max_rel_markup: float) -> str:
+    return f"{model_version(clf_pipe)}-q{n_quality}-r{max_rel_markup:g}"
+
+
+def build_markup_table(
+    clf_pipe: Pipeline,
+    n_quality: int = TABLE_N_QUALITY,
+    max_rel_markup: float = TABLE_MAX_REL_MARKUP,
+    n_markup: int = 4001,
+    chunk: int = 50,
+) -> MarkupTable:
+    quality = np.linspace(0.0, 1.0, n_quality)
+    version = _table_version(clf_pipe, n_quality, max_rel_markup)
+
+    params = extract_logistic_params(clf_pipe)
+    k = params.markup_line(0.0)[0] if params is not None else None
+    if k is not None and k < 0:
+        _, c = params.markup_line(quality)
+        r_opt = np.clip(solve_optimal_markup(k, c), 0.0, max_rel_markup)
+        return MarkupTable(version, quality, r_opt, _sigmoid(k * r_opt + c))
+
+    # generic classifier: coarse (quality x markup) grid scored in chunks, then a local
+    # grid around each row's argmax
+    r_grid = np.linspace(0.0, max_rel_markup, n_markup)
+    step = r_grid[1] - r_grid[0]
+    offsets = np.linspace(-step, step, 41)
+    r_opt = np.empty(n_quality)
+    p_opt = np.empty(n_quality)
+    for start in range(0, n_quality, chunk):
+        qs = quality[start:start + chunk]
+        R, Q = np.meshgrid(r_grid, qs)
+        p = predict_win_prob_safe(clf_pipe, pd.DataFrame({"rel_markup": R.ravel(), "quality_score": Q.ravel()}))
+        i = np.nanargmax((R.ravel() * p).reshape(R.shape), axis=1)
+
+        R2 = np.clip(r_grid[i][:, None] + offsets[None, :], 0.0, max_rel_markup)
+        Q2 = np.broadcast_to(qs[:, None], R2.shape)
+        p2 = predict_win_prob_safe(clf_pipe, pd.DataFrame({"rel_markup": R2.ravel(), "quality_score": Q2.ravel()}))
+        p2 = np.asarray(p2, dtype=float).reshape(R2.shape)
+        j = np.nanargmax(R2 * p2, axis=1)
+        rows = np.arange(len(qs))
+        r_opt[start:start + chunk] = R2[rows, j]
+        p_opt[start:start + chunk] = p2[rows, j]
+    return MarkupTable(version, quality, r_opt, p_opt)
+
+
+def get_markup_table(clf_pipe: Pipeline, **kwargs) -> MarkupTable:
+    """Cached table for this model; rebuilt only when the model content (version) changes."""
+    key = (kwargs.get("n_quality", TABLE_N_QUALITY), kwargs.get("max_rel_markup", TABLE_MAX_REL_MARKUP))
+    per_model = _TABLES_BY_MODEL.setdefault(clf_pipe, {})
+    table = per_model.get(key)
+    if table is None:
+        version = _table_version(clf_pipe, *key)
+        table = _TABLES_BY_VERSION.pop(version, None)
+        if table is None:
+            table = build_markup_table(clf_pipe, **kwargs)
+        _TABLES_BY_VERSION[version] = table
+        while len(_TABLES_BY_VERSION) > TABLE_CACHE_SIZE:
+            _TABLES_BY_VERSION.popitem(last=False)
+        per_model[key] = table
+    return table
+
+
+def optimize_bid_from_table(
+    table: MarkupTable,
+    clf_pipe: Pipeline,
+    base_price: float,
+    quality_score: float,
+    min_bid: float | None = None,
+    max_bid: float | None = None,
+    n_points: int = 201,
+    auto_expand: bool = True,
+    diagnostics: bool = True,
+) -> Dict[str, Any]:
+    L = float(min_bid) if min_bid is not None else base_price * 0.8
+    U = float(max_bid) if max_bid is not None else base_price * 1.2
+    U_cap = U * 1.5 ** 8 if auto_expand else U
+
+    r_star, p_star = table.lookup(quality_score)
+    best_bid = float(base_price * (1.0 + r_star))
+    p_win_best = float(p_star)
+    if not L <= best_bid <= U_cap:
+        # optimum outside the allowed bracket: E[profit] is unimodal in the bid, so the edge wins
+        best_bid = float(np.clip(best_bid, L, max(L, U_cap)))
+        p_win_best = predict_win_prob_single(clf_pipe, best_bid, base_price, quality_score)
+
+    if auto_expand:
+        for _ in range(8):
+            if best_bid <= U:
+                break
+            L, U = U, U * 1.5
+
+    out = {
+        "best_bid": best_bid,
+        "expected_profit_at_best": float(p_win_best * (best_bid - base_price)),
+        "p_win_at_best": p_win_best,
+        "initial_bracket": [float(L), float(U)],
+        "auto_expanded": bool(auto_expand),
+        "diagnostic_bids": [],
+        "diagnostic_exp_profit": [],
+    }
+    if diagnostics:
+        diag_bids = np.linspace(min(L, best_bid), max(U, best_bid), max(101, n_points))
+        diag_vals = predict_win_prob_batch(clf_pipe, diag_bids, base_price, quality_score) * (diag_bids - base_price)
+        out["diagnostic_bids"] = diag_bids.tolist()
+        out["diagnostic_exp_profit"] = [float(v) for v in diag_vals]
+    return out
+
 
 def optimize_bid(
     clf_pipe: Pipeline,
@@ -311,22 +737,44 @@ def optimize_bid(
     tol_rel: float = 1e-3,
     min_pwin: float = 1e-4,
     use_profit_formula: bool = False,
+    n_refine: int = 21,
+    analytic: bool = True,
+    markup_table: MarkupTable | None = None,
 ) -> Dict[str, Any]:
     if base_price <= 0:
         raise ValueError("base_price must be > 0")
 
-    def exp_profit_at(bid: float) -> float:
-        p = predict_win_prob_single(clf_pipe, bid, base_price, quality_score)
-        prof = (bid - base_price) if use_profit_formula else \
-               predict_profit_if_won_single(reg_pipe, bid, base_price, quality_score)
-        return float(p * prof)
+    if use_profit_formula and markup_table is not None:
+        return optimize_bid_from_table(
+            markup_table, clf_pipe, base_price, quality_score, min_bid=min_bid, max_bid=max_bid,
+            n_points=n_points, auto_expand=auto_expand,
+        )
+
+    # analytic fast path; the generic search below only runs for non linear-logistic models
+    if use_profit_formula and analytic:
+        params = extract_logistic_params(clf_pipe)
+        if params is not None:
+            out = optimize_bid_logistic(
+                params, base_price, quality_score, min_bid=min_bid, max_bid=max_bid,
+                n_points=n_points, auto_expand=auto_expand,
+            )
+            if out is not None:
+                return out
+
+    def exp_profit_grid(bids: np.ndarray) -> np.ndarray:
+        # one predict_proba (and one predict) call for the whole grid
+        bids = np.asarray(bids, dtype=float)
+        p = predict_win_prob_batch(clf_pipe, bids, base_price, quality_score)
+        prof = (bids - base_price) if use_profit_formula else \
+               predict_profit_if_won_batch(reg_pipe, bids, base_price, quality_score)
+        return p * prof
 
     L = float(min_bid) if min_bid is not None else base_price * 0.8
     U = float(max_bid) if max_bid is not None else base_price * 1.2
 
     def coarse_search(l, u, n=n_points):
         bids = np.linspace(l, u, n)
-        vals = np.array([exp_profit_at(b) for b in bids])
+        vals = exp_profit_grid(bids)
         i = int(np.nanargmax(vals))
         return bids[i], float(vals[i]), bids, vals
 
@@ -356,36 +804,27 @@ def optimize_bid(
     a = max(base_price * 0.5, best_bid - span)
     b = best_bid + span
 
-    phi = (1 + 5 ** 0.5) / 2
-    resphi = 2 - phi
-    x1 = a + resphi * (b - a)
-    x2 = b - resphi * (b - a)
-    f1 = exp_profit_at(x1)
-    f2 = exp_profit_at(x2)
-
-    for _ in range(50):
-        if f1 < f2:
-            a = x1
-            x1 = x2
-            f1 = f2
-            x2 = b - resphi * (b - a)
-            f2 = exp_profit_at(x2)
-        else:
-            b = x2
-            x2 = x1
-            f2 = f1
-            x1 = a + resphi * (b - a)
-            f1 = exp_profit_at(x1)
+    # batched bracket refinement: every round scores a full grid over [a, b] in one
+    # call and shrinks the bracket to the neighbours of the grid argmax
+    x_ref, f_ref = best_bid, best_val
+    for _ in range(12):
+        xs = np.linspace(a, b, n_refine)
+        fs = exp_profit_grid(xs)
+        i = int(np.nanargmax(fs))
+        if fs[i] > f_ref:
+            x_ref, f_ref = float(xs[i]), float(fs[i])
+        step = (b - a) / (n_refine - 1)
+        a, b = max(a, xs[i] - step), min(b, xs[i] + step)
         if abs(b - a) <= max(1e-6, tol_rel * max(best_bid, 1.0)):
             break
 
-    candidates = [(best_bid, best_val), (x1, f1), (x2, f2)]
+    candidates = [(best_bid, best_val), (x_ref, f_ref)]
     final_bid, final_val = max(candidates, key=lambda t: t[1])
 
     diag_L = min(a, L)
     diag_U = max(b, U)
     diag_bids = np.linspace(diag_L, diag_U, max(101, n_points))
-    diag_vals = [exp_profit_at(x) for x in diag_bids]
+    diag_vals = exp_profit_grid(diag_bids)
 
     p_win_best = predict_win_prob_single(clf_pipe, final_bid, base_price, quality_score)
 
@@ -407,13 +846,164 @@ def optimize_bid(
 
 
 
+def optimize_bids_batch(
+    clf_pipe: Pipeline,
+    reg_pipe: Pipeline,
+    base_prices: np.ndarray,
+    quality_scores: np.ndarray,
+    min_bids: np.ndarray | None = None,
+    max_bids: np.ndarray | None = None,
+    n_points: int = 201,
+    auto_expand: bool = True,
+    tol_rel: float = 1e-3,
+    min_pwin: float = 1e-4,
+    use_profit_formula: bool = False,
+    n_refine: int = 21,
+    markup_table: MarkupTable | None = None,
+) -> Dict[str, np.ndarray]:
+    """
+    optimize_bid for many tenders at once. Every search stage is a 2-D
+    (tender x bid-grid) array scored with a single predict_proba/predict call.
+    NaN in min_bids/max_bids means "use the default bracket" for that row.
+    With use_profit_formula and a markup_table the rows are looked up in the
+    table instead, giving the same results as optimize_bid with that table.
+    """
+    base = np.asarray(base_prices, dtype=float)
+    q = np.asarray(quality_scores, dtype=float)
+    if np.any(~(base > 0)):
+        raise ValueError("base_price must be > 0")
+    n = len(base)
+    L = base * 0.8 if min_bids is None else np.where(np.isnan(min_bids), base * 0.8, min_bids).astype(float)
+    U = base * 1.2 if max_bids is None else np.where(np.isnan(max_bids), base * 1.2, max_bids).astype(float)
+
+    if use_profit_formula and markup_table is not None:
+        return _optimize_bids_from_table(markup_table, clf_pipe, base, q, L, U, auto_expand)
+
+    def exp_profit_grid(bids: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        b0 = base[rows, None]
+        X = pd.DataFrame({
+            "rel_markup": ((bids - b0) / b0).ravel(),
+            "quality_score": np.broadcast_to(q[rows, None], bids.shape).ravel(),
+        })
+        p = np.asarray(predict_win_prob_safe(clf_pipe, X), dtype=float).reshape(bids.shape)
+        prof = (bids - b0) if use_profit_formula else np.asarray(reg_pipe.predict(X), dtype=float).reshape(bids.shape)
+        return p * prof
+
+    def grid(lo: np.ndarray, hi: np.ndarray, m: int) -> np.ndarray:
+        return lo[:, None] + (hi - lo)[:, None] * np.linspace(0.0, 1.0, m)[None, :]
+
+    all_rows = np.arange(n)
+    bids = grid(L, U, n_points)
+    vals = exp_profit_grid(bids, all_rows)
+    i = np.nanargmax(vals, axis=1)
+    best_bid = bids[all_rows, i]
+    best_val = vals[all_rows, i]
+    at_edge = i >= n_points - 2
+
+    if auto_expand:
+        m = max(51, n_points // 2)
+        for _ in range(8):
+            rows = all_rows[at_edge]
+            if len(rows) == 0:
+                break
+            new_U = U[rows] * 1.5
+            p_edge = predict_win_prob_safe(clf_pipe, pd.DataFrame({
+                "rel_markup": (new_U - base[rows]) / base[rows],
+                "quality_score": q[rows],
+            }))
+            rows, new_U = rows[p_edge >= min_pwin], new_U[p_edge >= min_pwin]
+            if len(rows) == 0:
+                break
+            bids2 = grid(U[rows], new_U, m)
+            vals2 = exp_profit_grid(bids2, rows)
+            j = np.nanargmax(vals2, axis=1)
+            cand_val = vals2[np.arange(len(rows)), j]
+            better = cand_val > best_val[rows] * (1.0 + tol_rel)
+            rows, j, new_U = rows[better], j[better], new_U[better]
+            L[rows], U[rows] = U[rows], new_U
+            best_bid[rows] = bids2[better][np.arange(len(rows)), j]
+            best_val[rows] = cand_val[better]
+            at_edge = np.zeros(n, dtype=bool)
+            at_edge[rows] = j >= m - 2
+
+    # batched bracket refinement, all tenders per round
+    span = np.maximum(1.0, 0.1 * np.maximum(best_bid, 1.0))
+    a = np.maximum(base * 0.5, best_bid - span)
+    b = best_bid + span
+    tol = np.maximum(1e-6, tol_rel * np.maximum(best_bid, 1.0))
+    x_ref, f_ref = best_bid.copy(), best_val.copy()
+    for _ in range(12):
+        xs = grid(a, b, n_refine)
+        fs = exp_profit_grid(xs, all_rows)
+        k = np.nanargmax(fs, axis=1)
+        xk, fk = xs[all_rows, k], fs[all_rows, k]
+        better = fk > f_ref
+        x_ref[better], f_ref[better] = xk[better], fk[better]
+        step = (b - a) / (n_refine - 1)
+        a, b = np.maximum(a, xk - step), np.minimum(b, xk + step)
+        if np.all(np.abs(b - a) <= tol):
+            break
+
+    X_best = pd.DataFrame({"rel_markup": (x_ref - base) / base, "quality_score": q})
+    p_win_best = np.asarray(predict_win_prob_safe(clf_pipe, X_best), dtype=float)
+    prof_best = (x_ref - base) if use_profit_formula else np.asarray(reg_pipe.predict(X_best), dtype=float)
+    return {
+        "best_bid": x_ref,
+        "expected_profit_at_best": f_ref,
+        "p_win_at_best": p_win_best,
+        "profit_if_won_at_best": prof_best,
+        "bracket_low": L,
+        "bracket_high": U,
+    }
+
+
+
+def _optimize_bids_from_table(table: MarkupTable, clf_pipe: Pipeline, base: np.ndarray, q: np.ndarray,
+                              L: np.ndarray, U: np.ndarray, auto_expand: bool) -> Dict[str, np.ndarray]:
+    """optimize_bid_from_table (without diagnostics) for arrays of tenders."""
+    U_cap = U * 1.5 ** 8 if auto_expand else U.copy()
+    r_star, p_win_best = table.lookup(q)
+    best_bid = base * (1.0 + r_star)
+    # optimum outside the allowed bracket: E[profit] is unimodal in the bid, so the edge wins
+    outside = ~((L <= best_bid) & (best_bid <= U_cap))
+    if np.any(outside):
+        best_bid = np.where(outside, np.clip(best_bid, L, np.maximum(L, U_cap)), best_bid)
+        p_win_best = p_win_best.copy()
+        p_win_best[outside] = predict_win_prob_safe(clf_pipe, pd.DataFrame({
+            "rel_markup": (best_bid[outside] - base[outside]) / base[outside],
+            "quality_score": q[outside],
+        }))
+
+    L, U = L.copy(), U.copy()
+    if auto_expand:
+        for _ in range(8):
+            rows = best_bid > U
+            if not np.any(rows):
+                break
+            L[rows], U[rows] = U[rows], U[rows] * 1.5
+
+    return {
+        "best_bid": best_bid,
+        "expected_profit_at_best": p_win_best * (best_bid - base),
+        "p_win_at_best": p_win_best,
+        "profit_if_won_at_best": best_bid - base,
+        "bracket_low": L,
+        "bracket_high": U,
+    }
+
+
 # -----------------------------
 # CLI
 # -----------------------------
 
 def main():
     p = argparse.ArgumentParser(description="Train and run bid optimization pipeline (final, robust).")
-    p.add_argument("--csv", type=str, help="Path to CSV with columns: bid_amount, base_price, quality_score, won")
+    p.add_argument("--csv", "--data", dest="csv", type=str,
+                   help="Training data with columns bid_amount, base_price, quality_score, won: "
+                        "a CSV / Parquet / Arrow file or a directory of parts")
+    p.add_argument("--cache", type=str, default=None,
+                   help="Arrow cache file for the cleaned dataset, reused across runs (needs pyarrow)")
+    p.add_argument("--chunk_rows", type=int, default=LOAD_CHUNK_ROWS, help="Rows read and converted per chunk")
     p.add_argument("--dry_run", action="store_true", help="Run on a synthetic small dataset (no csv required)")
     p.add_argument("--regressor", choices=["ridge", "rf"], default="ridge", help="Regressor type")
     p.add_argument("--oversample", action="store_true", help="Apply simple random oversampling to increase positive ratio")
@@ -441,8 +1031,8 @@ def main():
         safe_print("Running dry run with synthetic dataset...")
         df = make_synthetic_small_dataset(n=200, seed=SEED)
     else:
-        safe_print(f"Loading CSV: {args.csv}")
-        df = load_dataset(args.csv)
+        safe_print(f"Loading data: {args.csv}")
+        df = load_dataset(args.csv, chunk_rows=args.chunk_rows, cache_path=args.cache)
 
     safe_print(f"Loaded data: n={len(df)}, wins={int(df['won'].sum())}, win_ratio={df['won'].mean():.3f}")
 
@@ -12,30 +12,46 @@ Optional extras included: vendor_id, vendor_type, vendor_rating, date
 Usage examples:
   python generate_realistic_bids.py --n 5000 --outfile synthetic_bids.csv --seed 42
 
+Large datasets are generated in independent seeded chunks by a pool of worker
+processes and written as partitioned Parquet / Arrow files (needs pyarrow); memory
+stays bounded by chunk_size * workers:
+  python data_synthesizer.py --n 100000000 --format parquet --outdir bids_parquet --workers 8
+
 This file is safe to drop in your project and run.
 """
 
 from __future__ import annotations
 import argparse
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 
 
-def generate_realistic_bids_enhanced(n=5000, seed=42, outfile="synthetic_bids_enh.csv",
-                                     n_vendors=200, drift_years=1.0,
-                                     outlier_frac=0.002, missing_frac=0.005):
-    rng = np.random.default_rng(seed)
+# Chunked output is anchored here (not at "now") so a seed always gives the same dates.
+DEFAULT_END_DATE = "2025-01-01"
+DEFAULT_CHUNK_SIZE = 1_000_000
+# leading underscore: pyarrow dataset discovery (pd.read_parquet(outdir)) skips it
+MANIFEST_NAME = "_manifest.json"
 
+
+def _simulate_bids(rng, n, start, drift_days, n_vendors=200,
+                   outlier_frac=0.002, missing_frac=0.005, logit_noise=None):
+    """
+    n rows of the bid model, dates from `start` (datetime64) + [0, drift_days) days.
+    logit_noise: the shared noise term of the win logit; drawn from rng when None.
+    """
     # vendor-level heterogeneity
     vendor_ids = rng.integers(0, n_vendors, size=n)
     vendor_type = (vendor_ids % 3)  # 0=lowcost,1=balanced,2=premium
     vendor_rating = np.clip(rng.normal(3.5 + 0.8 * (vendor_type == 2), 0.6, size=n), 1.0, 5.0)
 
-    # time (simulate tenders over time)
-    start = datetime.now() - timedelta(days=int(365 * drift_years))
-    days = rng.integers(0, int(365 * drift_years), size=n)
-    date = [start + timedelta(days=int(d)) for d in days]
+    # time (simulate tenders over time), vectorized datetime64 arithmetic
+    days = rng.integers(0, drift_days, size=n)
+    date = start + days.astype("timedelta64[D]")
 
     # base_price depends on vendor_type (premiums handle larger tenders)
     base_price = rng.uniform(40000, 120000, size=n) * (1.0 + 0.6 * (vendor_type == 2))
@@ -50,22 +66,23 @@ def generate_realistic_bids_enhanced(n=5000, seed=42, outfile="synthetic_bids_en
     markup = np.clip(markup, -0.05, 0.5)
     bid_amount = np.round(base_price * (1.0 + markup), 2)
 
+    if logit_noise is None:
+        logit_noise = rng.normal(0, 0.4)
+
     # Logistic win model with vendor reputation and date drift
-    day_norm = (days - days.min()) / max(1, (days.max() - days.min()))
-    drift = 0.2 * day_norm
     logits = (
         -2.0                                          # lower base win rate
         + 4.0 * quality_score                         # high quality helps
         - 0.00003 * (bid_amount - base_price)         # bidding higher DROPS win chance strongly
         + 0.3 * (vendor_rating - 3.5)                 # vendor reputation matters but not too much
-        + rng.normal(0, 0.4)                          # noise for randomness
+        + logit_noise                                 # noise for randomness
     )
 
     prob_win = 1.0 / (1.0 + np.exp(-logits))
     won = (rng.random(size=n) < prob_win).astype(int)
 
     df = pd.DataFrame({
-        "date": pd.to_datetime(date),
+        "date": date,
         "vendor_id": vendor_ids,
         "vendor_type": vendor_type,
         "vendor_rating": np.round(vendor_rating, 2),
@@ -86,11 +103,111 @@ def generate_realistic_bids_enhanced(n=5000, seed=42, outfile="synthetic_bids_en
         miss_idx = rng.choice(n, size=m, replace=False)
         df.loc[miss_idx, "quality_score"] = np.nan
 
+    return df
+
+
+def generate_realistic_bids_enhanced(n=5000, seed=42, outfile="synthetic_bids_enh.csv",
+                                     n_vendors=200, drift_years=1.0,
+                                     outlier_frac=0.002, missing_frac=0.005):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(datetime.now() - timedelta(days=int(365 * drift_years)), "us")
+    df = _simulate_bids(rng, n, start, int(365 * drift_years), n_vendors=n_vendors,
+                        outlier_frac=outlier_frac, missing_frac=missing_frac)
+
     # final CSV
     df.to_csv(outfile, index=False)
     return df
 
 
+# -----------------------------
+# Chunked generation (Parquet / Arrow)
+# -----------------------------
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow output needs pyarrow: pip install pyarrow") from e
+
+
+def _write_chunk(spec):
+    """Generate and write one partition in a worker process; returns (path, rows)."""
+    import pyarrow as pa
+
+    rng = np.random.default_rng(spec["seed_seq"])
+    df = _simulate_bids(rng, spec["n"], np.datetime64(spec["start"], "D"), spec["drift_days"],
+                        n_vendors=spec["n_vendors"], outlier_frac=spec["outlier_frac"],
+                        missing_frac=spec["missing_frac"], logit_noise=spec["logit_noise"])
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if spec["format"] == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, spec["path"], compression="zstd")
+    else:
+        with pa.OSFile(spec["path"], "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return spec["path"], len(df)
+
+
+def generate_bids_chunked(n, outdir, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                          fmt="parquet", n_vendors=200, drift_years=1.0,
+                          outlier_frac=0.002, missing_frac=0.005, end_date=DEFAULT_END_DATE):
+    """
+    Write n rows as part-NNNNN.parquet (or .arrow) files of chunk_size rows in outdir.
+
+    Chunk i is generated from np.random.SeedSequence(seed, spawn_key=(1, i)), so the output
+    depends only on (seed, n, chunk_size, options) -- not on the number of workers.
+    Returns the manifest that is also written to outdir/_manifest.json.
+    """
+    if fmt not in ("parquet", "arrow"):
+        raise ValueError("fmt must be 'parquet' or 'arrow'")
+    if n < 1 or chunk_size < 1:
+        raise ValueError("n and chunk_size must be at least 1")
+    _require_pyarrow()
+    os.makedirs(outdir, exist_ok=True)
+
+    drift_days = int(365 * drift_years)
+    start = str(np.datetime64(end_date, "D") - np.timedelta64(drift_days, "D"))
+    n_chunks = (n + chunk_size - 1) // chunk_size
+    # one shared logit noise term (like the in-memory generator's single draw), then one
+    # independent stream per chunk
+    logit_noise = float(np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(0,))).normal(0, 0.4))
+    chunk_seqs = [np.random.SeedSequence(seed, spawn_key=(1, i)) for i in range(n_chunks)]
+
+    ext = "parquet" if fmt == "parquet" else "arrow"
+    specs = [
+        dict(
+            seed_seq=chunk_seqs[i], n=min(chunk_size, n - i * chunk_size), start=start, drift_days=drift_days,
+            n_vendors=n_vendors, outlier_frac=outlier_frac, missing_frac=missing_frac,
+            logit_noise=logit_noise, format=fmt, path=os.path.join(outdir, f"part-{i:05d}.{ext}"),
+        )
+        for i in range(n_chunks)
+    ]
+
+    workers = min(workers or os.cpu_count() or 1, n_chunks)
+    if workers <= 1:
+        written = [_write_chunk(spec) for spec in specs]
+    else:
+        # spawn: same start method as the backend's pools; each worker holds one chunk at a time
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            written = list(pool.map(_write_chunk, specs))
+
+    manifest = {
+        "rows": int(sum(rows for _, rows in written)),
+        "files": [os.path.basename(path) for path, _ in written],
+        "format": fmt,
+        "seed": seed,
+        "chunk_size": chunk_size,
+        "n_vendors": n_vendors,
+        "drift_years": drift_years,
+        "outlier_frac": outlier_frac,
+        "missing_frac": missing_frac,
+        "end_date": end_date,
+    }
+    with open(os.path.join(outdir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
 def validate_dataset(df: pd.DataFrame) -> dict:
     checks = {}
     checks['n'] = len(df)
@@ -109,8 +226,28 @@ if __name__ == '__main__':
     parser.add_argument('--seed', type=int, default=42)
     parser.add_argument('--n_vendors', type=int, default=200)
     parser.add_argument('--drift_years', type=float, default=1.0)
+    parser.add_argument('--format', choices=['csv', 'parquet', 'arrow'], default='csv',
+                        help='parquet/arrow: chunked generation into --outdir')
+    parser.add_argument('--outdir', type=str, default='synthetic_bids_parts')
+    parser.add_argument('--chunk_size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--end_date', type=str, default=DEFAULT_END_DATE)
     args = parser.parse_args()
-
-    df = generate_realistic_bids_enhanced(n=args.n, seed=args.seed, outfile=args.outfile, n_vendors=args.n_vendors, drift_years=args.drift_years)
-    print('Generated:', args.outfile)
-    print('Validations:', validate_dataset(df))
+    if args.n < 1:
+        parser.error('--n must be at least 1')
+    if args.chunk_size < 1:
+        parser.error('--chunk_size must be at least 1')
+
+    if args.format == 'csv':
+        df = generate_realistic_bids_enhanced(n=args.n, seed=args.seed, outfile=args.outfile, n_vendors=args.n_vendors, drift_years=args.drift_years)
+        print('Generated:', args.outfile)
+        print('Validations:', validate_dataset(df))
+    else:
+        manifest = generate_bids_chunked(
+            args.n, args.outdir, seed=args.seed, chunk_size=args.chunk_size, workers=args.workers,
+            fmt=args.format, n_vendors=args.n_vendors, drift_years=args.drift_years, end_date=args.end_date,
+        )
+        print(f"Generated: {manifest['rows']} rows in {len(manifest['files'])} files under {args.outdir}")
+        first = os.path.join(args.outdir, manifest['files'][0])
+        sample = pd.read_parquet(first) if args.format == 'parquet' else pd.read_feather(first)
+        print('Validations (first part):', validate_dataset(sample))
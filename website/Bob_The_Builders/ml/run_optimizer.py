@@ -52,6 +52,27 @@ def predict_profit_if_won_single(reg_pipe, bid_amount, base_price, quality_score
     return float(reg_pipe.predict(X)[0])
 
 
+def build_feature_frame(bid_amounts, base_price, quality_score):
+    bids = np.asarray(bid_amounts, dtype=float)
+    return pd.DataFrame({
+        "rel_markup": (bids - base_price) / base_price,
+        "quality_score": np.full(bids.shape, float(quality_score)),
+    })
+
+
+def predict_win_prob_batch(clf_pipe, bid_amounts, base_price, quality_score):
+    X = build_feature_frame(bid_amounts, base_price, quality_score)
+    try:
+        return np.asarray(clf_pipe.predict_proba(X)[:, 1], dtype=float)
+    except:
+        return np.asarray(clf_pipe.predict(X), dtype=float)
+
+
+def predict_profit_if_won_batch(reg_pipe, bid_amounts, base_price, quality_score):
+    X = build_feature_frame(bid_amounts, base_price, quality_score)
+    return np.asarray(reg_pipe.predict(X), dtype=float)
+
+
 
 # -------------------------------------------------------------
 # ✅ YOUR EXACT OPTIMIZER FUNCTION (copy-paste exactly as below)
@@ -68,22 +89,25 @@ def optimize_bid(
     tol_rel: float = 1e-3,
     min_pwin: float = 1e-4,
     use_profit_formula: bool = False,
+    n_refine: int = 21,
 ) -> Dict[str, Any]:
     if base_price <= 0:
         raise ValueError("base_price must be > 0")
 
-    def exp_profit_at(bid: float) -> float:
-        p = predict_win_prob_single(clf_pipe, bid, base_price, quality_score)
-        prof = (bid - base_price) if use_profit_formula else \
-               predict_profit_if_won_single(reg_pipe, bid, base_price, quality_score)
-        return float(p * prof)
+    def exp_profit_grid(bids: np.ndarray) -> np.ndarray:
+        # one predict_proba (and one predict) call for the whole grid
+        bids = np.asarray(bids, dtype=float)
+        p = predict_win_prob_batch(clf_pipe, bids, base_price, quality_score)
+        prof = (bids - base_price) if use_profit_formula else \
+               predict_profit_if_won_batch(reg_pipe, bids, base_price, quality_score)
+        return p * prof
 
     L = float(min_bid) if min_bid is not None else base_price * 0.8
     U = float(max_bid) if max_bid is not None else base_price * 1.2
 
     def coarse_search(l, u, n=n_points):
         bids = np.linspace(l, u, n)
-        vals = np.array([exp_profit_at(b) for b in bids])
+        vals = exp_profit_grid(bids)
         i = int(np.nanargmax(vals))
         return bids[i], float(vals[i]), bids, vals
 
@@ -113,37 +137,28 @@ def optimize_bid(
     a = max(base_price * 0.5, best_bid - span)
     b = best_bid + span
 
-    phi = (1 + 5 ** 0.5) / 2
-    resphi = 2 - phi
-    x1 = a + resphi * (b - a)
-    x2 = b - resphi * (b - a)
-    f1 = exp_profit_at(x1)
-    f2 = exp_profit_at(x2)
-
-    for _ in range(50):
-        if f1 < f2:
-            a = x1
-            x1 = x2
-            f1 = f2
-            x2 = b - resphi * (b - a)
-            f2 = exp_profit_at(x2)
-        else:
-            b = x2
-            x2 = x1
-            f2 = f1
-            x1 = a + resphi * (b - a)
-            f1 = exp_profit_at(x1)
+    # batched bracket refinement: every round scores a full grid over [a, b] in one
+    # call and shrinks the bracket to the neighbours of the grid argmax
+    x_ref, f_ref = best_bid, best_val
+    for _ in range(12):
+        xs = np.linspace(a, b, n_refine)
+        fs = exp_profit_grid(xs)
+        i = int(np.nanargmax(fs))
+        if fs[i] > f_ref:
+            x_ref, f_ref = float(xs[i]), float(fs[i])
+        step = (b - a) / (n_refine - 1)
+        a, b = max(a, xs[i] - step), min(b, xs[i] + step)
         if abs(b - a) <= max(1e-6, tol_rel * max(best_bid, 1.0)):
             break
 
-    candidates = [(best_bid, best_val), (x1, f1), (x2, f2)]
+    candidates = [(best_bid, best_val), (x_ref, f_ref)]
     final_bid, final_val = max(candidates, key=lambda t: t[1])
 
     # diagnostic sweep
     diag_L = min(a, L)
     diag_U = max(b, U)
     diag_bids = np.linspace(diag_L, diag_U, max(101, n_points))
-    diag_vals = [exp_profit_at(x) for x in diag_bids]
+    diag_vals = exp_profit_grid(diag_bids)
 
     p_win_best = predict_win_prob_single(clf_pipe, final_bid, base_price, quality_score)
 
@@ -1,3 +1,4 @@
+import bisect
 import os
 import re
 import json
@@ -88,6 +89,76 @@ KEYWORDS: Dict[str, List[str]] = {
 }
 
 
+# ---------------- Keyword Matcher ----------------
+NUMERIC_RE = re.compile(r"[₹\d]")
+
+
+def _keyword_pattern(kw: str) -> str:
+    # fuzzy keyword matching: spaces may be OCR'd as dots / extra whitespace
+    return r"\b" + re.escape(kw).replace(r"\ ", r"[\s\.]*") + r"\b"
+
+
+class KeywordMatcher:
+    """
+    All KEYWORDS compiled once. A single combined look-ahead alternation finds every
+    position where some keyword may start; only those positions are checked against
+    the individual keyword patterns, so a document is scanned once regardless of the
+    number of params/keywords.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.params = list(keywords)
+        # keyword patterns indexed by their first character: a match starting at pos can only
+        # come from keywords starting with text[pos]. (Not by leading word: the separator
+        # may match nothing, so "estimated cost" also matches OCR-collapsed "estimatedcost".)
+        self.by_first: Dict[str, List[Tuple[str, "re.Pattern[str]"]]] = {}
+        for param, kws in keywords.items():
+            for kw in kws:
+                self.by_first.setdefault(kw[0], []).append((param, re.compile(_keyword_pattern(kw))))
+        self.candidates = re.compile(
+            "(?=" + "|".join(_keyword_pattern(kw) for kws in keywords.values() for kw in kws) + ")"
+        )
+
+    def hits(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """{param: [(start, shortest end), ...]} for every keyword match start in text."""
+        out: Dict[str, List[Tuple[int, int]]] = {p: [] for p in self.params}
+        for cand in self.candidates.finditer(text):
+            pos = cand.start()
+            best: Dict[str, int] = {}
+            for param, pat in self.by_first.get(text[pos], ()):
+                m = pat.match(text, pos)
+                if m and (param not in best or m.end() < best[param]):
+                    best[param] = m.end()
+            for param, end in best.items():
+                out[param].append((pos, end))
+        return out
+
+    def window_hits(self, lower_lines: List[str], span: int = 3) -> Dict[str, List[int]]:
+        """
+        {param: sorted line indexes idx} such that some keyword of param matches inside
+        " ".join(lower_lines[idx:idx+span]) -- the same test as matching each window separately.
+        """
+        starts = []
+        pos = 0
+        for ln in lower_lines:
+            starts.append(pos)
+            pos += len(ln) + 1
+        doc = " ".join(lower_lines)
+
+        out: Dict[str, List[int]] = {}
+        for param, spans in self.hits(doc).items():
+            idxs = set()
+            for s, e in spans:
+                first = bisect.bisect_right(starts, s) - 1      # line holding the match start
+                last = bisect.bisect_right(starts, e - 1) - 1   # line holding the match end
+                idxs.update(range(max(0, last - span + 1), first + 1))
+            out[param] = sorted(idxs)
+        return out
+
+
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
+
 # ---------------- Context Collector ----------------
 def collect_keyword_contexts(
     text_blocks: List[Tuple[str, str]],
@@ -99,50 +170,55 @@ def collect_keyword_contexts(
     - Handles multi-line EMD/COST structures
     - Fuzzy keyword match (handles OCR errors)
     - Includes numeric lines that follow keywords
+    - Skips snippets contained in an earlier snippet of the same param; a window inside the
+      previous snippet from the same source is skipped by its line interval alone
     """
     results: Dict[str, List[Tuple[str, List[str]]]] = {k: [] for k in KEYWORDS}
+    kept_texts: Dict[str, List[str]] = {k: [] for k in KEYWORDS}  # joined text of each kept snippet
 
     for source, content in text_blocks:
         lines = [ln.strip() for ln in content.splitlines() if ln.strip()]
         lower_lines = [ln.lower() for ln in lines]
 
-        for param, keywords in KEYWORDS.items():
+        param_hits = KEYWORD_MATCHER.window_hits(lower_lines)
+
+        for param in KEYWORDS:
             if len(results[param]) >= max_snippets_per_param:
                 continue
 
-            for idx, low in enumerate(lower_lines):
-                # combine 3 lines to handle broken OCR lines
-                combined = " ".join(lower_lines[idx:idx+3])
-                if not combined:
+            # (start, end) line interval of the latest snippet kept from this source
+            last: Optional[Tuple[int, int]] = None
+
+            for idx in param_hits[param]:
+                # keyword found within lines idx..idx+2 (handles broken OCR lines)
+                start = max(0, idx - window_lines)
+                end = min(len(lines), idx + window_lines + 3)
+
+                # include numeric / ₹ lines after the keyword
+                for j in range(idx + 1, min(len(lines), idx + 5)):
+                    if NUMERIC_RE.search(lines[j]):
+                        end = max(end, j + 1)
+
+                # inside the previous snippet's lines, hence a substring of its text
+                if last is not None and last[0] <= start and end <= last[1]:
+                    continue
+
+                snippet = lines[start:end]
+                joined = " ".join(snippet)
+
+                # skip duplicates (at most max_snippets_per_param texts to check)
+                if any(joined in text for text in kept_texts[param]):
+                    continue
+
+                # skip empty or too short unless numeric
+                if len(joined) < Config.MIN_CHARS_IN_SNIPPET and not NUMERIC_RE.search(joined):
                     continue
 
-                # fuzzy keyword matching
-                if any(
-                    re.search(r"\b" + re.escape(kw).replace(r"\ ", r"[\s\.]*") + r"\b", combined)
-                    for kw in keywords
-                ):
-                    start = max(0, idx - window_lines)
-                    end = min(len(lines), idx + window_lines + 3)
-
-                    # include numeric / ₹ lines after the keyword
-                    for j in range(idx + 1, min(len(lines), idx + 5)):
-                        if re.search(r"[₹\d]", lines[j]):
-                            end = max(end, j + 1)
-
-                    snippet = lines[start:end]
-                    joined = " ".join(snippet)
-
-                    # skip duplicates
-                    if any(joined in " ".join(snip) for _, snip in results[param]):
-                        continue
-
-                    # skip empty or too short unless numeric
-                    if len(joined) < Config.MIN_CHARS_IN_SNIPPET and not re.search(r"[₹\d]", joined):
-                        continue
-
-                    results[param].append((source, snippet))
-                    if len(results[param]) >= max_snippets_per_param:
-                        break
+                results[param].append((source, snippet))
+                kept_texts[param].append(joined)
+                last = (start, end)
+                if len(results[param]) >= max_snippets_per_param:
+                    break
 
     return results
 
@@ -58,12 +58,9 @@ def build_key_pattern(keys_list):
         escaped_keys.append(escaped)
     return r"(?:" + r"|".join(escaped_keys) + r")"
 
-def build_extraction_rules(simple_definitions):
-    """
-    Auto-generates the final extraction_rules dictionary.
-    """
-    
-    value_patterns = {
+def build_value_patterns():
+    """Value regex + normalizer for each rule type."""
+    return {
         "money": (r"((?:Rs\.?\s*|₹\s*)?[\d,\s\.]+\/?-?)", normalize_money),
         "id":    (r"([\w\/.-]+)", normalize_id),
         "date":  (r"(\d{2}[./-]\d{2}[./-]\d{4})", normalize_date),
@@ -83,6 +80,13 @@ def build_extraction_rules(simple_definitions):
         )
     }
 
+def build_extraction_rules(simple_definitions):
+    """
+    Auto-generates the final extraction_rules dictionary.
+    """
+    
+    value_patterns = build_value_patterns()
+
     extraction_rules = {}
     for key_name, rule in simple_definitions.items():
         key_pattern_str = build_key_pattern(rule["keys"])
@@ -112,6 +116,93 @@ def build_extraction_rules(simple_definitions):
             
     return extraction_rules
 
+# --- 2b. SINGLE-SCAN RULE ENGINE ---
+# Same rules as build_extraction_rules, but the unbounded `(key).*?` prefix is gone:
+# all keys are found in one pass, and the value is only searched for inside a
+# bounded window after each key. Worst case is linear in the text length, so a
+# garbled multi-MB OCR page cannot make a rule backtrack across the whole document.
+
+RULE_WINDOW_CHARS = 500
+# keys of one rule searched per document, in text order
+RULE_MAX_ANCHORS = 64
+
+
+class RuleEngine:
+    """Compiled form of a SIMPLE_RULES-style definition dict. Build once, reuse per document."""
+
+    def __init__(self, simple_definitions, window_chars=RULE_WINDOW_CHARS, max_anchors=RULE_MAX_ANCHORS):
+        value_patterns = build_value_patterns()
+        self.window_chars = window_chars
+        self.max_anchors = max_anchors
+        self.rules = {}
+        all_keys = []
+        for key_name, rule in simple_definitions.items():
+            val_patt, normalizer = value_patterns.get(rule["type"], (None, None))
+            if not val_patt:
+                print(f"Warning: Unknown rule type '{rule['type']}' for key '{key_name}'")
+                continue
+            keys = [build_key_pattern([key]) for key in rule["keys"]]
+            all_keys.extend(keys)
+            self.rules[key_name] = {
+                "keys": [re.compile(k, re.IGNORECASE) for k in keys],
+                "tail_colon": re.compile(fr"(?i).*?:\s*{val_patt}", re.DOTALL),
+                "tail_proximity": (
+                    None if rule.get("colon_required", False)
+                    else re.compile(fr"(?i).*?{val_patt}", re.DOTALL)
+                ),
+                "normalizer": normalizer,
+            }
+        # zero-width look-ahead: reports every position where any key starts, even overlapping ones
+        self.anchors = re.compile(r"(?=" + r"|".join(all_keys) + r")", re.IGNORECASE)
+        # (rule, key regex) by the key's lower-cased first character, in rule and key order:
+        # only those keys can match at a position holding that character
+        self.by_first = {}
+        for key_name, definition in simple_definitions.items():
+            if key_name not in self.rules:
+                continue
+            for key, key_re in zip(definition["keys"], self.rules[key_name]["keys"]):
+                self.by_first.setdefault(key[0].lower(), []).append((key_name, key_re))
+
+    def find_anchors(self, text):
+        """{rule: [key end offsets, in text order]} -- one pass over text for all rules."""
+        found = {key_name: [] for key_name in self.rules}
+        for cand in self.anchors.finditer(text):
+            pos = cand.start()
+            for key_name, key_re in self.by_first.get(text[pos].lower(), ()):
+                m = key_re.match(text, pos)
+                if m:
+                    found[key_name].append(m.end())
+        return found
+
+    def _match_after(self, tail, text, ends):
+        # Every key is searched in its own window. Only the first max_anchors keys are tried,
+        # so a key repeated all over a garbled page costs at most max_anchors * window_chars.
+        for end in ends[: self.max_anchors]:
+            m = tail.match(text, end, min(len(text), end + self.window_chars))
+            if m:
+                return m
+        return None
+
+    def search(self, text, key_names=None):
+        """
+        {rule: match or None}, like trying the colon pattern and then the proximity
+        pattern of build_extraction_rules, except that the text between the key and
+        the end of the value must fit in window_chars after that key, and only the first
+        max_anchors keys of each rule are tried. The value is match.groups()[-1].
+        """
+        key_names = list(self.rules) if key_names is None else key_names
+        anchors = self.find_anchors(text)
+        out = {}
+        for key_name in key_names:
+            rule = self.rules[key_name]
+            ends = anchors[key_name]
+            match = self._match_after(rule["tail_colon"], text, ends)
+            if not match and rule["tail_proximity"] is not None:
+                match = self._match_after(rule["tail_proximity"], text, ends)
+            out[key_name] = match
+        return out
+
+
 # --- 3. CONFIGURATION SECTION ---
 # (This is your code, unchanged)
 SIMPLE_RULES = {
@@ -147,6 +238,9 @@ SIMPLE_RULES = {
     }
 }
 
+# Compiled once per process; used by the backend pipeline.
+RULE_ENGINE = RuleEngine(SIMPLE_RULES)
+
 # --- 4. NEW Multi-File Extraction Loop ---
 
 # !!! IMPORTANT: SET THIS TO YOUR FOLDER'S PATH !!!
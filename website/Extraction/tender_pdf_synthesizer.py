@@ -0,0 +1,366 @@
+"""
+tender_pdf_synthesizer.py
+-------------------------
+Synthetic NIT (Notice Inviting Tender) PDF corpus for end-to-end load and accuracy
+tests of the PDF path (step 1 extraction, step 2 keyword contexts, step 3 rules).
+
+Every PDF is rendered offline with reportlab and comes with a ground-truth JSON holding
+the value each SIMPLE_RULES key (multiple3.py) should extract, already normalized the
+way step 3 normalizes it. Documents have:
+  - a configurable page count, BOQ tables and boilerplate terms
+  - the tender fields as "Label: value" text or as rows of a key/value table
+  - image-only "scanned" pages (no text layer, so step 1 OCRs them)
+
+Usage examples:
+  python Extraction/tender_pdf_synthesizer.py --n 50 --outdir tender_corpus
+  python Extraction/tender_pdf_synthesizer.py --n 200 --min_pages 20 --max_pages 80 --scanned_frac 0.2
+
+Needs reportlab (pip install reportlab) and Pillow, which pdfplumber already requires.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ---------------- Config ----------------
+class Config:
+    PAGE_WIDTH = 595.27   # A4 in points
+    PAGE_HEIGHT = 841.89
+    MARGIN = 50
+    FONT = "Helvetica"
+    FONT_SIZE = 10
+    LEADING = 14
+    SCAN_DPI = 150        # resolution of image-only pages
+    MAX_TABLE_ROWS = 18
+
+
+# Labels accepted by both step 2 (KEYWORDS) and step 3 (SIMPLE_RULES keys), so a
+# correct extractor can find every field.
+FIELD_LABELS: Dict[str, List[str]] = {
+    "Tender No": ["Tender No.", "NIT No.", "Tender ID"],
+    "Estimated Cost": ["Estimated Cost", "Estimated Cost of Work"],
+    "EMD": ["EMD", "Earnest Money Deposit"],
+    "Date of Opening": ["Date of Opening", "Bid Opening Date"],
+    "Completion Time": ["Completion Time", "Completion Period", "Time of completion"],
+}
+
+ORGANISATIONS = [
+    "Public Works Department", "Rural Development Department", "Water Resources Department",
+    "Municipal Corporation", "State Highways Authority", "Irrigation Division",
+]
+DIVISIONS = ["EE", "SE", "CE", "DIV", "RD", "BLD"]
+WORKS = [
+    "Construction of {n} km rural road with bituminous surface",
+    "Repair and renovation of {n} classrooms in Government School",
+    "Construction of RCC box culvert at chainage {n}/400",
+    "Providing and laying {n} mm dia DI water supply pipeline",
+    "Construction of community hall with {n} rooms",
+    "Strengthening of embankment and drainage works, reach {n}",
+]
+BOQ_ITEMS = [
+    ("Earth work in excavation in all kinds of soil", "cum"),
+    ("Providing and laying cement concrete 1:2:4", "cum"),
+    ("Reinforcement steel TMT Fe 500D", "kg"),
+    ("Brick masonry in cement mortar 1:6", "cum"),
+    ("12 mm thick cement plaster 1:4", "sqm"),
+    ("Providing and laying WBM grade II", "cum"),
+    ("Bituminous macadam 50 mm thick", "sqm"),
+    ("Shuttering for RCC works", "sqm"),
+    ("Painting with acrylic emulsion two coats", "sqm"),
+    ("Supply of OPC 53 grade cement", "bag"),
+]
+TERMS = [
+    "The bidder shall submit the bid online on the e-procurement portal before the due date.",
+    "Conditional tenders shall be summarily rejected without assigning any reason.",
+    "The tender inviting authority reserves the right to accept or reject any or all tenders.",
+    "The bid shall remain valid for a period of 90 days from the date of opening of financial bids.",
+    "The contractor shall comply with all labour laws and safety regulations in force.",
+    "Rates quoted shall be inclusive of all taxes, duties, royalty and carriage.",
+    "Any corrigendum will be published only on the website and not in newspapers.",
+    "Bidders must upload scanned copies of registration, PAN and GST certificates.",
+    "Security deposit shall be deducted from running bills as per the contract conditions.",
+    "The work shall be executed as per the latest specifications and standard drawings.",
+    "Price variation clause shall not be applicable for this contract.",
+    "Defect liability period shall be twelve months from the date of completion.",
+]
+
+
+# ---------------- Field Values ----------------
+def format_inr(amount: int) -> str:
+    """45,67,890 -- Indian digit grouping."""
+    s = str(amount)
+    if len(s) <= 3:
+        return s
+    head, tail = s[:-3], s[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return ",".join(groups + [tail])
+
+
+def make_fields(rng: random.Random) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(rendered value, expected step 3 value) for every SIMPLE_RULES key."""
+    year = rng.randint(2019, 2026)
+    tender_no = f"{rng.choice(DIVISIONS)}/NIT-{rng.randint(1, 199)}/{year}-{(year + 1) % 100:02d}"
+    cost = rng.randrange(5_00_000, 25_00_00_000, 10)
+    emd = int(round(cost * rng.choice([0.01, 0.02, 0.025])))
+    day, month = rng.randint(1, 28), rng.randint(1, 12)
+    sep = rng.choice([".", "/", "-"])
+    completion = rng.choice([f"{rng.choice([3, 6, 9, 12, 18, 24])} Months", f"{rng.choice([90, 120, 180, 270])} Days"])
+
+    rendered = {
+        "Tender No": tender_no,
+        "Estimated Cost": f"Rs. {format_inr(cost)}/-",
+        "EMD": f"Rs. {format_inr(emd)}/-",
+        "Date of Opening": f"{day:02d}{sep}{month:02d}{sep}{year}",
+        "Completion Time": completion,
+    }
+    expected = {
+        "Tender No": tender_no,
+        "Estimated Cost": str(cost),
+        "EMD": str(emd),
+        "Date of Opening": f"{day:02d}-{month:02d}-{year}",
+        "Completion Time": completion,
+    }
+    return rendered, expected
+
+
+# ---------------- Page Layout ----------------
+def _page_plan(rng: random.Random, n_pages: int, scanned_frac: float, field_style: str,
+               field_pages: str) -> Tuple[List[int], Dict[str, Tuple[int, str]]]:
+    """Scanned page numbers (1-based) and, per field, (page, style)."""
+    others = list(range(2, n_pages + 1))
+    scanned = sorted(rng.sample(others, int(round(scanned_frac * len(others))))) if others else []
+    placement = {}
+    for key in FIELD_LABELS:
+        page = 1 if field_pages == "first" else rng.randint(1, n_pages)
+        style = rng.choice(["text", "table"]) if field_style == "mixed" else field_style
+        placement[key] = (page, style)
+    return scanned, placement
+
+
+def _boq_rows(rng: random.Random, n_rows: int, start: int) -> List[List[str]]:
+    rows = [["S.No", "Description of Item", "Unit", "Qty", "Rate", "Amount"]]
+    for i in range(n_rows):
+        desc, unit = rng.choice(BOQ_ITEMS)
+        qty = round(rng.uniform(5, 2500), 2)
+        rate = round(rng.uniform(40, 9000), 2)
+        rows.append([str(start + i), desc, unit, f"{qty:.2f}", f"{rate:.2f}", f"{qty * rate:.2f}"])
+    return rows
+
+
+class _PageWriter:
+    """
+    Lays out one page top-down and collects its text in `lines`. With draw=False
+    nothing is drawn (scanned pages are rendered from `lines` as an image instead).
+    """
+
+    def __init__(self, canvas, draw: bool = True):
+        self.c = canvas
+        self.draw = draw
+        self.y = Config.PAGE_HEIGHT - Config.MARGIN
+        self.lines: List[str] = []
+
+    def room(self) -> float:
+        return self.y - Config.MARGIN
+
+    def text(self, line: str, size: int = Config.FONT_SIZE, bold: bool = False) -> bool:
+        from reportlab.lib.utils import simpleSplit
+
+        font = Config.FONT + ("-Bold" if bold else "")
+        width = Config.PAGE_WIDTH - 2 * Config.MARGIN
+        wrapped = simpleSplit(line, font, size, width)
+        if self.room() < len(wrapped) * Config.LEADING:
+            return False
+        if self.draw:
+            self.c.setFont(font, size)
+        for part in wrapped:
+            self.y -= Config.LEADING
+            if self.draw:
+                self.c.drawString(Config.MARGIN, self.y, part)
+            self.lines.append(part)
+        return True
+
+    def table(self, rows: List[List[str]], col_widths: Optional[List[float]] = None) -> int:
+        """Draw as many rows as fit (header kept); returns the number of body rows drawn."""
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+
+        width = Config.PAGE_WIDTH - 2 * Config.MARGIN
+        for n in range(len(rows), 1, -1):
+            t = Table(rows[:n], colWidths=col_widths)
+            t.setStyle(TableStyle([
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+                ("FONT", (0, 0), (-1, -1), Config.FONT, 8),
+                ("FONT", (0, 0), (-1, 0), Config.FONT + "-Bold", 8),
+            ]))
+            _, h = t.wrapOn(self.c, width, self.room())
+            if h <= self.room() - Config.LEADING:
+                self.y -= Config.LEADING
+                if self.draw:
+                    t.drawOn(self.c, Config.MARGIN, self.y - h)
+                self.y -= h
+                self.lines.extend("  ".join(r) for r in rows[:n])
+                return n - 1
+        return 0
+
+
+def _scanned_image(lines: List[str], rng: random.Random):
+    """Render text lines as a grayscale page image with a little scanner noise."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    scale = Config.SCAN_DPI / 72.0
+    w, h = int(Config.PAGE_WIDTH * scale), int(Config.PAGE_HEIGHT * scale)
+    img = Image.new("L", (w, h), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=int(Config.FONT_SIZE * scale))
+    y = Config.MARGIN * scale
+    for line in lines:
+        draw.text((Config.MARGIN * scale, y), line, fill=rng.randint(0, 60), font=font)
+        y += Config.LEADING * scale
+    for _ in range(w * h // 4000):
+        draw.point((rng.randrange(w), rng.randrange(h)), fill=rng.randint(80, 200))
+    return img.rotate(rng.uniform(-0.6, 0.6), fillcolor=255)
+
+
+# ---------------- Document ----------------
+def generate_tender_pdf(path: str, seed: int = 42, n_pages: int = 12, tables_per_page: float = 0.5,
+                        scanned_frac: float = 0.1, field_style: str = "mixed",
+                        field_pages: str = "first") -> Dict[str, Any]:
+    """
+    Write one synthetic NIT PDF to `path` and return its ground truth.
+
+    tables_per_page: expected BOQ tables per page (0 disables them).
+    scanned_frac: fraction of pages 2..n rendered as images only.
+    field_style: "text", "table" or "mixed" (random per field).
+    field_pages: "first" (fields on page 1) or "random" (any page, scanned ones included).
+    """
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas as rl_canvas
+
+    rng = random.Random(seed)
+    rendered, expected = make_fields(rng)
+    labels = {key: rng.choice(options) for key, options in FIELD_LABELS.items()}
+    scanned, placement = _page_plan(rng, n_pages, scanned_frac, field_style, field_pages)
+    org = rng.choice(ORGANISATIONS)
+    work = rng.choice(WORKS).format(n=rng.randint(2, 40))
+
+    c = rl_canvas.Canvas(path, pagesize=(Config.PAGE_WIDTH, Config.PAGE_HEIGHT), invariant=1)
+    fields_info: Dict[str, Dict[str, Any]] = {}
+    n_tables = 0
+    boq_no = 1
+    for page in range(1, n_pages + 1):
+        pw = _PageWriter(c, draw=page not in scanned)
+        if page == 1:
+            pw.text(f"Government of India - {org}", size=12, bold=True)
+            pw.text("NOTICE INVITING TENDER", size=14, bold=True)
+            pw.text(f"Name of Work: {work}")
+        else:
+            pw.text(f"{org} - NIT page {page} of {n_pages}", bold=True)
+
+        here = [key for key, (p, _) in placement.items() if p == page]
+        for key in (k for k in here if placement[k][1] == "text"):
+            pw.text(f"{labels[key]}: {rendered[key]}")
+        table_keys = [k for k in here if placement[k][1] == "table"]
+        if table_keys:
+            rows = [["Particulars", "Details"]] + [[labels[k], rendered[k]] for k in table_keys]
+            pw.table(rows, col_widths=[200, 250])
+            n_tables += 1
+        for key in here:
+            fields_info[key] = {
+                "page": page, "label": labels[key], "rendered": rendered[key],
+                "style": placement[key][1], "scanned": page in scanned,
+            }
+
+        # filler: BOQ tables and terms until the page is full
+        n_boq = int(tables_per_page) + (rng.random() < tables_per_page % 1)
+        for _ in range(n_boq):
+            drawn = pw.table(_boq_rows(rng, rng.randint(4, Config.MAX_TABLE_ROWS), boq_no),
+                             col_widths=[30, 215, 35, 55, 55, 65])
+            if drawn:
+                boq_no += drawn
+                n_tables += 1
+        while pw.text(f"{rng.randint(1, 40)}. {rng.choice(TERMS)}"):
+            pass
+
+        if page in scanned:
+            # image only: no text layer and no vector tables, so step 1 has to OCR it
+            buf = io.BytesIO()
+            _scanned_image(pw.lines, rng).save(buf, format="PNG")
+            buf.seek(0)
+            c.drawImage(ImageReader(buf), 0, 0, width=Config.PAGE_WIDTH, height=Config.PAGE_HEIGHT)
+        c.showPage()
+    c.save()
+
+    return {
+        "file": Path(path).name,
+        "seed": seed,
+        "pages": n_pages,
+        "scanned_pages": scanned,
+        "tables": n_tables,
+        "organisation": org,
+        "name_of_work": work,
+        "expected": expected,
+        "base_price": float(expected["Estimated Cost"]),
+        "fields": fields_info,
+    }
+
+
+# ---------------- Corpus ----------------
+def generate_corpus(outdir: str, n: int = 20, seed: int = 42, min_pages: int = 4, max_pages: int = 30,
+                    **kwargs) -> List[Dict[str, Any]]:
+    """n PDFs plus <name>.json ground truth each and a manifest.json listing all of them."""
+    out = Path(outdir)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    manifest = []
+    for i in range(1, n + 1):
+        name = f"nit_{i:05d}"
+        truth = generate_tender_pdf(
+            str(out / f"{name}.pdf"), seed=rng.randrange(2 ** 31),
+            n_pages=rng.randint(min_pages, max_pages), **kwargs,
+        )
+        (out / f"{name}.json").write_text(json.dumps(truth, indent=2), encoding="utf-8")
+        manifest.append(truth)
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def score_extraction(expected: Dict[str, str], extracted: Dict[str, Any]) -> Dict[str, bool]:
+    """Per SIMPLE_RULES key: does the extracted value equal the ground truth (spaces ignored)?"""
+    norm = lambda v: re.sub(r"\s+", "", str(v)).lower() if v is not None else None
+    return {key: norm(extracted.get(key)) == norm(value) for key, value in expected.items()}
+
+
+# ---------------- Entry ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic tender (NIT) PDF corpus generator")
+    parser.add_argument("--n", type=int, default=20)
+    parser.add_argument("--outdir", type=str, default="tender_corpus")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min_pages", type=int, default=4)
+    parser.add_argument("--max_pages", type=int, default=30)
+    parser.add_argument("--tables_per_page", type=float, default=0.5)
+    parser.add_argument("--scanned_frac", type=float, default=0.1)
+    parser.add_argument("--field_style", choices=["text", "table", "mixed"], default="mixed")
+    parser.add_argument("--field_pages", choices=["first", "random"], default="first")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(
+        args.outdir, n=args.n, seed=args.seed, min_pages=args.min_pages, max_pages=args.max_pages,
+        tables_per_page=args.tables_per_page, scanned_frac=args.scanned_frac,
+        field_style=args.field_style, field_pages=args.field_pages,
+    )
+    pages = sum(t["pages"] for t in corpus)
+    scanned = sum(len(t["scanned_pages"]) for t in corpus)
+    print(f"Generated {len(corpus)} PDFs ({pages} pages, {scanned} scanned) in {args.outdir}")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+from Bob_The_Builders.ml.bid_optimization_pipeline_from_scratch import get_markup_table, optimize_bids_batch
+
+
+BATCH_MAX_ROWS = 200_000
+BATCH_CHUNK_ROWS = 2_000
+BATCH_COLUMNS = ["base_price", "quality_score", "min_bid", "max_bid"]
+RESULT_COLUMNS = [
+    "row",
+    "base_price",
+    "quality_score",
+    "best_bid",
+    "p_win_at_best",
+    "expected_profit_at_best",
+    "profit_if_won_at_best",
+]
+
+
+def parse_batch_rows(body: bytes, content_type: str) -> pd.DataFrame:
+    """
+    Parse a batch request body into a frame with BATCH_COLUMNS.
+
+    CSV (text/csv) needs a header row; JSON is either a list of row objects or
+    {"rows": [...]}. min_bid/max_bid are optional (missing -> NaN = default bracket).
+    """
+    if "csv" in content_type:
+        df = pd.read_csv(io.BytesIO(body))
+    else:
+        try:
+            payload = json.loads(body or b"null")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {e}") from e
+        if isinstance(payload, dict):
+            payload = payload.get("rows")
+        if not isinstance(payload, list):
+            raise ValueError('JSON body must be a list of rows or {"rows": [...]}')
+        bad = [i for i, row in enumerate(payload) if not isinstance(row, dict)]
+        if bad:
+            raise ValueError(f"Each row must be a JSON object (rows {bad[:10]})")
+        df = pd.DataFrame.from_records(payload)
+
+    if len(df) == 0:
+        raise ValueError("No rows to optimize")
+    df.columns = [str(c).strip() for c in df.columns]
+    missing = [c for c in ("base_price", "quality_score") if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+    if len(df) > BATCH_MAX_ROWS:
+        raise ValueError(f"Too many rows: {len(df)} > {BATCH_MAX_ROWS}")
+
+    out = pd.DataFrame(index=df.index)
+    for c in BATCH_COLUMNS:
+        out[c] = pd.to_numeric(df[c], errors="coerce") if c in df.columns else np.nan
+
+    bad = out.index[~(out["base_price"] > 0)]
+    if len(bad):
+        raise ValueError(f"base_price must be > 0 (rows {bad[:10].tolist()})")
+    bad = out.index[~out["quality_score"].between(0, 1)]
+    if len(bad):
+        raise ValueError(f"quality_score must be between 0 and 1 (rows {bad[:10].tolist()})")
+    bad = out.index[out["min_bid"] > out["max_bid"]]
+    if len(bad):
+        raise ValueError(f"min_bid must not exceed max_bid (rows {bad[:10].tolist()})")
+    return out.reset_index(drop=True)
+
+
+def iter_batch_results(
+    rows: pd.DataFrame,
+    clf_pipe: Any,
+    reg_pipe: Any,
+    fmt: str = "ndjson",
+    chunk_rows: int = BATCH_CHUNK_ROWS,
+) -> Iterator[str]:
+    """
+    Optimize `rows` chunk by chunk and yield serialized results (CSV or NDJSON) as they finish.
+    Uses the same markup table as single jobs, so a row gets the bid /api/jobs would give.
+    """
+    table = get_markup_table(clf_pipe)
+    if fmt == "csv":
+        yield ",".join(RESULT_COLUMNS) + "\n"
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows.iloc[start:start + chunk_rows]
+        res = optimize_bids_batch(
+            clf_pipe,
+            reg_pipe,
+            base_prices=chunk["base_price"].to_numpy(),
+            quality_scores=chunk["quality_score"].to_numpy(),
+            min_bids=chunk["min_bid"].to_numpy(dtype=float),
+            max_bids=chunk["max_bid"].to_numpy(dtype=float),
+            auto_expand=True,
+            use_profit_formula=True,
+            markup_table=table,
+        )
+        out = pd.DataFrame({
+            "row": np.arange(start, start + len(chunk)),
+            "base_price": chunk["base_price"].to_numpy(),
+            "quality_score": chunk["quality_score"].to_numpy(),
+            **{c: res[c] for c in RESULT_COLUMNS[3:]},
+        })
+        if fmt == "csv":
+            yield out.to_csv(index=False, header=False)
+        else:
+            text = out.to_json(orient="records", lines=True, double_precision=15)
+            yield text if text.endswith("\n") else text + "\n"
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+
+# Diagnostic curves (bid grid / expected profit) are stored as packed little-endian
+# float32 blobs: 4 bytes per point instead of ~20 bytes of JSON text, and no JSON
+# parsing on read. float32 keeps ~7 significant digits, plenty for plotting.
+CURVE_DTYPE = np.dtype("<f4")
+
+
+def pack_curve(values: Optional[Sequence[float]]) -> Optional[bytes]:
+    if values is None:
+        return None
+    return np.asarray(values, dtype=CURVE_DTYPE).tobytes()
+
+
+def unpack_curve(blob: Optional[bytes]) -> np.ndarray:
+    return np.frombuffer(blob or b"", dtype=CURVE_DTYPE)
+
+
+def curve_to_list(values: Any) -> List[float]:
+    # round-trip through 7 significant digits so float32 values don't serialize with float64 noise
+    return [float(f"{v:.7g}") for v in np.asarray(values, dtype=np.float64).tolist()]
+
+
+def downsample_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Indices of `points` evenly spaced samples of y, keeping both end points and the
+    maximum of y (the optimum on an expected-profit curve).
+    """
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    idx = np.unique(np.linspace(0, n - 1, max(points, 2)).round().astype(int))
+    finite = np.isfinite(y)
+    if finite.any() and len(idx) > 2:
+        peak = int(np.argmax(np.where(finite, y, -np.inf)))
+        if peak not in idx:
+            inner = idx[1:-1]
+            inner[np.abs(inner - peak).argmin()] = peak
+            idx = np.sort(idx)
+    return idx
@@ -1,20 +1,119 @@
 from __future__ import annotations
 
+import json
 import os
-from contextlib import contextmanager
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
 
 
 DB_PATH = os.path.join(os.getcwd(), "backend_data.sqlite3")
-ENGINE = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False})
+# How long a connection waits for another process's write lock before "database is locked".
+BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+
+
+def _set_pragmas(dbapi_conn, read_only: bool) -> None:
+    cur = dbapi_conn.cursor()
+    # WAL: readers never block the writer and the writer never blocks readers
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    # NORMAL is durable in WAL mode except for the last commits on power loss
+    cur.execute("PRAGMA synchronous=NORMAL")
+    if read_only:
+        cur.execute("PRAGMA query_only=ON")
+    cur.close()
+
+
+def _make_engine(read_only: bool) -> Engine:
+    engine = create_engine(
+        f"sqlite:///{DB_PATH}",
+        connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000},
+    )
+    event.listen(engine, "connect", lambda dbapi_conn, _record: _set_pragmas(dbapi_conn, read_only))
+    return engine
+
+
+# Writes (API inserts, worker status updates) and reads (dashboard polling) use separate
+# engines, so read traffic never holds a connection that could be upgraded to a write lock.
+ENGINE = _make_engine(read_only=False)
+READ_ENGINE = _make_engine(read_only=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=ENGINE)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=READ_ENGINE)
+
+# API read endpoints run on the event loop through aiosqlite with their own pool, so polls
+# don't wait for threadpool slots. Created on first use: worker processes never need it.
+ASYNC_READ_POOL_SIZE = int(os.environ.get("DB_ASYNC_READ_POOL_SIZE", "10"))
+_async_read_engine: Any = None
+_async_read_sessions: Any = None
+_async_lock = threading.Lock()
 
 
 def init_db() -> None:
     from .models import Base  # noqa
     Base.metadata.create_all(bind=ENGINE)
+    _add_missing_columns(Base)
+    _add_missing_indexes(Base)
+    _pack_json_curves()
+
+
+def _add_missing_columns(base) -> None:
+    """
+    create_all() never alters existing tables; add columns introduced after the DB was created.
+    Another process starting at the same time (API and standalone workers) may add a column
+    first; the ALTER then fails with "duplicate column name" and is skipped.
+    """
+    insp = inspect(ENGINE)
+    for table in base.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in existing:
+                continue
+            col_type = col.type.compile(dialect=ENGINE.dialect)
+            try:
+                with ENGINE.begin() as conn:
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}")
+            except OperationalError:
+                # fresh inspector: the first one caches the columns it has seen
+                if col.name not in {c["name"] for c in inspect(ENGINE).get_columns(table.name)}:
+                    raise
+
+
+def _add_missing_indexes(base) -> None:
+    """create_all() only creates indexes together with their table; add ones declared later."""
+    for table in base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=ENGINE, checkfirst=True)
+
+
+def _pack_json_curves() -> None:
+    """Move diagnostic curves of rows written before they were packed from JSON into float32 blobs."""
+    from .curves import pack_curve
+
+    insp = inspect(ENGINE)
+    if not insp.has_table("job_results"):
+        return
+    if "diagnostic_bids" not in {c["name"] for c in insp.get_columns("job_results")}:
+        return
+    with ENGINE.begin() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT job_id, diagnostic_bids, diagnostic_exp_profit FROM job_results "
+            "WHERE diagnostic_bids IS NOT NULL AND curve_bids IS NULL"
+        ).fetchall()
+        for job_id, bids, exp_profit in rows:
+            bids = json.loads(bids)
+            exp_profit = json.loads(exp_profit) if exp_profit else None
+            conn.exec_driver_sql(
+                "UPDATE job_results SET curve_bids = ?, curve_exp_profit = ?, curve_points = ?, "
+                "diagnostic_bids = NULL, diagnostic_exp_profit = NULL WHERE job_id = ?",
+                (pack_curve(bids), pack_curve(exp_profit), len(bids), job_id),
+            )
 
 
 @contextmanager
@@ -26,3 +125,49 @@ def get_session():
         session.close()
 
 
+def _get_async_read_sessions() -> Any:
+    global _async_read_engine, _async_read_sessions
+    if _async_read_sessions is None:
+        with _async_lock:
+            if _async_read_sessions is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                engine = create_async_engine(
+                    f"sqlite+aiosqlite:///{DB_PATH}",
+                    connect_args={"timeout": BUSY_TIMEOUT_MS / 1000},
+                    pool_size=ASYNC_READ_POOL_SIZE,
+                )
+                event.listen(engine.sync_engine, "connect", lambda dbapi_conn, _record: _set_pragmas(dbapi_conn, True))
+                _async_read_engine = engine
+                _async_read_sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    return _async_read_sessions
+
+
+@asynccontextmanager
+async def get_async_read_session():
+    """AsyncSession on the read-only aiosqlite engine. Relationships must be eager-loaded."""
+    session = _get_async_read_sessions()()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def dispose_async_engine() -> None:
+    global _async_read_engine, _async_read_sessions
+    engine = _async_read_engine
+    _async_read_engine = _async_read_sessions = None
+    if engine is not None:
+        await engine.dispose()
+
+
+@contextmanager
+def get_read_session():
+    """Session on the read-only engine, for endpoints and stats that never write."""
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
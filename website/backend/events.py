@@ -0,0 +1,107 @@
+"""
+Push-based job progress (GET /api/jobs/{id}/events, Server-Sent Events).
+
+Workers may run in other processes or hosts, so they persist their latest progress on
+the job row (worker._ProgressWriter). In the API process a single broker task reads
+status + progress of every watched job once per EVENTS_POLL_SECONDS and fans changes
+out to the subscribed streams: N watchers of M jobs cost one query per interval instead
+of N clients polling GET /api/jobs/{id}.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from sqlalchemy import select
+
+from .db import get_async_read_session
+from .models import Job, JobStatus
+
+
+EVENTS_POLL_SECONDS = float(os.environ.get("JOB_EVENTS_POLL_SECONDS", "0.5"))
+KEEPALIVE_SECONDS = 15.0
+TERMINAL_STATUSES = (JobStatus.succeeded.value, JobStatus.failed.value)
+
+
+class JobEventBroker:
+    """In-process fan-out of job events to asyncio subscribers. Must be used from the event loop."""
+
+    def __init__(self, poll_seconds: float = EVENTS_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        if job_id in self._last:
+            queue.put_nowait(self._last[job_id])
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[job_id]
+            self._last.pop(job_id, None)
+
+    def publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        self._last[job_id] = event
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                queue.get_nowait()  # slow consumer: only the newest state matters
+            queue.put_nowait(event)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                await self._poll()
+            except Exception as e:
+                print(f"[Events] poll failed: {e}", flush=True)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _poll(self) -> None:
+        job_ids = list(self._subscribers)
+        async with get_async_read_session() as session:
+            rows = (await session.execute(
+                select(Job.id, Job.status, Job.progress, Job.error_message).where(Job.id.in_(job_ids))
+            )).all()
+        for row in rows:
+            status = row.status.value if isinstance(row.status, JobStatus) else row.status
+            event = {"job_id": row.id, "status": status, "progress": row.progress}
+            if status == JobStatus.failed.value:
+                event["error_message"] = row.error_message
+            if event != self._last.get(row.id):
+                self.publish(row.id, event)
+
+    async def stream(self, job_id: str) -> AsyncIterator[str]:
+        """SSE frames for one watcher; ends after the job succeeds or fails."""
+        queue = self.subscribe(job_id)
+        try:
+            yield f"retry: {int(self.poll_seconds * 2000)}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"  # keeps proxies from closing an idle stream
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            self.unsubscribe(job_id, queue)
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._subscribers.clear()
+        self._last.clear()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+
+from .db import get_session
+from .models import ExtractionCacheEntry
+
+
+# Bump whenever step 1-3 output for the same PDF can change (extraction code, KEYWORDS,
+# SIMPLE_RULES, normalizers); old entries then simply stop matching and age out.
+EXTRACTOR_VERSION = "7"
+MAX_CACHE_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def sha256_file(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _key(pdf_sha256: str, version: str) -> str:
+    return f"{pdf_sha256}:{version}"
+
+
+def get_cached_extraction(pdf_sha256: str, version: str = EXTRACTOR_VERSION) -> Optional[Dict[str, Any]]:
+    """Cached payload for this PDF, or None. Bumps the entry's hit count and access time."""
+    with get_session() as session:
+        entry = session.get(ExtractionCacheEntry, _key(pdf_sha256, version))
+        if entry is None:
+            return None
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_accessed_at = datetime.utcnow()
+        payload = entry.payload
+        session.commit()
+    return payload
+
+
+def put_cached_extraction(pdf_sha256: str, payload: Dict[str, Any], version: str = EXTRACTOR_VERSION) -> None:
+    """Store a payload, then evict least-recently-used entries while over MAX_CACHE_BYTES."""
+    size = len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+    if size > MAX_CACHE_BYTES:
+        return
+    now = datetime.utcnow()
+    with get_session() as session:
+        session.merge(ExtractionCacheEntry(
+            key=_key(pdf_sha256, version),
+            pdf_sha256=pdf_sha256,
+            extractor_version=version,
+            payload=payload,
+            size_bytes=size,
+            hit_count=0,
+            created_at=now,
+            last_accessed_at=now,
+        ))
+        session.commit()
+        _evict(session)
+
+
+def _evict(session) -> None:
+    total = session.query(func.coalesce(func.sum(ExtractionCacheEntry.size_bytes), 0)).scalar()
+    if total <= MAX_CACHE_BYTES:
+        return
+    rows = (
+        session.query(ExtractionCacheEntry.key, ExtractionCacheEntry.size_bytes)
+        .order_by(ExtractionCacheEntry.last_accessed_at.asc())
+        .all()
+    )
+    evicted = []
+    for key, size in rows:
+        if total <= MAX_CACHE_BYTES:
+            break
+        evicted.append(key)
+        total -= size
+    if evicted:
+        session.query(ExtractionCacheEntry).filter(ExtractionCacheEntry.key.in_(evicted)).delete(synchronize_session=False)
+        session.commit()
+
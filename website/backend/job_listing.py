@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import selectinload
+
+from .models import Job, JobResult
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_RESULT_FIELDS = tuple(f for f in JobResult.FIELDS if f not in JobResult.HEAVY_FIELDS)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[List[str], Optional[List[str]]]:
+    """
+    Parse `fields=` into (job keys, result keys or None to skip the result).
+
+    Comma-separated names: job keys (Job.FIELDS), `result` for the full result including
+    the heavy curves, or `result.<key>` for single result keys. `id` is always included.
+    Default: every job key plus the result without JobResult.HEAVY_FIELDS.
+    Raises ValueError for unknown names.
+    """
+    if not fields:
+        return list(Job.FIELDS), list(DEFAULT_RESULT_FIELDS)
+
+    job_fields = ["id"]
+    result_fields: Optional[List[str]] = None
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        if name == "result":
+            result_fields = (result_fields or []) + list(JobResult.FIELDS)
+        elif name.startswith("result."):
+            key = name[len("result."):]
+            if key not in JobResult.FIELDS:
+                raise ValueError(f"Unknown field: {name}")
+            result_fields = (result_fields or []) + [key]
+        elif name in Job.FIELDS:
+            job_fields.append(name)
+        else:
+            raise ValueError(f"Unknown field: {name}")
+
+    job_fields = list(dict.fromkeys(job_fields))
+    if result_fields is not None:
+        result_fields = list(dict.fromkeys(result_fields))
+    return job_fields, result_fields
+
+
+def encode_cursor(job: Job) -> str:
+    # an empty timestamp stands for a NULL created_at (rows written before it had a default)
+    created_at = job.created_at.isoformat() if job.created_at is not None else ""
+    raw = f"{created_at}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, job_id = raw.split("|", 1)
+        return (datetime.fromisoformat(created_at) if created_at else None), job_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def list_jobs_query(limit: int, cursor: Optional[str], result_fields: Optional[Sequence[str]]):
+    """
+    Newest-first page of jobs after `cursor`, keyset-paginated on (created_at, id).
+
+    Results come from one extra SELECT ... IN query (selectinload) that loads only the
+    requested result columns, instead of one lazy load per job. Fetches limit + 1 rows
+    so the caller can tell whether there is a next page. Works with Session and AsyncSession.
+    """
+    stmt = select(Job).order_by(Job.created_at.desc(), Job.id.desc())
+    if cursor:
+        created_at, job_id = decode_cursor(cursor)
+        # SQLite sorts NULL below every value, so jobs without created_at come last
+        if created_at is None:
+            stmt = stmt.where(Job.created_at.is_(None), Job.id < job_id)
+        else:
+            stmt = stmt.where(or_(
+                Job.created_at < created_at,
+                and_(Job.created_at == created_at, Job.id < job_id),
+                Job.created_at.is_(None),
+            ))
+    if result_fields is not None:
+        columns = [getattr(JobResult, JobResult.FIELDS[f]) for f in result_fields]
+        stmt = stmt.options(selectinload(Job.result).load_only(*columns))
+    return stmt.limit(limit + 1)
+
+
+def job_query(job_id: str, result_fields: Optional[Sequence[str]]):
+    """Single job with only the requested result columns loaded."""
+    stmt = select(Job).where(Job.id == job_id)
+    if result_fields is not None:
+        columns = [getattr(JobResult, JobResult.FIELDS[f]) for f in result_fields]
+        stmt = stmt.options(selectinload(Job.result).load_only(*columns))
+    return stmt
+
+
+def serialize_job(job: Job, job_fields: Sequence[str], result_fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    data = job.to_dict(include_paths=False, fields=job_fields)
+    if result_fields is not None and job.result is not None:
+        data["result"] = job.result.to_dict(fields=result_fields)
+    return data
+
+
+def serialize_page(
+    jobs: Sequence[Job],
+    limit: int,
+    job_fields: Sequence[str],
+    result_fields: Optional[Sequence[str]],
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """(items, next cursor or None) for rows fetched with list_jobs_query."""
+    page = jobs[:limit]
+    items = [serialize_job(j, job_fields, result_fields) for j in page]
+    next_cursor = encode_cursor(page[-1]) if len(jobs) > limit and page else None
+    return items, next_cursor
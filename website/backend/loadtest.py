@@ -0,0 +1,395 @@
+"""
+Load test for the job API.
+
+Starts the app (uvicorn backend.main:app) in a scratch directory with its own SQLite DB,
+OCR swapped for the deterministic stub (OCR_ENGINE=stub), and embedded job workers. It
+then fires POST /api/jobs uploads at --upload-rate and GET /api/jobs polls at --poll-rate
+until every job has finished, and reports:
+
+  - p50/p95/p99 latency per endpoint, request errors
+  - job completion throughput, queue wait (started_at - created_at), run time
+  - SQLite lock errors (server log, HTTP error bodies, failed jobs)
+  - extraction accuracy when the PDFs have tender_pdf_synthesizer ground truth
+
+Run from website/:
+
+    python -m backend.loadtest --jobs 40 --upload-rate 2 --poll-rate 20 --workers 2
+
+Without --corpus a small corpus is generated with Extraction/tender_pdf_synthesizer.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+WEBSITE_DIR = Path(__file__).resolve().parents[1]
+LOCK_ERROR_RE = re.compile(r"database is locked|database table is locked", re.IGNORECASE)
+
+
+# ---------------- HTTP ----------------
+
+class Client:
+    """Minimal stdlib HTTP client; one connection per request, like independent browser tabs."""
+
+    def __init__(self, base_url: str, timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        finally:
+            conn.close()
+
+    def get_json(self, path: str) -> Any:
+        status, body = self.request("GET", path)
+        if status != 200:
+            raise RuntimeError(f"GET {path} -> {status}: {body[:200]!r}")
+        return json.loads(body)
+
+    def upload(self, pdf_path: Path, quality_score: float) -> Tuple[int, bytes]:
+        boundary = uuid.uuid4().hex
+        body = b"".join([
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"quality_score\"\r\n\r\n"
+            f"{quality_score}\r\n".encode(),
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{pdf_path.name}\"\r\n"
+            f"Content-Type: application/pdf\r\n\r\n".encode(),
+            pdf_path.read_bytes(),
+            f"\r\n--{boundary}--\r\n".encode(),
+        ])
+        return self.request("POST", "/api/jobs", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+
+
+class Recorder:
+    """Thread-safe latency / status log per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[Tuple[float, int, bytes]]] = {}
+
+    def timed(self, endpoint: str, fn, *args) -> Tuple[int, bytes]:
+        t0 = time.perf_counter()
+        try:
+            status, body = fn(*args)
+        except Exception as e:
+            status, body = 0, repr(e).encode()
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append((time.perf_counter() - t0, status, body))
+        return status, body
+
+
+# ---------------- Server ----------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(work_dir: Path, args: argparse.Namespace) -> Tuple[subprocess.Popen, str, Path]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([str(WEBSITE_DIR), os.environ.get("PYTHONPATH", "")]),
+        OCR_ENGINE="stub",
+        OCR_STUB_SECONDS=str(args.ocr_seconds),
+        JOB_WORKERS=str(args.workers),
+        EXTRACT_WORKERS=str(args.extract_workers),
+        EXTRACTION_CACHE="1" if args.cache else "0",
+        PYTHONUNBUFFERED="1",
+    )
+    log_path = work_dir / "server.log"
+    log = open(log_path, "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    client = Client(base_url, timeout=5)
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}, see {log_path}")
+        try:
+            if client.request("GET", "/api/jobs?limit=1")[0] == 200:
+                return proc, base_url, log_path
+        except OSError:
+            pass
+        time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError(f"server did not start within {args.startup_timeout}s, see {log_path}")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()  # SIGTERM: uvicorn shuts down and stops the job workers
+    try:
+        proc.wait(30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# ---------------- Load ----------------
+
+def load_corpus(args: argparse.Namespace, work_dir: Path) -> List[Path]:
+    if args.corpus:
+        pdfs = sorted(Path(args.corpus).glob("*.pdf"))
+        if not pdfs:
+            raise SystemExit(f"No PDFs in {args.corpus}")
+        return pdfs
+    sys.path.insert(0, str(WEBSITE_DIR / "Extraction"))
+    from tender_pdf_synthesizer import generate_corpus
+
+    out = work_dir / "corpus"
+    generate_corpus(str(out), n=args.generate, seed=args.seed, min_pages=args.min_pages,
+                    max_pages=args.max_pages, scanned_frac=args.scanned_frac)
+    return sorted(out.glob("*.pdf"))
+
+
+def run_load(client: Client, pdfs: List[Path], args: argparse.Namespace, rec: Recorder) -> Tuple[Dict[str, Path], float]:
+    """Open-loop uploads + list polling; returns {job_id: pdf} and the load duration."""
+    rng = random.Random(args.seed)
+    job_pdfs: Dict[str, Path] = {}
+    jobs_lock = threading.Lock()
+    uploads_done = threading.Event()
+    all_done = threading.Event()
+
+    def upload(pdf: Path) -> None:
+        status, body = rec.timed("POST /api/jobs", client.upload, pdf, round(rng.uniform(0.3, 0.95), 2))
+        if status == 200:
+            with jobs_lock:
+                job_pdfs[json.loads(body)["job_id"]] = pdf
+
+    def poller() -> None:
+        interval = 1.0 / args.poll_rate
+        next_at = time.monotonic()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            while not all_done.is_set():
+                pool.submit(rec.timed, "GET /api/jobs", client.request, "GET", f"/api/jobs?limit={args.poll_limit}")
+                next_at += interval
+                all_done.wait(max(0.0, next_at - time.monotonic()))
+
+    def tracker() -> None:
+        # completion check, kept out of the measured samples
+        while not all_done.wait(1.0):
+            if not uploads_done.is_set():
+                continue
+            with jobs_lock:
+                pending = set(job_pdfs)
+            try:
+                for job_id in pending - finished:
+                    if client.get_json(f"/api/jobs/{job_id}?fields=status")["status"] in ("succeeded", "failed"):
+                        with jobs_lock:
+                            finished.add(job_id)
+            except Exception as e:
+                print(f"[Loadtest] tracker: {e}", flush=True)
+            if len(finished) >= len(pending) or time.monotonic() > deadline:
+                all_done.set()
+
+    finished: set = set()
+    started = time.monotonic()
+    deadline = started + args.timeout
+    threads = [threading.Thread(target=tracker, daemon=True)]
+    if args.poll_rate > 0:
+        threads.append(threading.Thread(target=poller, daemon=True))
+    for t in threads:
+        t.start()
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        interval = 1.0 / args.upload_rate
+        for i, pdf in zip(range(args.jobs), itertools.cycle(pdfs)):
+            pool.submit(upload, pdf)
+            time.sleep(max(0.0, started + (i + 1) * interval - time.monotonic()))
+    uploads_done.set()
+    print(f"[Loadtest] {len(job_pdfs)}/{args.jobs} uploads accepted, waiting for jobs...", flush=True)
+    all_done.wait()
+    for t in threads:
+        t.join()
+    return job_pdfs, time.monotonic() - started
+
+
+# ---------------- Report ----------------
+
+def _percentiles(values: List[float], scale: float = 1.0) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"n": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    v = np.asarray(values, dtype=float) * scale
+    return {"n": int(len(v)), "p50": float(np.percentile(v, 50)), "p95": float(np.percentile(v, 95)),
+            "p99": float(np.percentile(v, 99)), "max": float(v.max())}
+
+
+def _ts(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def build_report(client: Client, job_pdfs: Dict[str, Path], rec: Recorder, duration: float,
+                 log_path: Optional[Path]) -> Dict[str, Any]:
+    endpoints = {}
+    http_lock_errors = 0
+    for endpoint, samples in rec.samples.items():
+        errors = [(s, b) for _, s, b in samples if not 200 <= s < 300]
+        http_lock_errors += sum(1 for _, b in errors if LOCK_ERROR_RE.search(b.decode("utf-8", "replace")))
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": len(errors),
+            "rps": len(samples) / duration if duration else None,
+            "latency_ms": _percentiles([t for t, _, _ in samples], 1000.0),
+        }
+
+    fields = "status,created_at,started_at,completed_at,error_message,result.extracted_data"
+    jobs = {job_id: client.get_json(f"/api/jobs/{job_id}?fields={fields}") for job_id in job_pdfs}
+    done = [j for j in jobs.values() if j["status"] in ("succeeded", "failed")]
+    queue_wait = [(_ts(j["started_at"]) - _ts(j["created_at"])).total_seconds() for j in done if j["started_at"]]
+    run_time = [(_ts(j["completed_at"]) - _ts(j["started_at"])).total_seconds()
+                for j in done if j["started_at"] and j["completed_at"]]
+    end_to_end = [(_ts(j["completed_at"]) - _ts(j["created_at"])).total_seconds() for j in done if j["completed_at"]]
+    span = None
+    if done:
+        span = (max(_ts(j["completed_at"]) for j in done) - min(_ts(j["created_at"]) for j in jobs.values())).total_seconds()
+
+    log_lock_errors = 0
+    if log_path is not None and log_path.exists():
+        log_lock_errors = sum(1 for line in log_path.read_text(errors="replace").splitlines() if LOCK_ERROR_RE.search(line))
+    job_lock_errors = sum(1 for j in done if j["error_message"] and LOCK_ERROR_RE.search(j["error_message"]))
+    failures: Dict[str, int] = {}
+    for j in done:
+        if j["status"] == "failed":
+            reason = (j["error_message"] or "").strip().splitlines()[0] if j["error_message"] else "?"
+            failures[reason] = failures.get(reason, 0) + 1
+
+    return {
+        "duration_seconds": duration,
+        "endpoints": endpoints,
+        "jobs": {
+            "submitted": len(jobs),
+            "succeeded": sum(1 for j in done if j["status"] == "succeeded"),
+            "failed": sum(1 for j in done if j["status"] == "failed"),
+            "unfinished": len(jobs) - len(done),
+            "throughput_jobs_per_min": 60.0 * len(done) / span if span else None,
+            "queue_wait_s": _percentiles(queue_wait),
+            "run_time_s": _percentiles(run_time),
+            "end_to_end_s": _percentiles(end_to_end),
+            "failure_reasons": failures,
+        },
+        "sqlite_lock_errors": {"server_log": log_lock_errors, "http": http_lock_errors, "jobs": job_lock_errors},
+        "accuracy": score_accuracy(jobs, job_pdfs),
+    }
+
+
+def score_accuracy(jobs: Dict[str, Dict[str, Any]], job_pdfs: Dict[str, Path]) -> Optional[Dict[str, float]]:
+    """Share of jobs extracting each field correctly, for PDFs with a ground-truth JSON."""
+    sys.path.insert(0, str(WEBSITE_DIR / "Extraction"))
+    from tender_pdf_synthesizer import score_extraction
+
+    totals: Dict[str, List[bool]] = {}
+    for job_id, job in jobs.items():
+        truth_path = job_pdfs[job_id].with_suffix(".json")
+        extracted = (job.get("result") or {}).get("extracted_data")
+        if job["status"] != "succeeded" or not truth_path.exists() or extracted is None:
+            continue
+        scores = score_extraction(json.loads(truth_path.read_text())["expected"], extracted)
+        for key, ok in scores.items():
+            totals.setdefault(key, []).append(ok)
+    return {key: float(np.mean(oks)) for key, oks in totals.items()} or None
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    fmt = lambda v: "-" if v is None else f"{v:.1f}"
+    print(f"\n=== Load test ({report['duration_seconds']:.1f}s) ===")
+    print(f"{'endpoint':<18}{'requests':>9}{'errors':>8}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for endpoint, e in report["endpoints"].items():
+        lat = e["latency_ms"]
+        print(f"{endpoint:<18}{e['requests']:>9}{e['errors']:>8}{fmt(e['rps']):>8}"
+              f"{fmt(lat['p50']):>9}{fmt(lat['p95']):>9}{fmt(lat['p99']):>9}{fmt(lat['max']):>9}")
+    jobs = report["jobs"]
+    print(f"\njobs: {jobs['submitted']} submitted, {jobs['succeeded']} succeeded, {jobs['failed']} failed, "
+          f"{jobs['unfinished']} unfinished; throughput {fmt(jobs['throughput_jobs_per_min'])} jobs/min")
+    for name in ("queue_wait_s", "run_time_s", "end_to_end_s"):
+        p = jobs[name]
+        print(f"  {name:<14} p50 {fmt(p['p50'])}  p95 {fmt(p['p95'])}  p99 {fmt(p['p99'])}  max {fmt(p['max'])}")
+    for reason, count in jobs["failure_reasons"].items():
+        print(f"  failed x{count}: {reason[:160]}")
+    print(f"sqlite lock errors: {report['sqlite_lock_errors']}")
+    if report["accuracy"]:
+        print("accuracy: " + ", ".join(f"{k} {v:.0%}" for k, v in report["accuracy"].items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the job API with stubbed OCR")
+    parser.add_argument("--jobs", type=int, default=20, help="Uploads to send")
+    parser.add_argument("--upload-rate", type=float, default=2.0, help="Uploads per second")
+    parser.add_argument("--poll-rate", type=float, default=10.0, help="GET /api/jobs per second (0 = off)")
+    parser.add_argument("--poll-limit", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16, help="Client threads per request type")
+    parser.add_argument("--workers", type=int, default=2, help="Embedded job workers (JOB_WORKERS)")
+    parser.add_argument("--extract-workers", type=int, default=1, help="EXTRACT_WORKERS per job")
+    parser.add_argument("--ocr-seconds", type=float, default=0.5, help="Stub OCR time per scanned page")
+    parser.add_argument("--cache", action="store_true", help="Enable the extraction cache")
+    parser.add_argument("--corpus", type=str, default=None, help="Directory of PDFs (+ ground-truth JSON)")
+    parser.add_argument("--generate", type=int, default=10, help="PDFs to generate without --corpus")
+    parser.add_argument("--min-pages", type=int, default=4)
+    parser.add_argument("--max-pages", type=int, default=20)
+    parser.add_argument("--scanned-frac", type=float, default=0.2)
+    parser.add_argument("--server", type=str, default=None,
+                        help="Use an already running API (its OCR is not stubbed) instead of starting one")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds to wait for all jobs")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", type=str, default=None, help="Also write the report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmp:
+        work_dir = Path(tmp)
+        pdfs = load_corpus(args, work_dir)
+        print(f"[Loadtest] corpus: {len(pdfs)} PDFs", flush=True)
+
+        proc, log_path = None, None
+        if args.server:
+            base_url = args.server.rstrip("/")
+        else:
+            proc, base_url, log_path = start_server(work_dir, args)
+            print(f"[Loadtest] server {base_url} (log {log_path})", flush=True)
+        try:
+            client = Client(base_url)
+            rec = Recorder()
+            job_pdfs, duration = run_load(client, pdfs, args, rec)
+            report = build_report(client, job_pdfs, rec, duration, log_path)
+        finally:
+            if proc is not None:
+                stop_server(proc)
+
+    report["config"] = vars(args)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
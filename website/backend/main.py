@@ -2,37 +2,79 @@ from __future__ import annotations
 
 import os
 import re
+import shutil
 import uuid
 from datetime import datetime
 from typing import Optional
 
-from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-
-from .db import get_session, init_db
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import select
+
+from .batch import iter_batch_results, parse_batch_rows
+from .curves import curve_to_list, downsample_indices, unpack_curve
+from .db import dispose_async_engine, get_async_read_session, get_session, init_db
+from .events import JobEventBroker
+from .job_listing import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    job_query,
+    list_jobs_query,
+    parse_fields,
+    serialize_job,
+    serialize_page,
+)
+from .metrics import scrape_metrics
+from .model_registry import get_models, get_registry
 from .models import Job, JobStatus, JobResult
-from .pipeline import run_full_pipeline
+from .ocr import shutdown_ocr
+from .page_extraction import shutdown_extraction
+from .uploads import UploadLimitMiddleware, UploadTooLarge, save_upload
+from .worker import start_workers, stop_workers
+
+
+# Job worker processes started with the API. 0 = run workers separately
+# (python -m backend.worker --concurrency N), e.g. to scale them independently.
+EMBEDDED_JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title="Aruigo Tender Optimizer API", version="1.0.0")
 
+    # added first so it runs inside CORS and its 413 carries the CORS headers
+    app.add_middleware(UploadLimitMiddleware, paths=("/api/jobs",))
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
+    workers = []
+    events = JobEventBroker()
+
     @app.on_event("startup")
     def _startup() -> None:
         init_db()
+        workers.extend(start_workers(EMBEDDED_JOB_WORKERS))
+        try:
+            get_registry().refresh(force=True)
+        except Exception as e:
+            print(f"[API] Model preload failed (will retry per job): {e}", flush=True)
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        stop_workers(workers)
+        shutdown_extraction()
+        shutdown_ocr()
+        await events.shutdown()
+        await dispose_async_engine()
 
     @app.post("/api/jobs")
     async def create_job(
-        background_tasks: BackgroundTasks,
         file: UploadFile = File(...),
         quality_score: float = Form(...),
         min_bid: Optional[float] = Form(default=None),
@@ -44,10 +86,12 @@ def create_app() -> FastAPI:
         job_id = str(uuid.uuid4())
         uploads_dir = os.path.join("/tmp", "aruigo_jobs", job_id)
         os.makedirs(uploads_dir, exist_ok=True)
-        file_path = os.path.join(uploads_dir, file.filename)
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        file_path = os.path.join(uploads_dir, os.path.basename(file.filename))
+        try:
+            upload = await save_upload(file, file_path)
+        except UploadTooLarge as e:
+            shutil.rmtree(uploads_dir, ignore_errors=True)
+            raise HTTPException(status_code=413, detail=str(e))
 
         with get_session() as session:
             job = Job(
@@ -59,91 +103,120 @@ def create_app() -> FastAPI:
                 max_bid=max_bid,
                 status=JobStatus.queued,
                 created_at=datetime.utcnow(),
+                pdf_sha256=upload.sha256,
+                size_bytes=upload.size_bytes,
+                page_count=upload.page_count,
             )
             session.add(job)
             session.commit()
             session.refresh(job)  # Ensure job is fully persisted
-            print(f"[API] Created job {job_id}, filename: {file.filename}", flush=True)
+            print(f"[API] Created job {job_id}, filename: {file.filename}, {upload.size_bytes} bytes, ~{upload.page_count} pages", flush=True)
 
-        background_tasks.add_task(_run_job_bg, job_id)
+        # picked up by a worker process (backend/worker.py)
         return {"job_id": job_id, "status": JobStatus.queued}
 
     @app.get("/api/jobs")
-    def list_jobs():
-        with get_session() as session:
-            jobs = session.query(Job).order_by(Job.created_at.desc()).limit(50).all()
-            print(f"[API] list_jobs: Found {len(jobs)} jobs", flush=True)
-            result = []
-            for j in jobs:
-                try:
-                    job_dict = j.to_dict(include_paths=False)
-                    if j.result is not None:
-                        job_dict["result"] = j.result.to_dict()
-                    result.append(job_dict)
-                except Exception as e:
-                    print(f"[API] Error serializing job {j.id}: {e}", flush=True)
-                    continue
-            print(f"[API] Returning {len(result)} jobs", flush=True)
-            return result
+    async def list_jobs(
+        limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+    ):
+        """
+        Newest jobs first. Pass the `X-Next-Cursor` response header back as `cursor` for
+        the next page. `fields` projects the output (see job_listing.parse_fields); the
+        diagnostic curves are left out unless requested.
+        """
+        try:
+            job_fields, result_fields = parse_fields(fields)
+            stmt = list_jobs_query(limit, cursor, result_fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async with get_async_read_session() as session:
+            jobs = (await session.execute(stmt)).scalars().all()
+            items, next_cursor = serialize_page(jobs, limit, job_fields, result_fields)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return JSONResponse(items, headers=headers)
 
     @app.get("/api/jobs/{job_id}")
-    def get_job(job_id: str):
-        with get_session() as session:
-            job = session.query(Job).get(job_id)
+    async def get_job(job_id: str, fields: Optional[str] = None):
+        try:
+            job_fields, result_fields = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        async with get_async_read_session() as session:
+            job = (await session.execute(job_query(job_id, result_fields))).scalar_one_or_none()
             if not job:
                 raise HTTPException(status_code=404, detail="Job not found")
-            data = job.to_dict(include_paths=False)
-            if job.result is not None:
-                data["result"] = job.result.to_dict()
-            return data
-
-    return app
-
-
-def _run_job_bg(job_id: str) -> None:
-    with get_session() as session:
-        job = session.query(Job).get(job_id)
-        if not job:
-            return
-        job.status = JobStatus.running
-        job.started_at = datetime.utcnow()
-        session.commit()
+            return serialize_job(job, job_fields, result_fields)
+
+    @app.get("/api/jobs/{job_id}/events")
+    async def job_events(job_id: str):
+        """
+        Server-Sent Events: one `data:` JSON frame ({job_id, status, progress}) per change
+        of the job's status or pipeline stage; the stream ends once the job succeeds or fails.
+        """
+        async with get_async_read_session() as session:
+            exists = (await session.execute(select(Job.id).where(Job.id == job_id))).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return StreamingResponse(
+            events.stream(job_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.get("/api/jobs/{job_id}/curve")
+    async def get_job_curve(job_id: str, points: Optional[int] = Query(default=None, ge=2)):
+        """Expected profit vs bid; `points` downsamples it (keeping the ends and the optimum)."""
+        async with get_async_read_session() as session:
+            row = (await session.execute(
+                select(JobResult.curve_bids, JobResult.curve_exp_profit).where(JobResult.job_id == job_id)
+            )).first()
+        if row is None or row.curve_bids is None:
+            raise HTTPException(status_code=404, detail="No diagnostic curve for this job")
+
+        bids = unpack_curve(row.curve_bids)
+        exp_profit = unpack_curve(row.curve_exp_profit)
+        n = min(len(bids), len(exp_profit))
+        bids, exp_profit = bids[:n], exp_profit[:n]
+        if points is not None:
+            idx = downsample_indices(exp_profit, points)
+            bids, exp_profit = bids[idx], exp_profit[idx]
+        return {
+            "job_id": job_id,
+            "total_points": n,
+            "bids": curve_to_list(bids),
+            "exp_profit": curve_to_list(exp_profit),
+        }
+
+    @app.get("/metrics")
+    async def metrics():
+        """Prometheus text exposition; counters and histograms are written by the workers."""
+        async with get_async_read_session() as session:
+            body = await scrape_metrics(session)
+        return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @app.post("/api/optimize/batch")
+    async def optimize_batch(request: Request):
+        content_type = request.headers.get("content-type", "")
+        body = await request.body()
+        try:
+            rows = parse_batch_rows(body, content_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         try:
-            import traceback
-            pipeline_out = run_full_pipeline(
-                pdf_path=job.file_path,
-                quality_score=job.quality_score,
-                min_bid=job.min_bid,
-                max_bid=job.max_bid,
-                work_dir=os.path.dirname(job.file_path),
-            )
+            clf_pipe, reg_pipe = get_models()
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=503, detail=str(e))
 
-            result = JobResult(
-                job_id=job.id,
-                base_price=pipeline_out.get("base_price"),
-                best_bid=pipeline_out.get("best_bid"),
-                p_win=pipeline_out.get("p_win_at_best"),
-                expected_profit=pipeline_out.get("expected_profit_at_best"),
-                profit_if_won=pipeline_out.get("profit_if_won_at_best"),
-                initial_bracket=pipeline_out.get("initial_bracket"),
-                auto_expanded=pipeline_out.get("auto_expanded"),
-                diagnostic_bids=pipeline_out.get("diagnostic_bids"),
-                diagnostic_exp_profit=pipeline_out.get("diagnostic_exp_profit"),
-                extracted_data=pipeline_out.get("extracted_data"),
-            )
-            session.add(result)
-            job.status = JobStatus.succeeded
-            job.completed_at = datetime.utcnow()
-            session.commit()
-            print(f"[Job {job_id}] SUCCESS", flush=True)
-        except Exception as e:
-            error_trace = traceback.format_exc()
-            print(f"[Job {job_id}] FAILED: {e}\n{error_trace}", flush=True)
-            job.status = JobStatus.failed
-            job.error_message = f"{str(e)}\n\n{error_trace[:500]}"  # Limit error message length
-            job.completed_at = datetime.utcnow()
-            session.commit()
+        fmt = "csv" if "csv" in content_type else "ndjson"
+        media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+        print(f"[API] optimize_batch: {len(rows)} rows ({fmt})", flush=True)
+        return StreamingResponse(iter_batch_results(rows, clf_pipe, reg_pipe, fmt=fmt), media_type=media_type)
+
+    return app
 
 
 app = create_app()
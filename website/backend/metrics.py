@@ -0,0 +1,161 @@
+"""
+Prometheus-style metrics (GET /metrics, text exposition format 0.0.4).
+
+Jobs run in worker processes, so counters and histograms are not kept in API memory:
+each worker collects a job's observations in a MetricsBatch and adds them to the
+`metric_series` table in the same transaction that records the job's outcome.
+/metrics renders those cumulative series plus gauges queried at scrape time.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from .models import ExtractionCacheEntry, Job, JobStatus, MetricSeries
+
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+PAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# family -> (type, help, histogram buckets)
+FAMILIES: Dict[str, Tuple[str, str, Optional[Sequence[float]]]] = {
+    "tender_job_stage_seconds": ("histogram", "Time per pipeline stage of a job.", STAGE_BUCKETS),
+    "tender_page_extract_seconds": ("histogram", "Step 1 time per PDF page, by whether the page was OCR'd.", PAGE_BUCKETS),
+    "tender_jobs_finished_total": ("counter", "Jobs finished, by final status.", None),
+    "tender_pages_extracted_total": ("counter", "PDF pages run through step 1.", None),
+    "tender_pages_ocr_total": ("counter", "PDF pages that needed OCR.", None),
+    "tender_extraction_cache_lookups_total": ("counter", "Extraction cache lookups by jobs, by result.", None),
+    "tender_jobs": ("gauge", "Jobs in the database, by status.", None),
+    "tender_queue_depth": ("gauge", "Jobs waiting for a worker.", None),
+    "tender_extraction_cache_entries": ("gauge", "Entries in the extraction cache.", None),
+    "tender_extraction_cache_bytes": ("gauge", "Payload bytes in the extraction cache.", None),
+}
+
+# unlabelled counters render as 0 before their first increment
+ZERO_DEFAULTS = ("tender_pages_extracted_total", "tender_pages_ocr_total")
+
+Labels = Mapping[str, str]
+
+
+def _label_str(labels: Optional[Labels]) -> str:
+    if not labels:
+        return ""
+    return ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _value_str(value: float) -> str:
+    # full round-trip precision: counters and _sum series pass 1e6 long before they stop moving
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class MetricsBatch:
+    """Counter increments and histogram observations of one job, flushed in one statement."""
+
+    def __init__(self) -> None:
+        self.deltas: Dict[Tuple[str, str], float] = defaultdict(float)
+
+    def inc(self, family: str, labels: Optional[Labels] = None, value: float = 1.0) -> None:
+        self.deltas[(family, _label_str(labels))] += value
+
+    def observe(self, family: str, value: float, labels: Optional[Labels] = None) -> None:
+        buckets = FAMILIES[family][2]
+        label_str = _label_str(labels)
+        prefix = f"{label_str}," if label_str else ""
+        for bound in list(buckets) + [float("inf")]:
+            # every bucket row is written (0 when above the value) so the histogram renders complete
+            self.deltas[(f"{family}_bucket", f'{prefix}le="{_le(bound)}"')] += 1 if value <= bound else 0
+        self.deltas[(f"{family}_sum", label_str)] += value
+        self.deltas[(f"{family}_count", label_str)] += 1
+
+    def flush(self, session) -> None:
+        """Add the deltas to metric_series; the caller commits."""
+        if not self.deltas:
+            return
+        rows = [{"name": name, "labels": labels, "value": value} for (name, labels), value in self.deltas.items()]
+        stmt = insert(MetricSeries).values(rows)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[MetricSeries.name, MetricSeries.labels],
+            set_={"value": MetricSeries.value + stmt.excluded.value},
+        ))
+        self.deltas.clear()
+
+
+def job_metrics(status: str, timings: Mapping[str, Any]) -> MetricsBatch:
+    """MetricsBatch for one finished job from the timings filled in by run_full_pipeline."""
+    batch = MetricsBatch()
+    batch.inc("tender_jobs_finished_total", {"status": status})
+    for stage, seconds in timings.get("stages", {}).items():
+        batch.observe("tender_job_stage_seconds", seconds, {"stage": stage})
+    for seconds, ocr in timings.get("pages", ()):
+        batch.observe("tender_page_extract_seconds", seconds, {"ocr": "true" if ocr else "false"})
+        batch.inc("tender_pages_extracted_total")
+        if ocr:
+            batch.inc("tender_pages_ocr_total")
+    if "cache_hit" in timings:
+        batch.inc("tender_extraction_cache_lookups_total", {"result": "hit" if timings["cache_hit"] else "miss"})
+    return batch
+
+
+def render_metrics(series: Iterable[Tuple[str, str, float]], gauges: Iterable[Tuple[str, Labels, float]]) -> str:
+    """Text exposition of stored (name, labels, value) series plus (family, labels, value) gauges."""
+    samples: Dict[str, List[Tuple[str, str, float]]] = defaultdict(list)
+    for name, labels, value in series:
+        family = name
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix) and name[: -len(suffix)] in FAMILIES:
+                family = name[: -len(suffix)]
+        samples[family].append((name, labels, value))
+    for family, labels, value in gauges:
+        samples[family].append((family, _label_str(labels), value))
+
+    lines = []
+    for family, (kind, help_text, _buckets) in FAMILIES.items():
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        if family in ZERO_DEFAULTS and family not in samples:
+            samples[family].append((family, "", 0.0))
+        for name, labels, value in sorted(samples.get(family, ()), key=_sample_order):
+            text = _value_str(value)
+            lines.append(f"{name}{{{labels}}} {text}" if labels else f"{name} {text}")
+    return "\n".join(lines) + "\n"
+
+
+def _sample_order(sample: Tuple[str, str, float]) -> Tuple[Any, ...]:
+    # group a histogram's series by label set, buckets in increasing `le`, then _sum and _count
+    name, labels, _ = sample
+    parts = dict(p.split("=", 1) for p in labels.split(",") if p)
+    le = parts.pop("le", None)
+    bound = float("inf") if le in (None, '"+Inf"') else float(le.strip('"'))
+    return (sorted(parts.items()), name.endswith("_count"), name.endswith("_sum"), bound)
+
+
+async def scrape_metrics(session) -> str:
+    """/metrics body: stored series plus job and extraction cache gauges, read with an async session."""
+    series = (await session.execute(select(MetricSeries.name, MetricSeries.labels, MetricSeries.value))).all()
+    by_status = dict((await session.execute(select(Job.status, func.count()).group_by(Job.status))).all())
+    entries, size = (await session.execute(select(
+        func.count(ExtractionCacheEntry.key), func.coalesce(func.sum(ExtractionCacheEntry.size_bytes), 0),
+    ))).one()
+
+    gauges: List[Tuple[str, Labels, float]] = [
+        ("tender_jobs", {"status": status.value}, by_status.get(status, 0)) for status in JobStatus
+    ]
+    gauges += [
+        ("tender_queue_depth", {}, by_status.get(JobStatus.queued, 0)),
+        ("tender_extraction_cache_entries", {}, entries),
+        ("tender_extraction_cache_bytes", {}, size),
+    ]
+    return render_metrics(series, gauges)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+
+
+MODELS_DIR = Path(__file__).resolve().parents[1] / "Bob_The_Builders" / "ml" / "models"
+CLASSIFIER_PATH = MODELS_DIR / "win_classifier_final.pkl"
+REGRESSOR_PATH = MODELS_DIR / "profit_regressor_final.pkl"
+
+# How often (seconds) the artifacts on disk are re-stat'ed for a newer version.
+RELOAD_CHECK_SECONDS = float(os.environ.get("MODEL_RELOAD_CHECK_SECONDS", "5"))
+
+
+@dataclass(frozen=True)
+class LoadedArtifact:
+    obj: Any
+    path: Path
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def _sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Loads each model artifact once per process and hands out the shared objects.
+
+    Artifacts are re-stat'ed at most every `check_interval` seconds; when mtime or
+    size changed the file is re-hashed and, if the content differs, reloaded.
+    The whole set is swapped in one reference assignment so callers never see a
+    classifier and regressor from different versions. Returned pipelines are
+    shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, paths: Dict[str, Path], check_interval: float = RELOAD_CHECK_SECONDS):
+        self._paths = {name: Path(p) for name, p in paths.items()}
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._artifacts: Dict[str, LoadedArtifact] = {}
+        self._last_check = 0.0
+
+    def _load(self, name: str, path: Path, current: Optional[LoadedArtifact]) -> LoadedArtifact:
+        if not path.exists():
+            raise FileNotFoundError(f"Model artifact '{name}' not found: {path}")
+        st = path.stat()
+        if current is not None and current.mtime_ns == st.st_mtime_ns and current.size == st.st_size:
+            return current
+        digest = _sha256_file(path)
+        if current is not None and current.sha256 == digest:
+            # touched but unchanged: keep the loaded object
+            return LoadedArtifact(current.obj, path, st.st_mtime_ns, st.st_size, digest)
+        print(f"[ModelRegistry] Loading {name} from {path} (sha256={digest[:12]})", file=sys.stderr)
+        return LoadedArtifact(joblib.load(path), path, st.st_mtime_ns, st.st_size, digest)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload any artifact whose content changed on disk. Returns True if anything was swapped."""
+        now = time.monotonic()
+        if not force and self._artifacts and now - self._last_check < self._check_interval:
+            return False
+        with self._lock:
+            if not force and self._artifacts and now - self._last_check < self._check_interval:
+                return False
+            current = self._artifacts
+            try:
+                updated = {name: self._load(name, path, current.get(name)) for name, path in self._paths.items()}
+            except Exception as e:
+                if not current:
+                    raise
+                # mid-swap by a retrain (missing or half-written file): keep serving the last
+                # good set and look again after the next interval
+                print(f"[ModelRegistry] Reload failed, keeping loaded models: {e!r}", file=sys.stderr)
+                self._last_check = now
+                return False
+            changed = any(updated[n].obj is not (current[n].obj if n in current else None) for n in updated)
+            self._artifacts = updated
+            self._last_check = now
+            return changed
+
+    def snapshot(self) -> Dict[str, LoadedArtifact]:
+        self.refresh()
+        return self._artifacts
+
+    def get(self, name: str) -> Any:
+        return self.snapshot()[name].obj
+
+    def version(self) -> str:
+        """Short content hash identifying the currently loaded set of artifacts."""
+        arts = self.snapshot()
+        h = hashlib.sha256()
+        for name in sorted(arts):
+            h.update(f"{name}={arts[name].sha256};".encode())
+        return h.hexdigest()[:16]
+
+
+_REGISTRY = ModelRegistry({"classifier": CLASSIFIER_PATH, "regressor": REGRESSOR_PATH})
+
+
+def get_registry() -> ModelRegistry:
+    return _REGISTRY
+
+
+def get_models() -> Tuple[Any, Any]:
+    """(clf_pipe, reg_pipe) from one consistent snapshot of the registry."""
+    arts = _REGISTRY.snapshot()
+    return arts["classifier"].obj, arts["regressor"].obj
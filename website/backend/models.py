@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import enum
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
-from sqlalchemy import Column, String, Float, DateTime, Enum, Text, ForeignKey, Boolean
+from sqlalchemy import Column, String, Float, DateTime, Enum, Text, ForeignKey, Boolean, Integer, LargeBinary, Index
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.types import JSON
 
@@ -21,6 +21,10 @@ class JobStatus(str, enum.Enum):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_created_at_id", "created_at", "id"),  # listing order / keyset cursor
+        Index("ix_jobs_status_created_at", "status", "created_at"),  # queue claims, stale scans
+    )
 
     id = Column(String, primary_key=True)
     filename = Column(String, nullable=False)
@@ -28,6 +32,9 @@ class Job(Base):
     quality_score = Column(Float, nullable=False)
     min_bid = Column(Float, nullable=True)
     max_bid = Column(Float, nullable=True)
+    pdf_sha256 = Column(String, nullable=True)  # computed while the upload streams in
+    size_bytes = Column(Integer, nullable=True)
+    page_count = Column(Integer, nullable=True)  # hint sniffed from the raw PDF bytes
     status = Column(Enum(JobStatus), default=JobStatus.queued, nullable=False)
     error_message = Column(Text, nullable=True)
 
@@ -35,22 +42,43 @@ class Job(Base):
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
+    # job queue bookkeeping (see backend/worker.py)
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=True)
+    progress = Column(JSON, nullable=True)  # latest pipeline stage, see worker._ProgressWriter
+    timings = Column(JSON, nullable=True)  # seconds per pipeline stage, see worker._timings_summary
+
     result = relationship("JobResult", back_populates="job", uselist=False, cascade="all, delete-orphan")
 
-    def to_dict(self, include_paths: bool = False) -> Dict[str, Any]:
-        return {
+    FIELDS = (
+        "id", "filename", "file_path", "quality_score", "min_bid", "max_bid", "size_bytes", "page_count",
+        "status", "error_message", "created_at", "started_at", "completed_at", "attempts", "progress",
+        "timings",
+    )
+
+    def to_dict(self, include_paths: bool = False, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        data = {
             "id": self.id,
             "filename": self.filename,
             "file_path": self.file_path if include_paths else None,
             "quality_score": self.quality_score,
             "min_bid": self.min_bid,
             "max_bid": self.max_bid,
+            "size_bytes": self.size_bytes,
+            "page_count": self.page_count,
             "status": self.status.value if isinstance(self.status, JobStatus) else self.status,
             "error_message": self.error_message,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "attempts": self.attempts,
+            "progress": self.progress,
+            "timings": self.timings,
         }
+        if fields is not None:
+            data = {f: data[f] for f in fields}
+        return data
 
 
 class JobResult(Base):
@@ -64,24 +92,64 @@ class JobResult(Base):
     profit_if_won = Column(Float, nullable=True)
     initial_bracket = Column(JSON, nullable=True)
     auto_expanded = Column(Boolean, nullable=True)
-    diagnostic_bids = Column(JSON, nullable=True)
-    diagnostic_exp_profit = Column(JSON, nullable=True)
+    # packed float32 curves, see backend/curves.py (replaced the old JSON diagnostic_* columns)
+    curve_bids = Column(LargeBinary, nullable=True)
+    curve_exp_profit = Column(LargeBinary, nullable=True)
+    curve_points = Column(Integer, nullable=True)
     extracted_data = Column(JSON, nullable=True)  # All extracted tender parameters
 
     job = relationship("Job", back_populates="result")
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "base_price": self.base_price,
-            "best_bid": self.best_bid,
-            "p_win_at_best": self.p_win,
-            "expected_profit_at_best": self.expected_profit,
-            "profit_if_won_at_best": self.profit_if_won,
-            "initial_bracket": self.initial_bracket,
-            "auto_expanded": self.auto_expanded,
-            "diagnostic_bids": self.diagnostic_bids,
-            "diagnostic_exp_profit": self.diagnostic_exp_profit,
-            "extracted_data": self.extracted_data,
-        }
+    # to_dict() key -> column attribute
+    FIELDS = {
+        "base_price": "base_price",
+        "best_bid": "best_bid",
+        "p_win_at_best": "p_win",
+        "expected_profit_at_best": "expected_profit",
+        "profit_if_won_at_best": "profit_if_won",
+        "initial_bracket": "initial_bracket",
+        "auto_expanded": "auto_expanded",
+        "diagnostic_points": "curve_points",
+        "diagnostic_bids": "curve_bids",
+        "diagnostic_exp_profit": "curve_exp_profit",
+        "extracted_data": "extracted_data",
+    }
+    # large per-job payloads, left out of job responses unless asked for
+    # (GET /api/jobs/{id}/curve serves them, optionally downsampled)
+    HEAVY_FIELDS = ("diagnostic_bids", "diagnostic_exp_profit")
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        # only touches the requested attributes, so deferred columns stay unloaded
+        from .curves import curve_to_list, unpack_curve
+
+        fields = self.FIELDS if fields is None else fields
+        data = {}
+        for f in fields:
+            value = getattr(self, self.FIELDS[f])
+            if f in self.HEAVY_FIELDS:
+                value = curve_to_list(unpack_curve(value)) if value is not None else None
+            data[f] = value
+        return data
+
+
+class ExtractionCacheEntry(Base):
+    """Step 1-3 outputs for one PDF content hash + extractor version."""
+    __tablename__ = "extraction_cache"
+
+    key = Column(String, primary_key=True)  # f"{pdf_sha256}:{extractor_version}"
+    pdf_sha256 = Column(String, nullable=False)
+    extractor_version = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)  # text_blocks, contexts, extracted_data, base_price
+    size_bytes = Column(Integer, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow)
+
 
+class MetricSeries(Base):
+    """Cumulative value of one counter / histogram series, see backend/metrics.py."""
+    __tablename__ = "metric_series"
 
+    name = Column(String, primary_key=True)  # e.g. tender_job_stage_seconds_bucket
+    labels = Column(String, primary_key=True, default="")  # rendered label set, e.g. stage="extract",le="1.0"
+    value = Column(Float, nullable=False, default=0.0)
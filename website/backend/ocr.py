@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+
+# 0 = run OCR in the calling process; N > 0 = N dedicated OCR worker processes fed through
+# the executor's task queue. Either way the PaddleOCR model is loaded once per process,
+# on the first page that actually needs OCR, and stays warm across jobs.
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", "0"))
+# "paddle", or "stub": a deterministic stand-in without a model (see StubOCR), for load tests.
+OCR_ENGINE = os.environ.get("OCR_ENGINE", "paddle")
+OCR_STUB_SECONDS = float(os.environ.get("OCR_STUB_SECONDS", "0.5"))
+
+_engine: Any = None
+_engine_lock = threading.Lock()
+_infer_lock = threading.Lock()  # PaddleOCR predictors are not thread-safe
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class StubOCR:
+    """
+    PaddleOCR stand-in with the same result shape. Takes OCR_STUB_SECONDS per page and
+    returns text derived from the image bytes, so the same page always gives the same text.
+    """
+
+    def ocr(self, img: Any) -> Any:
+        time.sleep(OCR_STUB_SECONDS)
+        h, w = img.shape[:2]
+        digest = hashlib.sha1(img.tobytes()).hexdigest()[:12]
+        box = [[0, 0], [w, 0], [w, 20], [0, 20]]
+        lines = [f"Scanned page {w}x{h} ref {digest}", "Terms and conditions as per the tender document."]
+        return [[[box, (text, 0.99)]] for text in lines]
+
+
+def get_ocr_engine() -> Any:
+    """Process-wide OCR engine (PaddleOCR, or StubOCR with OCR_ENGINE=stub), created on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None and OCR_ENGINE == "stub":
+                _engine = StubOCR()
+            elif _engine is None:
+                from paddleocr import PaddleOCR
+                print(f"[OCR] Loading PaddleOCR in pid {os.getpid()}", file=sys.stderr)
+                _engine = PaddleOCR(use_angle_cls=True, lang='en')
+    return _engine
+
+
+def format_ocr_result(result: Any) -> str:
+    """Flatten PaddleOCR output into page text, one OCR line per text line."""
+    ocr_text = []
+    if result is not None:
+        for line in result:
+            if line is None:
+                ocr_text.append("None")
+                continue
+            try:
+                line_text = " ".join([word_info[1][0] if word_info and len(word_info) > 1 and word_info[1] and len(word_info[1]) > 0 else "None" for word_info in line])
+                ocr_text.append(line_text)
+            except (TypeError, IndexError):
+                ocr_text.append("None")
+    else:
+        ocr_text.append("None")
+    return "\n".join(ocr_text) if ocr_text else "None"
+
+
+def _ocr_in_process(img: Any) -> str:
+    engine = get_ocr_engine()
+    with _infer_lock:
+        result = engine.ocr(img)
+    return format_ocr_result(result)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: paddle does not survive fork() of a process that already touched it
+                _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def ocr_image(img: Any) -> str:
+    """OCR a BGR page image and return its text."""
+    if OCR_WORKERS > 0:
+        return _get_pool().submit(_ocr_in_process, img).result()
+    return _ocr_in_process(img)
+
+
+def shutdown_ocr() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import ocr
+
+
+# Number of processes used for step 1. 1 = serial (in the calling process).
+EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", "1"))
+# Page ranges per worker; >1 keeps workers busy when some ranges are OCR-heavy.
+RANGES_PER_WORKER = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def extract_page(page: Any, page_num: int) -> Dict[str, Any]:
+    """
+    Extract one pdfplumber page.
+
+    Returns {"page_num", "tables", "text", "ocr", "seconds"}: tables are raw
+    `extract_tables()` rows, text is the digital text, the OCR text for pages with
+    neither text nor tables (ocr=True), or None when the page only has tables.
+    seconds is the wall time spent on the page.
+    """
+    started = time.perf_counter()
+    tables = page.extract_tables()
+    page_text = page.extract_text() or ""
+    text = page_text if page_text.strip() else None
+
+    is_ocr = not tables and not page_text.strip()
+    if is_ocr:
+        import cv2
+        import numpy as np
+
+        page_image = page.to_image(resolution=300).original
+        img = cv2.cvtColor(np.array(page_image), cv2.COLOR_RGB2BGR)
+        text = ocr.ocr_image(img)
+
+    return {
+        "page_num": page_num,
+        "tables": tables or [],
+        "text": text,
+        "ocr": is_ocr,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def extract_page_range(pdf_path: str, first: int, last: int) -> List[Dict[str, Any]]:
+    """Extract pages first..last (1-based, inclusive). Runs inside pool workers."""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return [extract_page(pdf.pages[n - 1], n) for n in range(first, last + 1)]
+
+
+def page_ranges(n_pages: int, workers: int) -> List[Tuple[int, int]]:
+    size = max(1, math.ceil(n_pages / (workers * RANGES_PER_WORKER)))
+    return [(a, min(a + size - 1, n_pages)) for a in range(1, n_pages + 1, size)]
+
+
+def _init_worker() -> None:
+    # extraction workers OCR in-process; a nested OCR pool per worker would oversubscribe
+    ocr.OCR_WORKERS = 0
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def iter_extracted_pages(pdf_path: str, workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield extract_page() results in page order, each with the document's "n_pages" added.
+
+    With workers > 1 the PDF is split into page ranges that run in a persistent
+    process pool; results are merged back in page order, so the output is the
+    same as the serial path.
+    """
+    import pdfplumber
+
+    workers = EXTRACT_WORKERS if workers is None else workers
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+        if workers <= 1 or n_pages < 2:
+            for page_num, page in enumerate(pdf.pages, start=1):
+                yield dict(extract_page(page, page_num), n_pages=n_pages)
+            return
+
+    pool = _get_pool(workers)
+    futures = [pool.submit(extract_page_range, pdf_path, a, b) for a, b in page_ranges(n_pages, workers)]
+    try:
+        for fut in futures:
+            for page in fut.result():
+                yield dict(page, n_pages=n_pages)
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
+def shutdown_extraction() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
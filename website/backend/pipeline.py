@@ -3,21 +3,55 @@ from __future__ import annotations
 import os
 import re
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 # Local imports from project scripts (avoid importing extractor to prevent side effects)
 from Extraction import extract_tender_params as step2_params
-from Bob_The_Builders.ml.bid_optimization_pipeline_from_scratch import optimize_bid
-import joblib
+from Bob_The_Builders.ml.bid_optimization_pipeline_from_scratch import get_markup_table, optimize_bid
+
+from .extraction_cache import get_cached_extraction, put_cached_extraction, sha256_file
+from .model_registry import get_models
+from .page_extraction import iter_extracted_pages
 
 # Import step 3 functions
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Extraction"))
-from multiple3 import build_extraction_rules, SIMPLE_RULES
+from multiple3 import RULE_ENGINE, SIMPLE_RULES
+
+
+# Write step 1/2 intermediate files (extracted_pages_new/, param_contexts/) for debugging.
+WRITE_ARTIFACTS = os.environ.get("PIPELINE_WRITE_ARTIFACTS", "0") == "1"
+USE_EXTRACTION_CACHE = os.environ.get("EXTRACTION_CACHE", "1") != "0"
+
+# progress(stage, **info). Stages, in order: "cache" (hit), "extract" (page, pages; once per
+# page, skipped on a cache hit), "params" (documents), "rules" (documents), "models",
+# "optimize", "done" (best_bid).
+ProgressHook = Callable[..., None]
+
 
+def _report(progress: Optional[ProgressHook], stage: str, **info: Any) -> None:
+    if progress is None:
+        return
+    try:
+        progress(stage, **info)
+    except Exception as e:  # a broken hook must not fail the job
+        print(f"[Pipeline] progress hook failed at {stage}: {e}", file=sys.stderr)
 
-def _ensure_dir(path: str) -> None:
-    os.makedirs(path, exist_ok=True)
+
+# timings, when passed to run_full_pipeline, is filled in place (also when the job fails):
+# {"stages": {stage: seconds}, "pages": [[seconds, ocr], ...], "cache_hit": bool}.
+# Stages: "cache_lookup", "extract", "params", "rules", "models", "optimize".
+@contextmanager
+def _timed(timings: Optional[Dict[str, Any]], stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            stages = timings.setdefault("stages", {})
+            stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - started
 
 
 def run_full_pipeline(
@@ -26,51 +60,137 @@ def run_full_pipeline(
     work_dir: Optional[str] = None,
     min_bid: Optional[float] = None,
     max_bid: Optional[float] = None,
+    extract_workers: Optional[int] = None,
+    write_artifacts: Optional[bool] = None,
+    pdf_sha256: Optional[str] = None,
+    use_cache: Optional[bool] = None,
+    progress: Optional[ProgressHook] = None,
+    timings: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Runs: Step1 extraction -> Step2 param contexts -> Base price parse -> Optimizer.
     Returns dict suitable to persist and send back to FE.
+    `extract_workers` overrides EXTRACT_WORKERS for step 1.
+
+    Steps 1-3 pass their outputs in memory. With `write_artifacts` (default:
+    PIPELINE_WRITE_ARTIFACTS=1) the page texts/tables and param_contexts are also
+    written under work_dir/extracted_pages_new for debugging.
+
+    Steps 1-3 are looked up in the extraction cache by the PDF's SHA-256
+    (`pdf_sha256` if the caller already has it); `use_cache` defaults to
+    EXTRACTION_CACHE != "0".
+
+    `progress` is called as progress(stage, **info) as the job advances (see ProgressHook).
+    `timings` collects per-stage and per-page durations (see _timed).
     """
     if work_dir is None:
         work_dir = os.path.dirname(pdf_path) or "."
+    if write_artifacts is None:
+        write_artifacts = WRITE_ARTIFACTS
+
+    out_folder = os.path.join(work_dir, "extracted_pages_new") if write_artifacts else None
+    if use_cache is None:
+        use_cache = USE_EXTRACTION_CACHE
+
+    # --- Steps 1-3, skipped when this exact PDF was already extracted ---
+    payload = None
+    if use_cache:
+        with _timed(timings, "cache_lookup"):
+            try:
+                pdf_sha256 = pdf_sha256 or sha256_file(pdf_path)
+                payload = get_cached_extraction(pdf_sha256)
+            except Exception as e:
+                print(f"[Pipeline] Extraction cache lookup failed: {e}", file=sys.stderr)
+        if timings is not None:
+            timings["cache_hit"] = payload is not None
+    _report(progress, "cache", hit=payload is not None)
+    if payload is not None:
+        print(f"[Pipeline] Extraction cache hit for {pdf_sha256[:12]}, skipping steps 1-3", file=sys.stderr)
+    else:
+        payload = _extract_document(pdf_path, out_folder, extract_workers, progress, timings)
+        if use_cache and pdf_sha256:
+            try:
+                put_cached_extraction(pdf_sha256, payload)
+            except Exception as e:
+                print(f"[Pipeline] Extraction cache store failed: {e}", file=sys.stderr)
 
-    out_folder = os.path.join(work_dir, "extracted_pages_new")
-    _ensure_dir(out_folder)
+    extracted_data = payload["extracted_data"]
+    base_price = payload["base_price"]
+    if base_price is None or base_price <= 0:
+        raise ValueError(f"Could not determine valid base price from extracted document. Got: {base_price}")
+
+    print(f"[Pipeline] Using base_price: {base_price}", file=sys.stderr)
 
+    # --- Get models from the process-wide registry and run optimizer ---
+    print("[Pipeline] Loading ML models...", file=sys.stderr)
+    _report(progress, "models")
+    with _timed(timings, "models"):
+        clf_pipe, reg_pipe = get_models()
+    print("[Pipeline] Models loaded. Running optimizer...", file=sys.stderr)
+    _report(progress, "optimize")
+
+    with _timed(timings, "optimize"):
+        out = optimize_bid(
+            clf_pipe,
+            reg_pipe,
+            base_price=float(base_price),
+            quality_score=float(quality_score),
+            min_bid=min_bid,
+            max_bid=max_bid,
+            auto_expand=True,
+            use_profit_formula=True,
+            markup_table=get_markup_table(clf_pipe),
+        )
+    # Ensure all expected fields exist
+    if "profit_if_won_at_best" not in out:
+        # use_profit_formula=True above, so profit_if_won = best_bid - base_price
+        try:
+            out["profit_if_won_at_best"] = float(out.get("best_bid", 0.0)) - float(base_price)
+        except Exception:
+            out["profit_if_won_at_best"] = None
+    out["base_price"] = float(base_price)
+    out["extracted_data"] = extracted_data  # Add all extracted tender parameters
+    print(f"[Pipeline] Optimization complete. Best bid: {out.get('best_bid')}", file=sys.stderr)
+    print(f"[Pipeline] Extracted data: {extracted_data}", file=sys.stderr)
+    _report(progress, "done", best_bid=out.get("best_bid"))
+    return out
+
+
+def _extract_document(
+    pdf_path: str,
+    out_folder: Optional[str],
+    extract_workers: Optional[int],
+    progress: Optional[ProgressHook] = None,
+    timings: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Steps 1-3 plus base price derivation; the returned dict is what the extraction cache stores."""
     # --- Step 1: Extract pages/tables/texts from the uploaded PDF ---
     print("[Pipeline] Step 1: Extracting pages/tables/texts from PDF...", file=sys.stderr)
-    _run_step1_extraction(pdf_path, out_folder)
-    print(f"[Pipeline] Step 1 complete. Files saved to {out_folder}", file=sys.stderr)
+    with _timed(timings, "extract"):
+        text_blocks = _run_step1_extraction(
+            pdf_path, out_folder, workers=extract_workers, progress=progress, timings=timings
+        )
+    print(f"[Pipeline] Step 1 complete. {len(text_blocks)} text blocks", file=sys.stderr)
 
     # --- Step 2: Collect param contexts ---
     print("[Pipeline] Step 2: Collecting parameter contexts...", file=sys.stderr)
-    orig_folder = step2_params.Config.PROTOCOL_FOLDER
-    try:
-        step2_params.Config.PROTOCOL_FOLDER = out_folder
-        text_blocks = step2_params.read_all_texts_and_tables(out_folder)
+    _report(progress, "params", documents=len(text_blocks))
+    with _timed(timings, "params"):
         contexts = step2_params.collect_keyword_contexts(text_blocks)
+        param_docs, index_text = _param_context_documents(contexts)
+    if out_folder is not None:
         param_context_dir = Path(out_folder) / "param_contexts"
         param_context_dir.mkdir(parents=True, exist_ok=True)
-        index_lines = []
-        for param, snippets in contexts.items():
-            if not snippets:
-                (param_context_dir / f"{param}_000.txt").write_text("", encoding="utf-8")
-                index_lines.append(f"{param}: 0")
-                continue
-            for i, (source, snippet) in enumerate(snippets, 1):
-                fname = f"{param}_{i:03}.txt"
-                header = f"# param: {param}\n# source: {source}\n\n"
-                (param_context_dir / fname).write_text(header + "\n".join(snippet), encoding="utf-8")
-            index_lines.append(f"{param}: {len(snippets)}")
-        (param_context_dir / "INDEX.txt").write_text("\n".join(index_lines), encoding="utf-8")
-        print(f"[Pipeline] Step 2 complete. Contexts saved to {param_context_dir}", file=sys.stderr)
-    finally:
-        step2_params.Config.PROTOCOL_FOLDER = orig_folder
+        for fname, text in param_docs:
+            (param_context_dir / fname).write_text(text, encoding="utf-8")
+        (param_context_dir / "INDEX.txt").write_text(index_text, encoding="utf-8")
+    print(f"[Pipeline] Step 2 complete. {len(param_docs)} param context documents", file=sys.stderr)
 
     # --- Step 3: Extract final values from param_contexts ---
     print("[Pipeline] Step 3: Extracting final values from param_contexts...", file=sys.stderr)
-    param_context_dir = Path(out_folder) / "param_contexts"
-    extracted_data = _run_step3_extraction(param_context_dir)
+    _report(progress, "rules", documents=len(param_docs))
+    with _timed(timings, "rules"):
+        extracted_data = _run_step3_extraction(param_docs)
     print(f"[Pipeline] Step 3 extracted: {extracted_data}", file=sys.stderr)
 
     # --- Derive base_price (Estimated Cost) from extracted data ---
@@ -86,104 +206,75 @@ def run_full_pipeline(
         base_price = _extract_estimated_cost_from_contexts(contexts)
         if base_price is None:
             # Last resort: search any number-like in all texts
-            base_price = _fallback_first_money(out_folder)
-
-    if base_price is None or base_price <= 0:
-        raise ValueError(f"Could not determine valid base price from extracted document. Got: {base_price}")
+            base_price = _fallback_first_money(text_blocks)
 
-    print(f"[Pipeline] Using base_price: {base_price}", file=sys.stderr)
+    return {
+        "text_blocks": text_blocks,
+        "contexts": contexts,
+        "extracted_data": extracted_data,
+        "base_price": base_price,
+    }
 
-    # --- Load models with absolute paths and run optimizer ---
-    print("[Pipeline] Loading ML models...", file=sys.stderr)
-    repo_root = Path(__file__).resolve().parents[1]
-    models_dir = repo_root / "Bob_The_Builders" / "ml" / "models"
-    clf_path = models_dir / "win_classifier_final.pkl"
-    reg_path = models_dir / "profit_regressor_final.pkl"
-    
-    if not clf_path.exists():
-        raise FileNotFoundError(f"Classifier model not found: {clf_path}")
-    if not reg_path.exists():
-        raise FileNotFoundError(f"Regressor model not found: {reg_path}")
-    
-    clf_pipe = joblib.load(clf_path)
-    reg_pipe = joblib.load(reg_path)
-    print("[Pipeline] Models loaded. Running optimizer...", file=sys.stderr)
-
-    out = optimize_bid(
-        clf_pipe,
-        reg_pipe,
-        base_price=float(base_price),
-        quality_score=float(quality_score),
-        min_bid=min_bid,
-        max_bid=max_bid,
-        auto_expand=True,
-        use_profit_formula=True,
-    )
-    # Ensure all expected fields exist
-    if "profit_if_won_at_best" not in out:
-        # use_profit_formula=True above, so profit_if_won = best_bid - base_price
-        try:
-            out["profit_if_won_at_best"] = float(out.get("best_bid", 0.0)) - float(base_price)
-        except Exception:
-            out["profit_if_won_at_best"] = None
-    out["base_price"] = float(base_price)
-    out["extracted_data"] = extracted_data  # Add all extracted tender parameters
-    print(f"[Pipeline] Optimization complete. Best bid: {out.get('best_bid')}", file=sys.stderr)
-    print(f"[Pipeline] Extracted data: {extracted_data}", file=sys.stderr)
-    return out
 
+def _run_step1_extraction(
+    pdf_path: str,
+    output_folder: Optional[str] = None,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressHook] = None,
+    timings: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Step 1 in memory: (source, content) blocks for step 2.
 
-def _run_step1_extraction(pdf_path: str, output_folder: str) -> None:
-    """Minimal re-implementation of the script loop to avoid re-import side effects."""
-    import pdfplumber
-    from paddleocr import PaddleOCR
+    Names, normalization and order match step2_params.read_all_texts_and_tables on
+    the files the script would have written (texts first, then tables, each sorted
+    by file name). When output_folder is given those files are written as well.
+    """
     import pandas as pd
-    import cv2
-    import numpy as np
-
-    os.makedirs(output_folder, exist_ok=True)
-    ocr = PaddleOCR(use_angle_cls=True, lang='en')
-
-    def save_table(df, page_num, table_idx):
-        csv_path = os.path.join(output_folder, f"page{page_num}_table{table_idx}.csv")
-        df.to_csv(csv_path, index=False, header=False)
-
-    def save_text(text, page_num):
-        text_path = os.path.join(output_folder, f"page{page_num}_text.txt")
-        with open(text_path, "w", encoding="utf-8") as f:
-            f.write(text)
-
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, start=1):
-            tables = page.extract_tables()
-            page_text = page.extract_text() or ""
-
-            if tables:
-                for idx, table in enumerate(tables):
-                    df = pd.DataFrame(table[1:], columns=table[0])
-                    save_table(df, page_num, idx)
-
-            if page_text.strip():
-                save_text(page_text, page_num)
-
-            if not tables and not page_text.strip():
-                page_image = page.to_image(resolution=300).original
-                img = cv2.cvtColor(np.array(page_image), cv2.COLOR_RGB2BGR)
-                result = ocr.ocr(img)
-                ocr_text = []
-                if result is not None:
-                    for line in result:
-                        if line is None:
-                            ocr_text.append("None")
-                            continue
-                        try:
-                            line_text = " ".join([word_info[1][0] if word_info and len(word_info) > 1 and word_info[1] and len(word_info[1]) > 0 else "None" for word_info in line])
-                            ocr_text.append(line_text)
-                        except (TypeError, IndexError) as e:
-                            ocr_text.append("None")
-                else:
-                    ocr_text.append("None")
-                save_text("\n".join(ocr_text) if ocr_text else "None", page_num)
+
+    if output_folder is not None:
+        os.makedirs(output_folder, exist_ok=True)
+
+    texts: List[Tuple[str, str]] = []
+    tables: List[Tuple[str, str]] = []
+    for page in iter_extracted_pages(pdf_path, workers=workers):
+        page_num = page["page_num"]
+        _report(progress, "extract", page=page_num, pages=page["n_pages"])
+        if timings is not None:
+            timings.setdefault("pages", []).append([page["seconds"], page["ocr"]])
+        for idx, table in enumerate(page["tables"]):
+            name = f"page{page_num}_table{idx}.csv"
+            csv_text = pd.DataFrame(table[1:], columns=table[0]).to_csv(index=False, header=False)
+            if output_folder is not None:
+                with open(os.path.join(output_folder, name), "w", encoding="utf-8") as f:
+                    f.write(csv_text)
+            tables.append((name, re.sub(r",\s*", " | ", csv_text.strip())))
+        if page["text"] is not None:
+            name = f"page{page_num}_text.txt"
+            if output_folder is not None:
+                with open(os.path.join(output_folder, name), "w", encoding="utf-8") as f:
+                    f.write(page["text"])
+            content = page["text"].strip()
+            if content:
+                texts.append((name, content))
+
+    return sorted(texts) + sorted(tables)
+
+
+def _param_context_documents(contexts: Dict[str, Any]) -> Tuple[List[Tuple[str, str]], str]:
+    """Step 2 output as (file name, text) documents in step-3 order, plus the INDEX text."""
+    docs: List[Tuple[str, str]] = []
+    index_lines = []
+    for param, snippets in contexts.items():
+        if not snippets:
+            docs.append((f"{param}_000.txt", ""))
+            index_lines.append(f"{param}: 0")
+            continue
+        for i, (source, snippet) in enumerate(snippets, 1):
+            header = f"# param: {param}\n# source: {source}\n\n"
+            docs.append((f"{param}_{i:03}.txt", header + "\n".join(snippet)))
+        index_lines.append(f"{param}: {len(snippets)}")
+    return sorted(docs), "\n".join(index_lines)
 
 
 def _extract_estimated_cost_from_contexts(contexts: Dict[str, Any]) -> Optional[float]:
@@ -205,10 +296,11 @@ def _extract_estimated_cost_from_contexts(contexts: Dict[str, Any]) -> Optional[
     return max(candidates) if candidates else (min(candidates) if candidates else None)
 
 
-def _fallback_first_money(extracted_dir: str) -> Optional[float]:
+def _fallback_first_money(text_blocks: List[Tuple[str, str]]) -> Optional[float]:
     money_re = re.compile(r"[₹\s]*([0-9][0-9,\.]{4,})")
-    for p in sorted(Path(extracted_dir).glob("*.txt")):
-        text = p.read_text(encoding="utf-8", errors="ignore")
+    for source, text in text_blocks:
+        if not source.endswith(".txt"):
+            continue
         m = money_re.search(text)
         if m:
             try:
@@ -218,47 +310,26 @@ def _fallback_first_money(extracted_dir: str) -> Optional[float]:
     return None
 
 
-def _run_step3_extraction(param_context_dir: Path) -> Dict[str, Any]:
-    """Run step 3 extraction on param_contexts folder."""
-    extraction_rules = build_extraction_rules(SIMPLE_RULES)
+def _run_step3_extraction(param_docs: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """Run step 3 extraction on the param context documents (in file-name order)."""
     final_extracted_data = {key: None for key in SIMPLE_RULES.keys()}
-    
-    if not param_context_dir.exists():
-        return {k: "NAN" for k in SIMPLE_RULES.keys()}
-    
-    all_files = sorted([f for f in os.listdir(param_context_dir) if f.endswith('.txt') and not f.startswith('INDEX')])
-    
-    for filename in all_files:
-        if all(value is not None for value in final_extracted_data.values()):
+
+    for filename, text in param_docs:
+        pending = [key for key, value in final_extracted_data.items() if value is None]
+        if not pending:
             break
-            
-        file_path = param_context_dir / filename
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                text = file.read()
-                text += "\nEnd of Document"
-            
-            for key_name, rule in extraction_rules.items():
-                if final_extracted_data[key_name] is None:
-                    match = None
-                    normalizer = rule["normalizer"]
-                    
-                    if rule["pattern_colon"]:
-                        match = rule["pattern_colon"].search(text)
-                    if not match and rule["pattern_proximity"]:
-                        match = rule["pattern_proximity"].search(text)
-                    
-                    if match:
-                        try:
-                            raw_value = match.groups()[-1]
-                            normalized_value = normalizer(raw_value)
-                            if normalized_value:
-                                final_extracted_data[key_name] = normalized_value
-                        except Exception:
-                            continue
-        except Exception:
-            continue
-    
+
+        text += "\nEnd of Document"
+        for key_name, match in RULE_ENGINE.search(text, pending).items():
+            if match:
+                try:
+                    raw_value = match.groups()[-1]
+                    normalized_value = RULE_ENGINE.rules[key_name]["normalizer"](raw_value)
+                    if normalized_value:
+                        final_extracted_data[key_name] = normalized_value
+                except Exception:
+                    continue
+
     # Replace None with "NAN"
     for key, value in final_extracted_data.items():
         if value is None:
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+# Content-Length allowance for the multipart boundaries and form fields around the file.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Page objects in the raw PDF bytes ("/Type /Page" but not "/Type /Pages"). This is a hint:
+# PDFs that keep page dictionaries in compressed object streams report 0.
+_PAGE_RE = re.compile(rb"/Type\s{0,8}/Page[^a-zA-Z]")
+_PAGE_TAIL_BYTES = 64
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    size_bytes: int
+    sha256: str
+    page_count: Optional[int]
+
+
+class _UploadSink:
+    """File, hash, size and page hint of one upload; write() runs in a worker thread."""
+
+    def __init__(self, f):
+        self.f = f
+        self.h = hashlib.sha256()
+        self.size = 0
+        self.pages = 0
+        self.tail = b""
+
+    def write(self, chunk: bytes) -> None:
+        self.h.update(chunk)
+        self.f.write(chunk)
+        # matches ending inside `tail` were already counted with the previous chunk
+        buf = self.tail + chunk
+        self.pages += sum(1 for m in _PAGE_RE.finditer(buf) if m.end() > len(self.tail))
+        self.tail = buf[-_PAGE_TAIL_BYTES:]
+        self.size += len(chunk)
+
+
+async def save_upload(
+    file: UploadFile,
+    dest_path: str,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_BYTES,
+) -> StoredUpload:
+    """
+    Stream an upload to dest_path in fixed-size chunks.
+
+    SHA-256, size and a page-count hint are computed on the fly, so nothing downstream
+    has to re-read the file for them. Writing and hashing run in the threadpool so large
+    uploads do not block the event loop. Raises UploadTooLarge (and removes the partial
+    file) once more than max_bytes have arrived.
+    """
+    try:
+        with open(dest_path, "wb") as f:
+            sink = _UploadSink(f)
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                if sink.size + len(chunk) > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                await run_in_threadpool(sink.write, chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    return StoredUpload(path=dest_path, size_bytes=sink.size, sha256=sink.h.hexdigest(), page_count=sink.pages or None)
+
+
+class UploadLimitMiddleware:
+    """
+    Reject uploads to `paths` whose Content-Length already exceeds the limit with 413,
+    before the multipart body is received and spooled. Bodies without Content-Length
+    (chunked) are still caught by save_upload.
+    """
+
+    def __init__(self, app, paths: Tuple[str, ...], max_bytes: int = MAX_UPLOAD_BYTES):
+        self.app = app
+        self.paths = paths
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.paths:
+            length = dict(scope["headers"]).get(b"content-length")
+            if length is not None and length.isdigit() and int(length) > self.max_bytes + MULTIPART_OVERHEAD_BYTES:
+                response = JSONResponse({"detail": f"Upload exceeds {self.max_bytes} bytes"}, status_code=413)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
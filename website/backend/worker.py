@@ -0,0 +1,334 @@
+"""
+Job queue workers.
+
+The `jobs` table is the queue: the API inserts rows with status `queued` and worker
+processes claim them one at a time. A claim is a conditional UPDATE (status still
+`queued`), so two workers can never run the same job. While a job runs its worker
+refreshes `heartbeat_at`; jobs whose heartbeat is older than STALE_AFTER_SECONDS
+(worker killed, pod restarted) are put back on the queue, or failed after
+MAX_ATTEMPTS. Concurrency is the number of worker processes.
+
+Run standalone workers with:
+
+    python -m backend.worker --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+
+from .curves import pack_curve
+from .db import get_session, init_db
+from .metrics import MetricsBatch, job_metrics
+from .models import Job, JobResult, JobStatus
+
+
+POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", "1.0"))
+HEARTBEAT_SECONDS = float(os.environ.get("WORKER_HEARTBEAT_SECONDS", "5"))
+STALE_AFTER_SECONDS = float(os.environ.get("WORKER_STALE_AFTER_SECONDS", "60"))
+MAX_ATTEMPTS = int(os.environ.get("WORKER_MAX_ATTEMPTS", "3"))
+# Progress is written at most this often (stage changes are always written).
+PROGRESS_MIN_INTERVAL_SECONDS = float(os.environ.get("WORKER_PROGRESS_INTERVAL_SECONDS", "0.5"))
+
+
+def claim_next_job(worker_id: str) -> Optional[str]:
+    """Atomically move the oldest queued job to running for this worker; None if the queue is empty."""
+    with get_session() as session:
+        while True:
+            job_id = (
+                session.query(Job.id)
+                .filter(Job.status == JobStatus.queued)
+                .order_by(Job.created_at.asc())
+                .limit(1)
+                .scalar()
+            )
+            if job_id is None:
+                return None
+            now = datetime.utcnow()
+            claimed = (
+                session.query(Job)
+                .filter(Job.id == job_id, Job.status == JobStatus.queued)
+                .update(
+                    {
+                        Job.status: JobStatus.running,
+                        Job.worker_id: worker_id,
+                        Job.started_at: now,
+                        Job.heartbeat_at: now,
+                        Job.attempts: func.coalesce(Job.attempts, 0) + 1,
+                        Job.progress: None,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            session.commit()
+            if claimed == 1:
+                return job_id
+            # another worker won the race for this row; try the next one
+
+
+def heartbeat(job_id: str, worker_id: str) -> bool:
+    """Refresh the job's heartbeat; False if this worker no longer owns the job."""
+    with get_session() as session:
+        n = (
+            session.query(Job)
+            .filter(Job.id == job_id, Job.worker_id == worker_id, Job.status == JobStatus.running)
+            .update({Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        )
+        session.commit()
+        return n == 1
+
+
+def reclaim_stale_jobs() -> int:
+    """Requeue (or fail, after MAX_ATTEMPTS) running jobs whose worker stopped heartbeating."""
+    cutoff = datetime.utcnow() - timedelta(seconds=STALE_AFTER_SECONDS)
+    with get_session() as session:
+        stale = (
+            session.query(Job)
+            .filter(Job.status == JobStatus.running)
+            .filter(((Job.heartbeat_at.is_(None)) & (Job.started_at < cutoff)) | (Job.heartbeat_at < cutoff))
+            .all()
+        )
+        for job in stale:
+            if (job.attempts or 0) >= MAX_ATTEMPTS:
+                job.status = JobStatus.failed
+                job.error_message = f"Worker {job.worker_id} stopped heartbeating ({job.attempts} attempts)"
+                job.completed_at = datetime.utcnow()
+            else:
+                job.status = JobStatus.queued
+            job.worker_id = None
+            print(f"[Worker] Reclaimed stale job {job.id} -> {job.status.value}", flush=True)
+        session.commit()
+        return len(stale)
+
+
+class _Heartbeat:
+    """Background thread that keeps a claimed job's heartbeat fresh."""
+
+    def __init__(self, job_id: str, worker_id: str):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            try:
+                if not heartbeat(self.job_id, self.worker_id):
+                    return
+            except Exception as e:
+                print(f"[Worker {self.worker_id}] heartbeat failed: {e}", flush=True)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class _ProgressWriter:
+    """
+    Pipeline progress hook that stores the latest stage on the job row, where the API's
+    event broker (backend/events.py) picks it up. Per-page updates are throttled.
+    """
+
+    def __init__(self, job_id: str, worker_id: str):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stage: Optional[str] = None
+        self._written_at = 0.0
+
+    def __call__(self, stage: str, **info) -> None:
+        now = time.monotonic()
+        if stage == self._stage and now - self._written_at < PROGRESS_MIN_INTERVAL_SECONDS:
+            return
+        self._stage = stage
+        self._written_at = now
+        with get_session() as session:
+            session.query(Job).filter(
+                Job.id == self.job_id, Job.worker_id == self.worker_id, Job.status == JobStatus.running
+            ).update({Job.progress: {"stage": stage, **info}}, synchronize_session=False)
+            session.commit()
+
+
+def _timings_summary(timings: Dict[str, Any], total: float) -> Dict[str, Any]:
+    """What is stored on Job.timings: seconds per stage plus page counts, without the per-page list."""
+    pages = timings.get("pages", [])
+    summary: Dict[str, Any] = {
+        "stages": {stage: round(seconds, 4) for stage, seconds in timings.get("stages", {}).items()},
+        "total": round(total, 4),
+        "pages": len(pages),
+        "ocr_pages": sum(1 for _, ocr in pages if ocr),
+    }
+    if "cache_hit" in timings:
+        summary["cache_hit"] = timings["cache_hit"]
+    return summary
+
+
+def _finish_job(job_id: str, worker_id: str, status: JobStatus, result: Optional[JobResult] = None,
+                error_message: Optional[str] = None, timings: Optional[Dict[str, Any]] = None,
+                metrics: Optional[MetricsBatch] = None) -> bool:
+    """
+    Record a job's outcome (and its timings and metrics) in one short transaction. The status
+    update is conditional on this worker still owning the job; False (nothing written) if it
+    was reclaimed meanwhile.
+    """
+    with get_session() as session:
+        owned = (
+            session.query(Job)
+            .filter(Job.id == job_id, Job.worker_id == worker_id, Job.status == JobStatus.running)
+            .update(
+                {
+                    Job.status: status,
+                    Job.error_message: error_message,
+                    Job.completed_at: datetime.utcnow(),
+                    Job.timings: timings,
+                },
+                synchronize_session=False,
+            )
+        )
+        if owned != 1:
+            session.rollback()
+            return False
+        if result is not None:
+            session.merge(result)
+        if metrics is not None:
+            metrics.flush(session)
+        session.commit()
+        return True
+
+
+def process_job(job_id: str, worker_id: str) -> None:
+    from .pipeline import run_full_pipeline
+
+    # no session (and no SQLite lock) is held while the multi-minute pipeline runs
+    with get_session() as session:
+        job = session.get(Job, job_id)
+        if not job or job.worker_id != worker_id:
+            return
+        params = dict(
+            pdf_path=job.file_path,
+            quality_score=job.quality_score,
+            min_bid=job.min_bid,
+            max_bid=job.max_bid,
+            work_dir=os.path.dirname(job.file_path),
+            pdf_sha256=job.pdf_sha256,
+        )
+
+    timings: Dict[str, Any] = {}
+    started = time.perf_counter()
+    try:
+        pipeline_out = run_full_pipeline(**params, progress=_ProgressWriter(job_id, worker_id), timings=timings)
+
+        bids = pipeline_out.get("diagnostic_bids")
+        result = JobResult(
+            job_id=job_id,
+            base_price=pipeline_out.get("base_price"),
+            best_bid=pipeline_out.get("best_bid"),
+            p_win=pipeline_out.get("p_win_at_best"),
+            expected_profit=pipeline_out.get("expected_profit_at_best"),
+            profit_if_won=pipeline_out.get("profit_if_won_at_best"),
+            initial_bracket=pipeline_out.get("initial_bracket"),
+            auto_expanded=pipeline_out.get("auto_expanded"),
+            curve_bids=pack_curve(bids),
+            curve_exp_profit=pack_curve(pipeline_out.get("diagnostic_exp_profit")),
+            curve_points=len(bids) if bids is not None else None,
+            extracted_data=pipeline_out.get("extracted_data"),
+        )
+        if _finish_job(
+            job_id, worker_id, JobStatus.succeeded, result=result,
+            timings=_timings_summary(timings, time.perf_counter() - started),
+            metrics=job_metrics(JobStatus.succeeded.value, timings),
+        ):
+            print(f"[Job {job_id}] SUCCESS", flush=True)
+        else:
+            print(f"[Job {job_id}] finished after being reclaimed; dropping result", flush=True)
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        print(f"[Job {job_id}] FAILED: {e}\n{error_trace}", flush=True)
+        error_message = f"{str(e)}\n\n{error_trace[:500]}"  # Limit error message length
+        _finish_job(
+            job_id, worker_id, JobStatus.failed, error_message=error_message,
+            timings=_timings_summary(timings, time.perf_counter() - started),
+            metrics=job_metrics(JobStatus.failed.value, timings),
+        )
+
+
+def worker_loop(worker_id: str, stop: Optional[threading.Event] = None) -> None:
+    # the schema is set up by whoever starts the workers (the API, or main() below): one
+    # process runs the migrations instead of every worker racing to ALTER the same table
+    stop = stop or threading.Event()
+    print(f"[Worker {worker_id}] started (pid {os.getpid()})", flush=True)
+    last_reclaim = 0.0
+    while not stop.is_set():
+        try:
+            if time.monotonic() - last_reclaim >= HEARTBEAT_SECONDS:
+                reclaim_stale_jobs()
+                last_reclaim = time.monotonic()
+            job_id = claim_next_job(worker_id)
+        except Exception as e:
+            print(f"[Worker {worker_id}] queue error: {e}", flush=True)
+            job_id = None
+        if job_id is None:
+            stop.wait(POLL_SECONDS)
+            continue
+        print(f"[Worker {worker_id}] claimed job {job_id}", flush=True)
+        with _Heartbeat(job_id, worker_id):
+            process_job(job_id, worker_id)
+    print(f"[Worker {worker_id}] stopped", flush=True)
+
+
+def _worker_main(worker_id: str) -> None:
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    worker_loop(worker_id, stop)
+
+
+def start_workers(concurrency: int) -> List[multiprocessing.Process]:
+    ctx = multiprocessing.get_context("spawn")
+    procs = []
+    for i in range(concurrency):
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{i}"
+        p = ctx.Process(target=_worker_main, args=(worker_id,), name=f"job-worker-{i}", daemon=True)
+        p.start()
+        procs.append(p)
+    return procs
+
+
+def stop_workers(procs: List[multiprocessing.Process], timeout: float = 10.0) -> None:
+    for p in procs:
+        if p.is_alive():
+            p.terminate()  # SIGTERM: the worker exits after its current job
+    for p in procs:
+        p.join(timeout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run job queue workers")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("JOB_WORKERS", "1")))
+    args = parser.parse_args()
+
+    init_db()
+    procs = start_workers(args.concurrency)
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        stop_workers(procs)
+
+
+if __name__ == "__main__":
+    main()
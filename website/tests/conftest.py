@@ -0,0 +1,66 @@
+"""
+Run from website/:  python -m pytest -q tests
+
+The backend imports its siblings as packages (Extraction, Bob_The_Builders.ml) and step 3 as
+the flat module multiple3, so both website/ and website/Extraction go on sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+WEBSITE_DIR = Path(__file__).resolve().parents[1]
+for path in (WEBSITE_DIR, WEBSITE_DIR / "Extraction"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from Bob_The_Builders.ml import bid_optimization_pipeline_from_scratch as bopt  # noqa: E402
+from backend import db  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def models():
+    """(classifier, regressor) fitted on the small synthetic dataset, never written to disk."""
+    df = bopt.make_synthetic_small_dataset(n=2000, seed=bopt.SEED)
+    X = df[bopt.FEATURES]
+    clf_pipe = bopt.build_classifier().fit(X, df[bopt.TARGET_CLASS])
+    reg_pipe = bopt.build_regressor("ridge").fit(X, df[bopt.TARGET_PROFIT])
+    return clf_pipe, reg_pipe
+
+
+@pytest.fixture(scope="session")
+def tenders():
+    """(base_price, quality_score) pairs spread over the training range."""
+    rng = np.random.default_rng(7)
+    return list(zip(rng.uniform(40_000, 200_000, 25), rng.uniform(0.0, 1.0, 25)))
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Points backend.db (sync and async engines) at an empty SQLite file and creates the schema."""
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "backend_data.sqlite3"))
+    engine, read_engine = db._make_engine(read_only=False), db._make_engine(read_only=True)
+    monkeypatch.setattr(db, "ENGINE", engine)
+    monkeypatch.setattr(db, "READ_ENGINE", read_engine)
+    monkeypatch.setattr(db, "SessionLocal", db.sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    monkeypatch.setattr(db, "ReadSessionLocal", db.sessionmaker(autocommit=False, autoflush=False, bind=read_engine))
+    monkeypatch.setattr(db, "_async_read_engine", None)
+    monkeypatch.setattr(db, "_async_read_sessions", None)
+    db.init_db()
+    yield db
+    engine.dispose()
+    read_engine.dispose()
+
+
+@pytest.fixture
+def api_client(temp_db, monkeypatch):
+    """TestClient on the temp DB, started without embedded job workers."""
+    from fastapi.testclient import TestClient
+
+    from backend import main
+
+    monkeypatch.setattr(main, "EMBEDDED_JOB_WORKERS", 0)
+    with TestClient(main.create_app()) as client:
+        yield client
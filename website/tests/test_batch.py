@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.batch import iter_batch_results, parse_batch_rows
+from backend.main import create_app
+
+
+def parse_json(payload):
+    return parse_batch_rows(json.dumps(payload).encode(), "application/json")
+
+
+def test_parses_json_and_csv_rows():
+    rows = parse_json({"rows": [{"base_price": 100000, "quality_score": 0.7, "max_bid": 130000}]})
+    assert rows.loc[0, "max_bid"] == 130000 and np.isnan(rows.loc[0, "min_bid"])
+    rows = parse_batch_rows(b"base_price,quality_score\n100000,0.7\n50000,0.2\n", "text/csv")
+    assert rows["base_price"].tolist() == [100000, 50000]
+
+
+@pytest.mark.parametrize("payload, message", [
+    ([1, 2], "must be a JSON object"),
+    ({"rows": [{"base_price": 1, "quality_score": 0.5}, "x"]}, "must be a JSON object"),
+    ({"rows": []}, "No rows"),
+    ([], "No rows"),
+    ([{"base_price": 100000}], "Missing required columns"),
+    ([{"base_price": 0, "quality_score": 0.5}], "base_price must be > 0"),
+    ([{"base_price": 100000, "quality_score": 1.5}], "quality_score must be between 0 and 1"),
+    ([{"base_price": 100000, "quality_score": 0.5, "min_bid": 120000, "max_bid": 110000}], "min_bid must not exceed"),
+])
+def test_rejects_bad_rows(payload, message):
+    with pytest.raises(ValueError, match=message):
+        parse_json(payload)
+
+
+def test_header_only_csv_has_no_rows():
+    with pytest.raises(ValueError, match="No rows"):
+        parse_batch_rows(b"base_price,quality_score\n", "text/csv")
+
+
+@pytest.mark.parametrize("body", [b"[1,2]", b'{"rows": []}', b"not json"])
+def test_endpoint_returns_400_for_bad_bodies(body):
+    client = TestClient(create_app())
+    r = client.post("/api/optimize/batch", content=body, headers={"content-type": "application/json"})
+    assert r.status_code == 400
+
+
+def test_results_match_rows(models):
+    clf_pipe, reg_pipe = models
+    rows = parse_json([{"base_price": 100000 + 1000 * i, "quality_score": i / 10} for i in range(10)])
+    lines = "".join(iter_batch_results(rows, clf_pipe, reg_pipe, chunk_rows=3)).splitlines()
+    out = [json.loads(line) for line in lines]
+    assert [r["row"] for r in out] == list(range(10))
+    assert all(r["best_bid"] > 0 for r in out)
+
+
+def test_results_match_single_jobs(models, tenders):
+    # the batch endpoint and /api/jobs (pipeline.run_full_pipeline) must agree on a tender
+    from Bob_The_Builders.ml import bid_optimization_pipeline_from_scratch as bopt
+
+    clf_pipe, reg_pipe = models
+    records = [{"base_price": b, "quality_score": q} for b, q in tenders]
+    for i in range(0, len(records), 3):  # some rows with a bracket the optimum lies outside of
+        records[i].update(min_bid=records[i]["base_price"], max_bid=records[i]["base_price"] * 1.01)
+    rows = parse_json(records)
+    out = [json.loads(line) for line in "".join(iter_batch_results(rows, clf_pipe, reg_pipe)).splitlines()]
+
+    table = bopt.get_markup_table(clf_pipe)
+    for rec, res in zip(records, out):
+        single = bopt.optimize_bid(clf_pipe, reg_pipe, auto_expand=True, use_profit_formula=True,
+                                   markup_table=table, **rec)
+        for key in ("best_bid", "p_win_at_best", "expected_profit_at_best"):
+            assert res[key] == pytest.approx(single[key], rel=1e-12), (rec, key)
+        assert res["profit_if_won_at_best"] == pytest.approx(single["best_bid"] - rec["base_price"], rel=1e-12)
@@ -0,0 +1,80 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from Bob_The_Builders.ml import bid_optimization_pipeline_from_scratch as bopt  # noqa: E402
+from Bob_The_Builders.ml.data_synthesizer import generate_bids_chunked  # noqa: E402
+
+
+def test_chunked_output_reads_as_a_parquet_dataset(tmp_path):
+    manifest = generate_bids_chunked(2500, str(tmp_path), chunk_size=1000, workers=1)
+    # the manifest must not be picked up as a data file by pyarrow's discovery
+    assert len(pd.read_parquet(tmp_path)) == manifest["rows"] == 2500
+    assert [os.path.basename(p) for p in bopt.dataset_files(str(tmp_path))] == manifest["files"]
+
+
+@pytest.mark.parametrize("n, chunk_size", [(0, 1000), (10, 0)])
+def test_rejects_empty_output(tmp_path, n, chunk_size):
+    with pytest.raises(ValueError, match="at least 1"):
+        generate_bids_chunked(n, str(tmp_path), chunk_size=chunk_size, workers=1)
+    assert not (tmp_path / "_manifest.json").exists()
+
+
+def _csv_dataset(path, n, seed=0):
+    df = bopt.make_synthetic_small_dataset(n=n, seed=seed)[bopt.REQUIRED_COLS]
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_load_dataset_is_compact_and_matches_float64(tmp_path):
+    src = _csv_dataset(tmp_path / "bids.csv", 1000)
+    with open(tmp_path / "bids.csv", "a") as f:  # incomplete and garbled rows are dropped
+        f.write(",100000,0.5,1\n120000,abc,0.5,0\n")
+
+    df = bopt.load_dataset(str(tmp_path / "bids.csv"), chunk_rows=300)
+    assert dict(df.dtypes.astype(str)) == bopt.LOAD_DTYPES
+    assert len(df) == len(src)
+    expected = (src["bid_amount"] - src["base_price"]) / src["base_price"]
+    np.testing.assert_allclose(df["rel_markup"], expected, rtol=1e-6)
+    np.testing.assert_array_equal(df[bopt.TARGET_CLASS], src["won"])
+
+
+def test_load_dataset_reads_parts_in_manifest_order(tmp_path):
+    manifest = generate_bids_chunked(2500, str(tmp_path), chunk_size=1000, workers=1)
+    parts = [pd.read_parquet(tmp_path / name) for name in manifest["files"]]
+    df = bopt.load_dataset(str(tmp_path), chunk_rows=400)
+    expected = bopt._prepare_chunk(pd.concat(parts, ignore_index=True)).reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, expected)
+
+    # a part that is not in the manifest is ignored, and the listed order is kept
+    parts[0].to_parquet(tmp_path / "part-99999.parquet")
+    with open(tmp_path / "_manifest.json", "w") as f:
+        json.dump(dict(manifest, files=manifest["files"][::-1]), f)
+    reordered = bopt.load_dataset(str(tmp_path))
+    assert len(reordered) == len(df)
+    last = bopt._prepare_chunk(parts[2])
+    pd.testing.assert_frame_equal(reordered.iloc[:len(last)], last.reset_index(drop=True))
+
+
+def test_arrow_cache_is_reused_until_the_source_changes(tmp_path, monkeypatch):
+    csv_path, cache_path = tmp_path / "bids.csv", str(tmp_path / "cache" / "bids.arrow")
+    _csv_dataset(csv_path, 800)
+    first = bopt.load_dataset(str(csv_path), chunk_rows=300, cache_path=cache_path)
+    assert os.path.exists(cache_path)
+
+    with monkeypatch.context() as m:  # served from the cache without reading the source
+        m.setattr(bopt, "_iter_raw_chunks", lambda *a: pytest.fail("source was read"))
+        cached = bopt.load_dataset(str(csv_path), cache_path=cache_path)
+    pd.testing.assert_frame_equal(cached, first)
+
+    _csv_dataset(csv_path, 900, seed=1)  # rewritten: size and mtime change
+    rebuilt = bopt.load_dataset(str(csv_path), cache_path=cache_path)
+    assert len(rebuilt) == 900
+    with monkeypatch.context() as m:
+        m.setattr(bopt, "_iter_raw_chunks", lambda *a: pytest.fail("source was read"))
+        pd.testing.assert_frame_equal(bopt.load_dataset(str(csv_path), cache_path=cache_path), rebuilt)
@@ -0,0 +1,62 @@
+"""Packed float32 diagnostic curves: downsampling, and the migration of legacy JSON curves."""
+
+import json
+
+import numpy as np
+import pytest
+
+from backend.curves import downsample_indices, pack_curve, unpack_curve
+from backend.db import get_session
+from backend.models import Job, JobResult
+
+
+@pytest.mark.parametrize("n, points, peak", [(201, 11, 37), (201, 10, 0), (201, 10, 200), (1000, 3, 501),
+                                             (50, 49, 13), (7, 2, 3)])
+def test_downsample_keeps_ends_and_peak(n, points, peak):
+    y = -np.abs(np.arange(n) - peak).astype(float)
+    idx = downsample_indices(y, points)
+    assert len(idx) == points and np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == n - 1
+    if points > 2:
+        assert peak in idx
+
+
+def test_downsample_small_and_non_finite_curves():
+    assert downsample_indices(np.arange(5.0), 5).tolist() == list(range(5))
+    assert downsample_indices(np.arange(5.0), 50).tolist() == list(range(5))
+    y = np.full(101, np.nan)
+    y[40] = 1.0
+    assert 40 in downsample_indices(y, 6)
+    assert len(downsample_indices(np.full(101, np.nan), 6)) == 6
+
+
+def test_legacy_json_curves_are_packed(temp_db, api_client):
+    bids = np.linspace(90000.0, 130000.0, 101)
+    exp_profit = (bids - 100000.0) * np.exp(-((bids - 112345.0) / 8000.0) ** 2)
+    with get_session() as session:
+        session.add(Job(id="old", filename="old.pdf", file_path="/tmp/old.pdf", quality_score=0.5))
+        session.add(JobResult(job_id="old", best_bid=112345.0))
+        session.commit()
+    with temp_db.ENGINE.begin() as conn:  # a DB from before the curves were packed
+        conn.exec_driver_sql("ALTER TABLE job_results ADD COLUMN diagnostic_bids JSON")
+        conn.exec_driver_sql("ALTER TABLE job_results ADD COLUMN diagnostic_exp_profit JSON")
+        conn.exec_driver_sql(
+            "UPDATE job_results SET diagnostic_bids = ?, diagnostic_exp_profit = ? WHERE job_id = 'old'",
+            (json.dumps(bids.tolist()), json.dumps(exp_profit.tolist())),
+        )
+
+    temp_db.init_db()
+    with temp_db.ENGINE.connect() as conn:
+        row = conn.exec_driver_sql(
+            "SELECT curve_bids, curve_exp_profit, curve_points, diagnostic_bids, diagnostic_exp_profit "
+            "FROM job_results WHERE job_id = 'old'"
+        ).one()
+    assert row[2] == 101 and row[3] is None and row[4] is None
+    np.testing.assert_array_equal(unpack_curve(row[0]), bids.astype(np.float32))
+    np.testing.assert_array_equal(unpack_curve(row[1]), exp_profit.astype(np.float32))
+    assert row[0] == pack_curve(bids.tolist())
+
+    curve = api_client.get("/api/jobs/old/curve", params={"points": 9}).json()
+    assert curve["total_points"] == 101 and len(curve["bids"]) == 9
+    peak = float(bids[np.argmax(exp_profit)])
+    assert any(b == pytest.approx(peak, rel=1e-6) for b in curve["bids"])
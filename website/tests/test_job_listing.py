@@ -0,0 +1,65 @@
+"""GET /api/jobs: keyset pagination and fields= projection, on a temp SQLite DB."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.db import get_session
+from backend.models import Job, JobResult, JobStatus
+
+
+@pytest.fixture
+def jobs(temp_db):
+    """Ids in listing order: newest first, ties on created_at by id descending, NULL created_at last."""
+    t0 = datetime(2024, 5, 1, 12, 0, 0)
+    created = {"a": t0, "b": t0 + timedelta(seconds=1), "c": t0 + timedelta(seconds=1),
+               "d": t0 + timedelta(seconds=1), "e": t0 + timedelta(seconds=2), "f": None, "g": None}
+    with get_session() as session:
+        for job_id in created:
+            session.add(Job(id=job_id, filename=f"{job_id}.pdf", file_path=f"/tmp/{job_id}.pdf",
+                            quality_score=0.5, status=JobStatus.succeeded))
+            session.add(JobResult(job_id=job_id, base_price=100000.0, best_bid=110000.0))
+        session.commit()
+        for job_id, created_at in created.items():  # the column default fills NULLs on insert
+            session.query(Job).filter(Job.id == job_id).update({Job.created_at: created_at})
+        session.commit()
+    return ["e", "d", "c", "b", "a", "g", "f"]
+
+
+def _all_pages(client, limit, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        r = client.get("/api/jobs", params=dict(params, limit=limit, **({"cursor": cursor} if cursor else {})))
+        assert r.status_code == 200, r.text
+        ids += [item["id"] for item in r.json()]
+        pages += 1
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_cursor_pages_cover_every_job_once(api_client, jobs, limit):
+    ids, pages = _all_pages(api_client, limit, fields="status")
+    assert ids == jobs
+    assert pages == -(-len(jobs) // limit)
+
+
+def test_fields_projection(api_client, jobs):
+    item = api_client.get("/api/jobs", params={"fields": "status,result.best_bid", "limit": 1}).json()[0]
+    assert item == {"id": "e", "status": "succeeded", "result": {"best_bid": 110000.0}}
+
+    item = api_client.get("/api/jobs", params={"limit": 1}).json()[0]
+    assert set(item) == set(Job.FIELDS) | {"result"} and item["file_path"] is None  # paths are never served
+    assert "diagnostic_bids" not in item["result"] and item["result"]["best_bid"] == 110000.0
+
+
+@pytest.mark.parametrize("fields", ["bogus", "status,result.bogus", "result.", "file_path.x"])
+def test_unknown_fields_are_rejected(api_client, jobs, fields):
+    r = api_client.get("/api/jobs", params={"fields": fields})
+    assert r.status_code == 400 and "Unknown field" in r.json()["detail"]
+    assert api_client.get("/api/jobs/e", params={"fields": fields}).status_code == 400
+
+
+def test_invalid_cursor_is_rejected(api_client, jobs):
+    assert api_client.get("/api/jobs", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,103 @@
+"""Step 2 (extract_tender_params) against the per-window regex matching of the original collector."""
+
+import random
+import re
+
+import pytest
+
+from Extraction import extract_tender_params as etp
+
+
+def reference_window_hits(lower_lines, span=3):
+    """{param: [idx]} where a keyword matches " ".join(lower_lines[idx:idx+span]), one regex per window."""
+    out = {}
+    for param, keywords in etp.KEYWORDS.items():
+        out[param] = [
+            idx for idx in range(len(lower_lines))
+            if any(re.search(r"\b" + re.escape(kw).replace(r"\ ", r"[\s\.]*") + r"\b", " ".join(lower_lines[idx:idx + span]))
+                   for kw in keywords)
+        ]
+    return out
+
+
+# keyword words, OCR-collapsed and dotted variants, plus filler
+VOCAB = sorted({w for kws in etp.KEYWORDS.values() for kw in kws for w in kw.lower().split()}) + [
+    "estimatedcost", "nitno", "nit.no", "bidsecurity", "timeforcompletion", "tender.no", "e-tender",
+    "emd:", "(emd)", "earnestmoney", "openingdate", "workname", "no.", ".", "..", ":", "-", "₹", "rs.",
+    "12,50,000/-", "2024", "1:2:4", "the", "of", "for", "is", "xemd", "emdx", "subjects", "agencyy",
+]
+
+
+def random_lines(rng, n_tokens):
+    lines, line = [], []
+    for _ in range(n_tokens):
+        line.append(rng.choice(VOCAB))
+        if rng.random() < 0.25:
+            lines.append(("" if rng.random() < 0.7 else " ").join(line))
+            line = []
+    lines.append(" ".join(line))
+    return [ln.strip().lower() for ln in lines if ln.strip()]
+
+
+CRAFTED = [
+    ["estimatedcost of the work", "rs. 12,50,000/-"],
+    ["nitno. 45/2024"],
+    ["bidsecurity ₹ 25,000"],
+    ["timeforcompletion 6 months"],
+    ["tender", "no.", "bld/nit-95"],
+    ["name of", "work: road"],
+    ["earnest money", "deposit"],
+    ["the e-tender no is", "x"],
+]
+
+
+@pytest.mark.parametrize("lines", CRAFTED)
+def test_window_hits_match_per_window_regex_on_crafted_lines(lines):
+    assert etp.KEYWORD_MATCHER.window_hits(lines) == reference_window_hits(lines)
+
+
+def test_window_hits_match_per_window_regex_on_random_documents():
+    rng = random.Random(0)
+    for _ in range(3000):
+        lines = random_lines(rng, rng.randint(1, 60))
+        assert etp.KEYWORD_MATCHER.window_hits(lines) == reference_window_hits(lines), lines
+
+
+def reference_collect(text_blocks, window_lines=3, max_snippets_per_param=10):
+    """The original collector: one snippet per keyword window, skipped when contained in an earlier one."""
+    results = {k: [] for k in etp.KEYWORDS}
+    for source, content in text_blocks:
+        lines = [ln.strip() for ln in content.splitlines() if ln.strip()]
+        hits = reference_window_hits([ln.lower() for ln in lines])
+        for param in etp.KEYWORDS:
+            if len(results[param]) >= max_snippets_per_param:
+                continue
+            for idx in hits[param]:
+                start = max(0, idx - window_lines)
+                end = min(len(lines), idx + window_lines + 3)
+                for j in range(idx + 1, min(len(lines), idx + 5)):
+                    if re.search(r"[₹\d]", lines[j]):
+                        end = max(end, j + 1)
+                snippet = lines[start:end]
+                joined = " ".join(snippet)
+                if any(joined in " ".join(snip) for _, snip in results[param]):
+                    continue
+                if len(joined) < etp.Config.MIN_CHARS_IN_SNIPPET and not re.search(r"[₹\d]", joined):
+                    continue
+                results[param].append((source, snippet))
+                if len(results[param]) >= max_snippets_per_param:
+                    break
+    return results
+
+
+def test_contexts_match_per_hit_collector_on_random_documents():
+    rng = random.Random(1)
+    for _ in range(500):
+        blocks = []
+        for page in range(rng.randint(1, 4)):
+            text = "\n".join(random_lines(rng, rng.randint(1, 80)))
+            blocks.append((f"page{page}_text.txt", text))
+            if rng.random() < 0.3:
+                # the same block again on another page (headers, repeated tables)
+                blocks.append((f"page{page}_table0.csv", text))
+        assert etp.collect_keyword_contexts(blocks) == reference_collect(blocks)
@@ -0,0 +1,18 @@
+from backend.metrics import render_metrics
+
+
+def _value(text, name):
+    return next(line.split()[-1] for line in text.splitlines() if line.startswith(name + " "))
+
+
+def test_values_keep_full_precision():
+    text = render_metrics([("tender_pages_extracted_total", "", 1234567.0), ("tender_pages_ocr_total", "", 0.1 + 0.2)], [])
+    assert float(_value(text, "tender_pages_extracted_total")) == 1234567.0
+    assert float(_value(text, "tender_pages_ocr_total")) == 0.1 + 0.2
+
+
+def test_special_values_use_exposition_spelling():
+    text = render_metrics([], [("tender_pages_extracted_total", {}, float("inf")),
+                               ("tender_pages_ocr_total", {}, float("nan"))])
+    assert _value(text, "tender_pages_extracted_total") == "+Inf"
+    assert _value(text, "tender_pages_ocr_total") == "NaN"
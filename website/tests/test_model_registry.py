@@ -0,0 +1,43 @@
+import joblib
+import pytest
+
+from backend.model_registry import ModelRegistry
+
+
+def _registry(tmp_path, models):
+    clf_pipe, reg_pipe = models
+    paths = {"classifier": tmp_path / "clf.pkl", "regressor": tmp_path / "reg.pkl"}
+    joblib.dump(clf_pipe, paths["classifier"])
+    joblib.dump(reg_pipe, paths["regressor"])
+    return ModelRegistry(paths, check_interval=0.0), paths
+
+
+def test_keeps_last_good_snapshot_while_artifacts_are_swapped(tmp_path, models):
+    registry, paths = _registry(tmp_path, models)
+    loaded = registry.snapshot()
+
+    paths["regressor"].unlink()
+    assert registry.snapshot() is loaded
+
+    paths["regressor"].write_bytes(b"half-written")
+    assert registry.snapshot() is loaded
+
+    # restored with the same content: the loaded object is kept
+    joblib.dump(models[1], paths["regressor"])
+    assert registry.snapshot()["regressor"].obj is loaded["regressor"].obj
+
+
+def test_raises_when_nothing_is_loaded_yet(tmp_path, models):
+    registry, paths = _registry(tmp_path, models)
+    paths["classifier"].unlink()
+    with pytest.raises(FileNotFoundError):
+        registry.snapshot()
+
+
+def test_failed_reload_waits_for_the_next_interval(tmp_path, models):
+    registry, paths = _registry(tmp_path, models)
+    registry.snapshot()
+    before = registry._last_check
+    paths["classifier"].write_bytes(b"garbage")
+    assert registry.refresh(force=True) is False
+    assert registry._last_check > before
@@ -0,0 +1,98 @@
+"""The fast optimizer paths (batched, analytic, markup table) against the per-tender grid search."""
+
+import numpy as np
+import pytest
+
+from Bob_The_Builders.ml import bid_optimization_pipeline_from_scratch as bopt
+
+
+def grid(clf_pipe, reg_pipe, base_price, quality, auto_expand=True, **kwargs):
+    return bopt.optimize_bid(clf_pipe, reg_pipe, base_price=base_price, quality_score=quality,
+                             auto_expand=auto_expand, analytic=False, **kwargs)
+
+
+@pytest.mark.parametrize("use_profit_formula", [True, False])
+def test_batch_matches_grid(models, tenders, use_profit_formula):
+    clf_pipe, reg_pipe = models
+    base = np.array([b for b, _ in tenders])
+    q = np.array([q for _, q in tenders])
+    # every other row with an explicit bracket, the rest on the default one
+    min_bids = np.where(np.arange(len(base)) % 2 == 0, np.nan, base * 0.9)
+    max_bids = np.where(np.arange(len(base)) % 2 == 0, np.nan, base * 1.1)
+
+    batch = bopt.optimize_bids_batch(clf_pipe, reg_pipe, base, q, min_bids=min_bids, max_bids=max_bids,
+                                     auto_expand=True, use_profit_formula=use_profit_formula)
+    for i, (b, qs) in enumerate(tenders):
+        kwargs = {} if np.isnan(min_bids[i]) else dict(min_bid=min_bids[i], max_bid=max_bids[i])
+        single = grid(clf_pipe, reg_pipe, b, qs, use_profit_formula=use_profit_formula, **kwargs)
+        assert batch["best_bid"][i] == pytest.approx(single["best_bid"], rel=1e-6)
+        assert batch["expected_profit_at_best"][i] == pytest.approx(single["expected_profit_at_best"], rel=1e-6)
+        assert [batch["bracket_low"][i], batch["bracket_high"][i]] == pytest.approx(single["initial_bracket"])
+
+
+def test_analytic_matches_grid(models, tenders):
+    clf_pipe, reg_pipe = models
+    for b, q in tenders:
+        slow = grid(clf_pipe, reg_pipe, b, q, use_profit_formula=True)
+        fast = bopt.optimize_bid(clf_pipe, reg_pipe, base_price=b, quality_score=q,
+                                 auto_expand=True, use_profit_formula=True)
+        # the grid stops refining at tol_rel=1e-3; the closed form is exact
+        assert fast["best_bid"] == pytest.approx(slow["best_bid"], rel=1e-3)
+        assert fast["expected_profit_at_best"] >= slow["expected_profit_at_best"] * (1 - 1e-6)
+        assert fast["p_win_at_best"] == pytest.approx(
+            bopt.predict_win_prob_single(clf_pipe, fast["best_bid"], b, q), rel=1e-9)
+
+
+def test_table_matches_grid(models, tenders):
+    clf_pipe, reg_pipe = models
+    table = bopt.build_markup_table(clf_pipe)
+    for b, q in tenders:
+        slow = grid(clf_pipe, reg_pipe, b, q, use_profit_formula=True)
+        fast = bopt.optimize_bid(clf_pipe, reg_pipe, base_price=b, quality_score=q,
+                                 auto_expand=True, use_profit_formula=True, markup_table=table)
+        assert fast["best_bid"] == pytest.approx(slow["best_bid"], rel=1e-3)
+        assert fast["expected_profit_at_best"] == pytest.approx(slow["expected_profit_at_best"], rel=1e-4)
+
+
+def test_fast_paths_respect_bracket(models):
+    clf_pipe, reg_pipe = models
+    table = bopt.build_markup_table(clf_pipe)
+    kwargs = dict(base_price=100_000, quality_score=0.5, min_bid=100_000, max_bid=101_000,
+                  auto_expand=False, use_profit_formula=True)
+    # the unconstrained optimum lies above max_bid, so both stop at the edge
+    analytic = bopt.optimize_bid(clf_pipe, reg_pipe, **kwargs)
+    from_table = bopt.optimize_bid(clf_pipe, reg_pipe, markup_table=table, **kwargs)
+    assert analytic["best_bid"] == from_table["best_bid"] == 101_000
+    assert from_table["p_win_at_best"] == pytest.approx(analytic["p_win_at_best"], rel=1e-9)
+
+
+def test_markup_table_cache_is_bounded_and_keyed_by_options(models):
+    clf_pipe, _ = models
+    small = bopt.get_markup_table(clf_pipe, n_quality=11)
+    assert len(small.quality) == 11
+    assert len(bopt.get_markup_table(clf_pipe).quality) == bopt.TABLE_N_QUALITY
+    assert bopt.get_markup_table(clf_pipe, n_quality=11) is small
+
+    # one table per hot-reloaded model version, only the latest TABLE_CACHE_SIZE are kept
+    df = bopt.make_synthetic_small_dataset(n=300, seed=0)
+    for seed in range(bopt.TABLE_CACHE_SIZE + 3):
+        reloaded = bopt.build_classifier().fit(df[bopt.FEATURES].iloc[seed:], df[bopt.TARGET_CLASS].iloc[seed:])
+        bopt.get_markup_table(reloaded)
+    assert len(bopt._TABLES_BY_VERSION) == bopt.TABLE_CACHE_SIZE
+
+
+def test_batch_table_matches_single_table(models, tenders):
+    clf_pipe, reg_pipe = models
+    table = bopt.get_markup_table(clf_pipe)
+    base = np.array([b for b, _ in tenders])
+    q = np.array([q for _, q in tenders])
+    max_bids = np.where(np.arange(len(base)) % 3 == 0, base * 1.01, np.nan)
+    batch = bopt.optimize_bids_batch(clf_pipe, reg_pipe, base, q, max_bids=max_bids, auto_expand=True,
+                                     use_profit_formula=True, markup_table=table)
+    for i, (b, qs) in enumerate(tenders):
+        kwargs = {} if np.isnan(max_bids[i]) else dict(max_bid=max_bids[i])
+        single = bopt.optimize_bid(clf_pipe, reg_pipe, base_price=b, quality_score=qs, auto_expand=True,
+                                   use_profit_formula=True, markup_table=table, **kwargs)
+        assert batch["best_bid"][i] == pytest.approx(single["best_bid"], rel=1e-12)
+        assert batch["p_win_at_best"][i] == pytest.approx(single["p_win_at_best"], rel=1e-12)
+        assert [batch["bracket_low"][i], batch["bracket_high"][i]] == pytest.approx(single["initial_bracket"])
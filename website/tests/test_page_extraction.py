@@ -0,0 +1,45 @@
+"""Step 1: page ranges in the process pool against the serial path."""
+
+import pytest
+
+pytest.importorskip("reportlab")
+pytest.importorskip("pdfplumber")
+
+from backend import ocr, page_extraction  # noqa: E402
+from tender_pdf_synthesizer import generate_tender_pdf  # noqa: E402
+
+
+def _pages(pdf_path, workers):
+    # seconds is wall time, the only field allowed to differ
+    return [{k: v for k, v in page.items() if k != "seconds"}
+            for page in page_extraction.iter_extracted_pages(pdf_path, workers=workers)]
+
+
+@pytest.mark.parametrize("scanned_frac", [0.0, 0.4])
+def test_parallel_pages_match_serial(tmp_path, monkeypatch, scanned_frac):
+    if scanned_frac:
+        pytest.importorskip("cv2")
+        # spawned workers read these at import: the stub OCR engine, without the sleep
+        monkeypatch.setenv("OCR_ENGINE", "stub")
+        monkeypatch.setenv("OCR_STUB_SECONDS", "0")
+        monkeypatch.setattr(ocr, "OCR_ENGINE", "stub")
+        monkeypatch.setattr(ocr, "OCR_STUB_SECONDS", 0.0)
+        monkeypatch.setattr(ocr, "_engine", None)
+        monkeypatch.setattr(ocr, "OCR_WORKERS", 0)
+    # small ranges: 9 pages over 2 workers become several ranges that finish out of order
+    monkeypatch.setattr(page_extraction, "RANGES_PER_WORKER", 2)
+
+    pdf_path = str(tmp_path / "nit.pdf")
+    truth = generate_tender_pdf(pdf_path, seed=11, n_pages=9, scanned_frac=scanned_frac)
+    assert bool(truth["scanned_pages"]) == bool(scanned_frac)
+
+    page_extraction.shutdown_extraction()
+    try:
+        serial = _pages(pdf_path, workers=1)
+        parallel = _pages(pdf_path, workers=2)
+    finally:
+        page_extraction.shutdown_extraction()
+
+    assert [p["page_num"] for p in serial] == list(range(1, 10))
+    assert [p["ocr"] for p in serial] == [n in truth["scanned_pages"] for n in range(1, 10)]
+    assert parallel == serial
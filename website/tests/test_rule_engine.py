@@ -0,0 +1,77 @@
+"""Step 3: the single-scan RuleEngine against the original build_extraction_rules patterns."""
+
+import contextlib
+import io
+import random
+import time
+
+with contextlib.redirect_stdout(io.StringIO()):  # the module runs its folder script on import
+    import multiple3
+
+LEGACY_RULES = multiple3.build_extraction_rules(multiple3.SIMPLE_RULES)
+
+TOKENS = [key for rule in multiple3.SIMPLE_RULES.values() for key in rule["keys"]] + [
+    "tender no", "ESTIMATED COST", "emd", ":", ": ", " ", " ", "\n", "\n", "-", "of", "the", "work", "1.",
+    "Rs. 12,50,000/-", "₹ 4,000", "12/05/2024", "12.05.2024", "180 Days", "6 Months", "1 Year",
+    "BLD/NIT-95/2019-20", "1:2:4", "1500 hrs", "Name of Work:", "2.",
+]
+
+
+def legacy_value(key_name, text):
+    rule = LEGACY_RULES[key_name]
+    match = rule["pattern_colon"].search(text)
+    if not match and rule["pattern_proximity"]:
+        match = rule["pattern_proximity"].search(text)
+    return match.groups()[-1] if match else None
+
+
+def engine_values(text):
+    return {k: (m.groups()[-1] if m else None) for k, m in multiple3.RULE_ENGINE.search(text).items()}
+
+
+def test_matches_legacy_rules_on_random_short_documents():
+    # shorter than RULE_WINDOW_CHARS, so the bounded windows never cut a legacy match
+    rng = random.Random(3)
+    for _ in range(3000):
+        parts, length = [], 0
+        while True:
+            token = rng.choice(TOKENS)
+            if length + len(token) + 1 > multiple3.RULE_WINDOW_CHARS - len("\nEnd of Document"):
+                break
+            parts.append(token)
+            length += len(token) + 1
+            if rng.random() < 0.05:
+                break
+        text = rng.choice([" ", ""]).join(parts) + "\nEnd of Document"
+        values = engine_values(text)
+        for key_name in LEGACY_RULES:
+            assert values[key_name] == legacy_value(key_name, text), (key_name, text)
+
+
+def test_subset_of_rules():
+    text = "Tender No.: BLD/NIT-95/2019-20\nEMD: Rs. 4,000/-\nEnd of Document"
+    out = multiple3.RULE_ENGINE.search(text, ["EMD"])
+    assert list(out) == ["EMD"] and out["EMD"].groups()[-1].strip() == "Rs. 4,000/-"
+
+
+def test_repeated_key_is_searched_in_its_own_window():
+    # the value is in the second key's window but past the first one's
+    text = "Tender No. " + "x " * 150 + " Tender No. " + "y " * 150 + ": ABC/123\nEnd of Document"
+    assert legacy_value("Tender No", text) == "ABC/123"
+    assert engine_values(text)["Tender No"] == "ABC/123"
+
+
+def test_repeated_keys_do_not_rescan_windows():
+    # every "EMD" window overlaps the next one and has no colon: searching every key in its own
+    # window made the cost grow with window_chars (~8.7 s for 2 MB at 500 chars); with the
+    # max_anchors cap it does not grow with the number of keys
+    text = "EMD " * 25_000
+
+    def seconds(window_chars):
+        engine = multiple3.RuleEngine(multiple3.SIMPLE_RULES, window_chars=window_chars)
+        started = time.perf_counter()
+        assert engine.search(text)["EMD"] is not None
+        return time.perf_counter() - started
+
+    seconds(100)  # warm up
+    assert seconds(10_000) < 5 * seconds(100)
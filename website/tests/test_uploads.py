@@ -0,0 +1,49 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from backend.uploads import UploadLimitMiddleware, UploadTooLarge, save_upload
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename="t.pdf")
+
+
+def test_streams_hash_size_and_page_hint(tmp_path):
+    page = b"1 0 obj << /Type /Page /Parent 2 0 R >> endobj\n"
+    data = b"%PDF-1.4\n" + b"<< /Type /Pages >>\n" + page * 5 + b"x" * 300
+    dest = tmp_path / "t.pdf"
+    # chunks of 7 bytes split the page markers across chunk boundaries
+    stored = asyncio.run(save_upload(_upload(data), str(dest), chunk_size=7))
+    assert dest.read_bytes() == data
+    assert stored.size_bytes == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert stored.page_count == 5
+
+
+def test_too_large_removes_partial_file(tmp_path):
+    dest = tmp_path / "t.pdf"
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(save_upload(_upload(b"x" * 100), str(dest), max_bytes=50, chunk_size=16))
+    assert not dest.exists()
+
+
+def test_middleware_rejects_large_content_length_before_the_handler():
+    calls = []
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, paths=("/upload",), max_bytes=10)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"ok": True}
+
+    client = TestClient(app)
+    big = client.post("/upload", files={"file": ("a.pdf", b"x" * 200_000)})
+    assert big.status_code == 413 and calls == []
+    small = client.post("/upload", files={"file": ("a.pdf", b"x" * 5)})
+    assert small.status_code == 200 and calls == ["a.pdf"]
@@ -0,0 +1,105 @@
+"""The jobs-table queue: conditional claims, heartbeats and stale-job reclaim, on a temp SQLite DB."""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend import worker
+from backend.db import get_session
+from backend.models import Job, JobStatus
+
+
+def _add_jobs(n, **fields):
+    base = datetime(2024, 1, 1)
+    with get_session() as session:
+        for i in range(n):
+            session.add(Job(id=f"job-{i}", filename="t.pdf", file_path="/tmp/t.pdf", quality_score=0.5,
+                            created_at=base + timedelta(seconds=i), **fields))
+        session.commit()
+
+
+def _job(job_id):
+    with get_session() as session:
+        return session.get(Job, job_id)
+
+
+def test_claims_oldest_queued_job_once(temp_db):
+    _add_jobs(2)
+    assert worker.claim_next_job("w1") == "job-0"
+    assert worker.claim_next_job("w2") == "job-1"
+    assert worker.claim_next_job("w1") is None
+
+    job = _job("job-0")
+    assert (job.status, job.worker_id, job.attempts) == (JobStatus.running, "w1", 1)
+    assert job.heartbeat_at is not None
+
+
+def test_racing_claimers_get_one_job_once(temp_db):
+    _add_jobs(1)
+    barrier = threading.Barrier(8)
+    claimed = []
+
+    def claim(worker_id):
+        barrier.wait()
+        claimed.append((worker_id, worker.claim_next_job(worker_id)))
+
+    threads = [threading.Thread(target=claim, args=(f"w{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    winners = [w for w, job_id in claimed if job_id == "job-0"]
+    assert len(claimed) == 8 and len(winners) == 1
+    assert _job("job-0").worker_id == winners[0]
+
+
+def test_heartbeat_only_refreshes_own_running_job(temp_db):
+    _add_jobs(1)
+    worker.claim_next_job("w1")
+    stale = datetime.utcnow() - timedelta(hours=1)
+    with get_session() as session:
+        session.get(Job, "job-0").heartbeat_at = stale
+        session.commit()
+
+    assert worker.heartbeat("job-0", "w2") is False
+    assert _job("job-0").heartbeat_at == stale
+    assert worker.heartbeat("job-0", "w1") is True
+    assert _job("job-0").heartbeat_at > stale
+
+
+@pytest.mark.parametrize("attempts, status", [(worker.MAX_ATTEMPTS - 1, JobStatus.queued),
+                                              (worker.MAX_ATTEMPTS, JobStatus.failed)])
+def test_reclaims_stale_jobs(temp_db, attempts, status):
+    stale = datetime.utcnow() - timedelta(seconds=worker.STALE_AFTER_SECONDS + 5)
+    _add_jobs(2, status=JobStatus.running, worker_id="dead", attempts=attempts, heartbeat_at=stale)
+    with get_session() as session:
+        session.get(Job, "job-1").heartbeat_at = datetime.utcnow()  # still alive
+        session.commit()
+
+    assert worker.reclaim_stale_jobs() == 1
+    job = _job("job-0")
+    assert (job.status, job.worker_id) == (status, None)
+    assert (job.error_message is not None) == (status == JobStatus.failed)
+    assert _job("job-1").status == JobStatus.running
+    if status == JobStatus.queued:
+        assert worker.claim_next_job("w1") == "job-0"
+        assert _job("job-0").attempts == attempts + 1
+
+
+def test_migration_skips_a_column_another_process_added(temp_db, monkeypatch):
+    from backend.models import Base
+
+    with temp_db.ENGINE.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE jobs DROP COLUMN timings")
+    stale = temp_db.inspect(temp_db.ENGINE)
+    stale.get_columns("jobs")  # this process looks first and caches the columns
+    with temp_db.ENGINE.begin() as conn:  # then another one adds the missing column
+        conn.exec_driver_sql("ALTER TABLE jobs ADD COLUMN timings JSON")
+
+    real_inspect = temp_db.inspect
+    inspectors = iter([stale])
+    monkeypatch.setattr(temp_db, "inspect", lambda engine: next(inspectors, None) or real_inspect(engine))
+    temp_db._add_missing_columns(Base)
+    assert "timings" in {c["name"] for c in real_inspect(temp_db.ENGINE).get_columns("jobs")}